@@ -0,0 +1,202 @@
+"""
+Storage of assignments and review status.
+
+Each paper can have several reviewers, so k-way assignments live in the `assignments`
+junction table. `papers.expertid` keeps pointing at the slot 0 (best) reviewer so
+the single-reviewer screens keep working unchanged.
+
+`saveMatches`, `saveAssignments` and `setReviewed` are the journaled writes behind the
+Save, Save Reviewers and Reviewed/Not Reviewed buttons, shared by the GUI and the matching
+service.
+
+Review status changes are set-based: the papers are staged in a temporary table and
+the loads of all their experts are updated by one UPDATE, however many papers are
+marked. Loads are not maintained by triggers because the journal replays load and
+status changes separately on undo/redo, and a trigger would count them twice.
+"""
+import sqlite3
+import numpy as np
+
+
+def ensureSchema(connection: sqlite3.Connection):
+    """
+    Creates the `assignments` junction table if it does not exist yet.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS assignments (
+            paperid INTEGER NOT NULL,
+            expertid INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            score INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (paperid, expertid)
+        )''')
+    connection.execute('CREATE INDEX IF NOT EXISTS assignments_expert ON assignments (expertid)')
+    connection.commit()
+
+
+def saveAssignments(connection: sqlite3.Connection, journal, expert_ids, paper_ids, scores, slots):
+    """
+    Writes a k-way assignment and updates expert loads as one journaled transaction.
+
+    Parameters:
+    - connection (sqlite3.Connection): Open database connection.
+    - journal (journal.ChangeJournal): Journal that records the transaction.
+    - expert_ids, paper_ids, scores, slots (array-like): One entry per assignment.
+
+    Returns:
+    - int or None: The journal transaction id, or None if nothing was saved.
+
+    Notes:
+    - Loads follow the same rule as `MainWindow.onSaveClicked`: each paper adds
+      `pages / maxload * 100` to the expert's load, capped at 100. The added pages are
+      summed per expert in NumPy, so there is one UPDATE per expert rather than per paper.
+    - Pairs that are already in `assignments` are skipped.
+    """
+    expert_ids = np.asarray(expert_ids, dtype=np.int64)
+    paper_ids = np.asarray(paper_ids, dtype=np.int64)
+    rows = list(zip(paper_ids.tolist(), expert_ids.tolist(), np.asarray(slots).tolist(), np.asarray(scores).tolist()))
+    existing = set(connection.execute('SELECT paperid, expertid FROM assignments').fetchall())
+    rows = [row for row in rows if (row[0], row[1]) not in existing]
+    if not rows:
+        return None
+    pages = dict(connection.execute('SELECT paperid, pages FROM papers').fetchall())
+    paper_pages = np.array([pages[p] for p, _, _, _ in rows], dtype=np.float64)
+    unique_experts, inverse = np.unique([e for _, e, _, _ in rows], return_inverse=True)
+    added = np.bincount(inverse, weights=paper_pages, minlength=len(unique_experts))
+    experts = unique_experts.tolist()
+    before = dict(connection.execute('SELECT expertid, load FROM expertname'))
+    first = [(e, p) for p, e, slot, _ in rows if slot == 0]
+    unassigned = {p for (p,) in connection.execute('SELECT paperid FROM papers WHERE expertid = -1')}
+
+    journal.begin(f'Save {len(rows)} reviewer assignments')
+    try:
+        connection.executemany('INSERT INTO assignments (paperid, expertid, slot, score) VALUES (?, ?, ?, ?)', rows)
+        connection.executemany('UPDATE expertname SET load = MIN(100, ROUND(load + ? * 100.0 / maxload, 2)) WHERE expertid = ?',
+                               list(zip(added.tolist(), experts)))
+        connection.executemany('UPDATE papers SET expertid = ? WHERE paperid = ? AND expertid = -1', first)
+        after = dict(connection.execute('SELECT expertid, load FROM expertname'))
+    except Exception:
+        connection.rollback()
+        journal.begin(None)
+        raise
+    for expert_id in experts:
+        if after[expert_id] != before[expert_id]:
+            journal.logLoad(expert_id, after[expert_id] - before[expert_id])
+    for paper_id, expert_id, slot, score in rows:
+        journal.logReviewer(paper_id, expert_id, slot, score)
+    for expert_id, paper_id in first:
+        if paper_id in unassigned:
+            journal.logAssignment(paper_id, -1, expert_id)
+    return journal.commit()
+
+
+def saveMatches(connection: sqlite3.Connection, journal, expert_ids, paper_ids, score=0):
+    """
+    Assigns each paper to its matched expert and adds its pages to the expert's load,
+    as one journaled transaction.
+
+    Parameters:
+    - connection (sqlite3.Connection): Open database connection.
+    - journal (journal.ChangeJournal): Journal that records the transaction.
+    - expert_ids, paper_ids (array-like): Matched pairs.
+    - score (int, optional): Total score of the pairs, stored with the transaction.
+
+    Returns:
+    - int or None: The journal transaction id, or None if nothing was saved.
+    """
+    journal.begin(f'Save {len(expert_ids)} matches')
+    try:
+        for expert_id, paper_id in zip(expert_ids, paper_ids):
+            load, max_load = connection.execute('SELECT load, maxload FROM expertname WHERE expertid = ?', (expert_id,)).fetchone()
+            pages, old_expert_id = connection.execute('SELECT pages, expertid FROM papers WHERE paperid = ?', (paper_id,)).fetchone()
+            revised_load = min(100, round(load + (pages / max_load) * 100, 2))
+            if revised_load != load:
+                connection.execute('UPDATE expertname SET load = ? WHERE expertid = ?', (revised_load, expert_id))
+                journal.logLoad(expert_id, revised_load - load)
+            connection.execute('UPDATE papers SET expertid = ? WHERE paperid = ?', (expert_id, paper_id))
+            journal.logAssignment(paper_id, old_expert_id, expert_id)
+    except Exception:
+        connection.rollback()
+        journal.begin(None)
+        raise
+    return journal.commit(score)
+
+
+def setReviewed(connection: sqlite3.Connection, journal, paper_id, reviewed: bool):
+    """
+    Marks an assigned paper as reviewed (its pages leave the expert's load) or as not
+    reviewed (the pages are added back), as one journaled transaction.
+
+    Returns:
+    - bool: True if the status changed, False if the paper is unassigned or already in that state.
+    """
+    return setReviewedPapers(connection, journal, [paper_id], reviewed) == 1
+
+
+def setReviewedPapers(connection: sqlite3.Connection, journal, paper_ids, reviewed: bool):
+    """
+    Marks many papers as reviewed or not reviewed in one journaled transaction.
+
+    Unassigned papers and papers already in that state are skipped. The pages of the
+    remaining papers are summed per reviewer in SQL, over `papers.expertid` and every
+    reviewer in `assignments`, and each reviewer's load changes once by
+    `pages / maxload * 100`, kept between 0 and 100.
+
+    Returns:
+    - int: The number of papers whose status changed.
+    """
+    new_status = int(reviewed)
+    connection.execute('CREATE TEMP TABLE IF NOT EXISTS review_batch (paperid INTEGER PRIMARY KEY)')
+    connection.execute('CREATE TEMP TABLE IF NOT EXISTS review_load (expertid INTEGER PRIMARY KEY, pages REAL)')
+    try:
+        connection.execute('DELETE FROM review_batch')
+        connection.executemany('INSERT OR IGNORE INTO review_batch (paperid) VALUES (?)', [(int(p),) for p in paper_ids])
+        connection.execute('DELETE FROM review_batch WHERE paperid NOT IN '
+                           '(SELECT paperid FROM papers WHERE expertid != -1 AND status != ?)', (new_status,))
+        changed = connection.execute('SELECT p.paperid, p.expertid, p.status FROM papers p '
+                                     'JOIN review_batch b ON b.paperid = p.paperid').fetchall()
+        if not changed:
+            connection.commit()
+            return 0
+        # Every reviewer of a paper carries its pages: the k-way reviewers in `assignments` and the
+        # single reviewer in `papers.expertid` (which is also slot 0 of a k-way paper, counted once)
+        connection.execute('DELETE FROM review_load')
+        connection.execute('''
+            INSERT INTO review_load (expertid, pages)
+            SELECT r.expertid, SUM(p.pages) FROM (
+                SELECT paperid, expertid FROM assignments WHERE paperid IN (SELECT paperid FROM review_batch)
+                UNION
+                SELECT paperid, expertid FROM papers WHERE paperid IN (SELECT paperid FROM review_batch)
+            ) r JOIN papers p ON p.paperid = r.paperid
+            GROUP BY r.expertid''')
+        experts = 'SELECT expertid FROM review_load'
+        before = dict(connection.execute(f'SELECT expertid, load FROM expertname WHERE expertid IN ({experts})'))
+        connection.execute(f'''
+            UPDATE expertname SET load = MAX(0, MIN(100, ROUND(
+                (maxload * load / 100.0 + ? * (SELECT pages FROM review_load WHERE expertid = expertname.expertid))
+                * 100.0 / maxload, 2)))
+            WHERE expertid IN ({experts})''', (-1 if reviewed else 1,))
+        connection.execute('UPDATE papers SET status = ? WHERE paperid IN (SELECT paperid FROM review_batch)', (new_status,))
+        after = connection.execute(f'SELECT expertid, load FROM expertname WHERE expertid IN ({experts})').fetchall()
+    except Exception:
+        connection.rollback()
+        raise
+    action = 'Reviewed' if reviewed else 'Not reviewed'
+    journal.begin(f'{action} paper {changed[0][0]}' if len(changed) == 1 else f'{action} {len(changed)} papers')
+    for expert_id, load in after:
+        if load != before[expert_id]:
+            journal.logLoad(expert_id, load - before[expert_id])
+    for paper_id, _, status in changed:
+        journal.logStatus(paper_id, status, new_status)
+    journal.commit()
+    return len(changed)
+
+
+def reviewersByPaper(connection: sqlite3.Connection):
+    """
+    Returns a dictionary of paper id to the list of assigned expert ids, in slot order.
+    """
+    reviewers = {}
+    for paper_id, expert_id in connection.execute('SELECT paperid, expertid FROM assignments ORDER BY paperid, slot'):
+        reviewers.setdefault(paper_id, []).append(expert_id)
+    return reviewers
@@ -0,0 +1,489 @@
+"""
+Benchmarks for the matching engines on synthetic conference-sized data.
+
+Usage:
+    python benchmark.py kway --experts 2000 --papers 6000 --reviewers 3
+    python benchmark.py records --rows 100000
+    python benchmark.py improve --size 2000 --balance 0.01 --budget 5
+    python benchmark.py auction --size 2000 --tolerance 0 --deadline 10 --workers 1
+    python benchmark.py scoring --experts 2000 --papers 6000 --repeat 3
+    python benchmark.py verify --size 10000
+    python benchmark.py checkpoint --size 2000 --interval 0.05
+    python benchmark.py robustness --experts 2500 --papers 2000 --trials 200 --workers 4
+    python benchmark.py outofcore --experts 2000 --papers 2000 --chunk 512
+    python benchmark.py gui --rows 1000 10000 100000 --budget updateMatchTable=500
+"""
+import argparse
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from scoring import encodeBatch, scoreMatrix, cooccurrenceSimilarity, SCORINGS
+from matching import kWayAssign, stableMatch, improveMatching, auctionMatch
+from records import TopicIndex, papersFromRows
+from verify import verifyMatching, verifyKWay, describeVerification
+from checkpoint import MatchCheckpoint, loadCheckpoint
+from robustness import simulateDropout, describeRobustness
+from outofcore import writePreferences, streamStableMatch
+
+
+def syntheticConference(n_experts: int, n_papers: int, n_topics: int = 40, seed: int = 0):
+    """
+    Generates random experts and papers shaped like the `expertname` and `papers` tables.
+
+    Returns:
+    - dict: expert and paper topic specs (five distinct topics each, popular topics more
+      likely), paper page counts, expert `maxload` and current `load`.
+    """
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_topics + 1)
+    popularity /= popularity.sum()
+    topics = [f'Topic {t}' for t in range(n_topics)]
+
+    def specs(n):
+        return [[topics[t] for t in rng.choice(n_topics, size=5, replace=False, p=popularity)] for _ in range(n)]
+
+    return {
+        'topics': topics,
+        'expert_spec': specs(n_experts),
+        'paper_spec': specs(n_papers),
+        'pages': rng.integers(6, 30, size=n_papers),
+        'maxload': rng.integers(60, 200, size=n_experts).astype(np.float64),
+        'load': np.zeros(n_experts),
+    }
+
+
+def benchKWay(args):
+    data = syntheticConference(args.experts, args.papers, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    start = time.perf_counter()
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    scored = time.perf_counter()
+    capacity = data['maxload'] * (100 - data['load']) / 100
+    e_idx, p_idx, score, slot, stats = kWayAssign(scores, args.reviewers, data['pages'], capacity, expert_codes[:, 0])
+    done = time.perf_counter()
+    staffed = int((np.bincount(p_idx, minlength=args.papers) == args.reviewers).sum())
+    print(f'experts={args.experts} papers={args.papers} k={args.reviewers}')
+    print(f'scoring   {scored - start:8.3f} s  {args.experts * args.papers / (scored - start):,.0f} pairs/s')
+    print(f'assign    {done - scored:8.3f} s  {stats["rounds"]} rounds, {stats["proposals"]:,} proposals')
+    print(f'total     {done - start:8.3f} s  {args.papers / (done - start):,.0f} papers/s, '
+          f'{len(e_idx) / (done - start):,.0f} slots/s')
+    print(f'filled    {len(e_idx)} slots, {staffed}/{args.papers} papers fully staffed, total score {int(score.sum())}')
+    report = verifyKWay(scores, e_idx, p_idx, args.reviewers, data['pages'], capacity, expert_codes[:, 0])
+    print(f'verified  {"stable" if report["stable"] else "NOT stable"}: {report["blocking"]} blocking pair(s), '
+          f'{report["unfilled_compatible"]} unfilled slot(s) with a compatible expert that has room, '
+          f'{report["overloaded"]} overloaded expert(s)')
+
+
+def benchImprove(args):
+    data = syntheticConference(args.size, args.size, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    start = time.perf_counter()
+    expert_match, _ = stableMatch(scores)
+    print(f'experts=papers={args.size} balance={args.balance}')
+    print(f'stable match  {time.perf_counter() - start:8.3f} s')
+    load = np.random.default_rng(args.seed).uniform(0, 60, args.size)
+
+    def report(stats):
+        print(f'  {stats["kind"]:5} {stats["moves"]:6} moves  gain {stats["gain"]:10.2f}  '
+              f'score {stats["score_gain"]:+8g}  {stats["seconds"]:7.3f} s')
+
+    _, stats = improveMatching(scores, expert_match, data['pages'], load, data['maxload'], balance=args.balance,
+                               time_budget=args.budget, cycles=not args.no_cycles, on_round=report)
+    print(f'local search  {stats["seconds"]:8.3f} s  score {stats["score_before"]:g} -> {stats["score_after"]:g}, '
+          f'load variance {stats["variance_before"]:.1f} -> {stats["variance_after"]:.1f}')
+
+
+def benchAuction(args):
+    data = syntheticConference(args.size, args.size, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    print(f'experts=papers={args.size} tolerance={args.tolerance} deadline={args.deadline} workers={args.workers}')
+    start = time.perf_counter()
+    expert_match, _ = stableMatch(scores)
+    matched = [(e, p) for e, p in enumerate(expert_match) if p >= 0]
+    print(f'stable match  {time.perf_counter() - start:8.3f} s  score {sum(scores[e, p] for e, p in matched)}')
+    expert_match, stats = auctionMatch(scores, tolerance=args.tolerance, deadline=args.deadline, workers=args.workers)
+    for phase in stats['phases']:
+        print(f'  epsilon {phase["epsilon"]:10.4f}  {phase["rounds"]:6} rounds  {phase["seconds"]:7.3f} s')
+    print(f'auction       {stats["seconds"]:8.3f} s  score {stats["primal"]}, upper bound {stats["dual"]:.1f}, '
+          f'gap {stats["gap"]:.1f} ({stats["gap"] / max(stats["dual"], 1):.3%}){" (deadline hit)" if stats["timed_out"] else ""}')
+
+
+def benchScoring(args):
+    data = syntheticConference(args.experts, args.papers, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    rng = np.random.default_rng(args.seed)
+    bids = 1 + rng.integers(-2, 3, size=(args.experts, args.papers)) / 4
+    start = time.perf_counter()
+    similarity = cooccurrenceSimilarity([expert_codes, paper_codes], n_topics)
+    pairs = args.experts * args.papers
+    print(f'experts={args.experts} papers={args.papers} repeat={args.repeat}')
+    print(f'topic similarity {n_topics}x{n_topics} from co-occurrence in {time.perf_counter() - start:.3f} s, '
+          f'{np.count_nonzero(similarity) - n_topics} related pairs')
+    for name, scoring in SCORINGS.items():
+        seconds = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            scores = scoring.kernel(expert_codes, paper_codes, n_topics, pages=data['pages'], bids=bids,
+                                    similarity=similarity)
+            seconds.append(time.perf_counter() - start)
+        best = min(seconds)
+        print(f'{name:18} {best:8.3f} s  {pairs / best:15,.0f} pairs/s  '
+              f'non-zero {np.count_nonzero(scores) / pairs:6.1%}  max {int(scores.max())}')
+
+
+def benchVerify(args):
+    data = syntheticConference(args.size, args.size, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    rng = np.random.default_rng(args.seed)
+    # Stand-ins for engine results: a random full matching and one that leaves a fifth of the experts free
+    full = rng.permutation(args.size)
+    partial = np.where(rng.random(args.size) < 0.2, -1, full)
+    print(f'experts=papers={args.size}')
+    for name, expert_match in (('random', full), ('80% matched', partial)):
+        report = verifyMatching(scores, expert_match, data['pages'], data['load'], data['maxload'], chunk=args.chunk)
+        print(f'{name:12} {report["seconds"]:8.3f} s  {describeVerification(report)}')
+
+
+def benchCheckpoint(args):
+    data = syntheticConference(args.size, args.size, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    print(f'experts=papers={args.size} interval={args.interval} s')
+    start = time.perf_counter()
+    expected = stableMatch(scores)
+    plain = time.perf_counter() - start
+    print(f'no checkpoints  {plain:8.3f} s')
+    with tempfile.TemporaryDirectory(prefix='checkpoint') as directory:
+        path = os.path.join(directory, 'match_checkpoint.npz')
+        checkpoint = MatchCheckpoint(path, scores, args.interval)
+        start = time.perf_counter()
+        result = stableMatch(scores, checkpoint=checkpoint)
+        seconds = time.perf_counter() - start
+        stats = checkpoint.stats()
+        print(f'checkpointed    {seconds:8.3f} s  {stats["count"]} checkpoint(s), {stats["mean"] * 1000:.1f} ms each, '
+              f'{stats["bytes"] / 1024:.1f} KiB, overhead {(seconds - plain) / plain:+.1%}')
+        if stats['count']:
+            # Resume from the last checkpoint as after a crash; the result must not change
+            saved, state, _ = loadCheckpoint(path)
+            start = time.perf_counter()
+            resumed = stableMatch(saved, state=state)
+            print(f'resumed         {time.perf_counter() - start:8.3f} s  from sweep {int(state["sweep"])}, expert '
+                  f'{int(state["next_expert"])}, same result: {resumed == expected == result}')
+
+
+def paperRows(data: dict, seed: int = 0):
+    """
+    The synthetic papers as `papers` table rows (paperid, desc, pages, expertid, status, expertise1..5),
+    i.e. what `cursor.fetchall()` returns.
+    """
+    rng = np.random.default_rng(seed)
+    expertid = np.where(rng.random(len(data['paper_spec'])) < 0.5, -1, 1).tolist()
+    return [(i + 1, f'Paper {i + 1} on {spec[0]}', int(pages), expertid[i], 0, *spec)
+            for i, (spec, pages) in enumerate(zip(data['paper_spec'], data['pages'].tolist()))]
+
+
+def benchRobustness(args):
+    data = syntheticConference(args.experts, args.papers, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    # The first experts hold the matching, the rest are spare reviewers
+    start = time.perf_counter()
+    expert_match, _ = stableMatch(scores[:args.papers])
+    print(f'experts={args.experts} papers={args.papers} score matrix {scores.nbytes / 2**20:.1f} MiB, '
+          f'stable match in {time.perf_counter() - start:.3f} s')
+    expert_match = np.array(expert_match + [-1] * (args.experts - args.papers), dtype=np.int64)
+    result = simulateDropout(scores, expert_match, data['pages'], data['load'], data['maxload'], trials=args.trials,
+                             seed=args.seed, max_workers=args.workers)
+    print(describeRobustness(result))
+    print(f'{result["trials"] / result["seconds"]:.1f} trials/s')
+
+
+def peakMemory(run):
+    """
+    Returns (result, peak bytes allocated while `run()` ran); memory-mapped pages are not counted.
+    Tracing slows pure Python loops down a lot, so time `run` separately.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def benchOutOfCore(args):
+    data = syntheticConference(args.experts, args.papers, seed=args.seed)
+    topic_index = {t: i for i, t in enumerate(data['topics'])}
+    expert_codes, paper_codes, n_topics = encodeBatch(data['expert_spec'], data['paper_spec'], topic_index)
+    with tempfile.TemporaryDirectory(prefix='outofcore') as directory:
+        print(f'experts={args.experts} papers={args.papers} chunk={args.chunk}')
+
+        def inMemory():
+            return stableMatch(scoreMatrix(expert_codes, paper_codes, n_topics))
+
+        def write():
+            blocks = (scoreMatrix(expert_codes[first:first + args.chunk], paper_codes, n_topics)
+                      for first in range(0, args.experts, args.chunk))
+            return writePreferences(directory, blocks, args.papers)
+
+        def report(label, run, note=''):
+            start = time.perf_counter()
+            result = run()
+            seconds = time.perf_counter() - start
+            peak = f'peak {peakMemory(run)[1] / 2**20:8.1f} MiB' if not args.no_memory else ''
+            print(f'{label:13} {seconds:8.3f} s  {peak}  {note(result) if note else ""}')
+            return result
+
+        expected = report('in memory', inMemory)
+        prefs = report('write lists', write, lambda prefs: f'{prefs.nbytes() / 2**20:.1f} MiB on disk')
+        report('stream match', lambda: streamStableMatch(prefs), lambda result: f'same result: {result == expected}')
+
+
+# Budgets of the table refresh paths in microseconds per row (`benchmark.py gui`); a refresh
+# that takes longer at any row count fails the run. Per-row budgets also catch refreshes that grow
+# faster than the table.
+GUI_BUDGETS = {
+    'updateLoadTable': 150,
+    'updatePaperTable': 150,
+    'updateSelectTable': 150,
+    'updateMatchTable': 250,
+}
+
+
+def syntheticDatabase(path: str, rows: int, seed: int = 0):
+    """
+    Writes a database with the `mydb.db` schema and `rows` synthetic experts and papers; about
+    half of the papers are assigned and half of those reviewed, so every row color path is used.
+    """
+    data = syntheticConference(rows, rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    papers = paperRows(data, seed)
+    assigned = rng.integers(1, rows + 1, size=rows).tolist()
+    reviewed = (rng.random(rows) < 0.5).tolist()
+    papers = [row[:3] + ((assigned[i], int(reviewed[i])) if row[3] != -1 else (-1, 0)) + row[5:]
+              for i, row in enumerate(papers)]
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute('CREATE TABLE expertise (expid INTEGER PRIMARY KEY AUTOINCREMENT, desc TEXT NOT NULL UNIQUE)')
+        connection.execute('''
+            CREATE TABLE expertname (
+                expertid INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, load NUMERIC DEFAULT 0,
+                maxload NUMERIC DEFAULT 100, expertise1 TEXT, expertise2 TEXT, expertise3 TEXT, expertise4 TEXT, expertise5 TEXT
+            )''')
+        connection.execute('''
+            CREATE TABLE papers (
+                paperid INTEGER PRIMARY KEY AUTOINCREMENT, desc TEXT NOT NULL UNIQUE, pages INTEGER NOT NULL,
+                expertid INTEGER DEFAULT -1, status INTEGER NOT NULL DEFAULT 0,
+                expertise1 TEXT, expertise2 TEXT, expertise3 TEXT, expertise4 TEXT, expertise5 TEXT
+            )''')
+        connection.executemany('INSERT INTO expertise (desc) VALUES (?)', [(topic,) for topic in data['topics']])
+        connection.executemany('INSERT INTO expertname VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                               [(i + 1, f'Expert {i + 1}', round(float(load), 2), int(maxload), *spec)
+                                for i, (spec, load, maxload) in enumerate(zip(data['expert_spec'], data['load'].tolist(),
+                                                                              data['maxload'].tolist()))])
+        connection.executemany('INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', papers)
+    connection.close()
+
+
+def benchGui(args):
+    # Qt is only needed here, so the other benchmarks run without a display or PyQt5
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    import main
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    budgets = dict(GUI_BUDGETS)
+    for budget in args.budget:
+        name, _, value = budget.partition('=')
+        if name not in budgets:
+            sys.exit(f'unknown budget {name!r}, expected one of {", ".join(budgets)}')
+        budgets[name] = float(value)
+    failures = []
+    print(f'platform={app.platformName()} repeat={args.repeat} budgets (us/row): '
+          + ', '.join(f'{name}={value:g}' for name, value in budgets.items()))
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory(prefix='guibench') as directory:
+            main.dbpath = os.path.join(directory, 'mydb.db')
+            syntheticDatabase(main.dbpath, rows, args.seed)
+            window = main.MainWindow()
+            window.spinBatcSize.setMaximum(rows)
+            window.spinBatcSize.setValue(rows)
+            window.free_experts, window.free_papers = window.experts, window.papers
+            ids = window.experts.ids.tolist()
+            # One make-up event of a batch of `rows` pairs, as emitted by `MainWindow.stableMatch`
+            match_list = list(zip(ids, window.papers.ids.tolist()))
+            match_score = {e: 30 for e in ids}
+            weights = {e: [9, 8, 6, 4, 3] for e in ids}
+            status = {e: '' for e in ids}
+            status[ids[0]] = 'Make-up!'
+            window.pbProgress.setMaximum(rows)
+
+            def refreshMatchTable():
+                window.tableMatchOutput.setRowCount(0)
+                window.updateMatchTable(match_list, match_score, 'thread1', weights, status, rows // 2)
+
+            refreshes = {
+                'updateLoadTable': window.updateLoadTable,
+                'updatePaperTable': window.updatePaperTable,
+                'updateSelectTable': window.updateSelectTable,
+                'updateMatchTable': refreshMatchTable,
+            }
+            for name, refresh in refreshes.items():
+                seconds = []
+                for _ in range(args.repeat):
+                    app.processEvents()
+                    start = time.perf_counter()
+                    refresh()
+                    # Paint the refreshed table as well, which is part of what the user waits for
+                    app.processEvents()
+                    seconds.append(time.perf_counter() - start)
+                best = min(seconds)
+                per_row = best / rows * 1e6
+                verdict = 'ok' if per_row <= budgets[name] else 'OVER BUDGET'
+                if verdict != 'ok':
+                    failures.append(f'{name} at {rows} rows')
+                print(f'rows={rows:<7} {name:18} {best:9.3f} s  {per_row:8.1f} us/row  {verdict}')
+            window.close()
+            window.connection.close()
+            window.deleteLater()
+            app.processEvents()
+    if failures:
+        sys.exit(f'over budget: {", ".join(failures)}')
+
+
+def measure(build):
+    """
+    Returns (result, bytes still allocated by `build()` when it returns, seconds).
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def benchRecords(args):
+    data = syntheticConference(1, args.rows, seed=args.seed)
+    topics = TopicIndex(enumerate(data['topics'], start=1))
+
+    def asLists():
+        # What the GUI used to keep: the fetched rows plus parallel id and topic lists
+        rows = paperRows(data, args.seed)
+        free_paper = [row for row in rows if row[3] == -1]
+        return rows, free_paper, [row[0] for row in free_paper], [list(row[5:10]) for row in free_paper]
+
+    def asRecords():
+        papers = papersFromRows(paperRows(data, args.seed), topics)
+        return papers, papers[papers.data['expertid'] == -1]
+
+    lists, list_bytes, list_time = measure(asLists)
+    del lists
+    records, record_bytes, record_time = measure(asRecords)
+    papers = records[0]
+    text_bytes = sum(len(title) + 49 for title in papers.titles) + 8 * len(papers)
+    print(f'papers={args.rows}')
+    print(f'tuples+lists  {list_bytes / 2**20:8.1f} MiB  {list_bytes / args.rows:6.0f} B/row  {list_time:6.3f} s')
+    print(f'records       {record_bytes / 2**20:8.1f} MiB  {record_bytes / args.rows:6.0f} B/row  {record_time:6.3f} s')
+    print(f'  of which structured array {papers.nbytes() / 2**20:.1f} MiB ({papers.data.itemsize} B/row), '
+          f'descriptions ~{text_bytes / 2**20:.1f} MiB')
+    print(f'saved         {(list_bytes - record_bytes) / 2**20:8.1f} MiB ({1 - record_bytes / list_bytes:.0%})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    kway = commands.add_parser('kway', help='k-reviewers-per-paper assignment throughput')
+    kway.add_argument('--experts', type=int, default=2000)
+    kway.add_argument('--papers', type=int, default=6000)
+    kway.add_argument('--reviewers', type=int, default=3)
+    kway.add_argument('--seed', type=int, default=0)
+    kway.set_defaults(func=benchKWay)
+
+    improve = commands.add_parser('improve', help='local search after a stable match')
+    improve.add_argument('--size', type=int, default=2000)
+    improve.add_argument('--balance', type=float, default=0.01)
+    improve.add_argument('--budget', type=float, default=5.0)
+    improve.add_argument('--no-cycles', action='store_true')
+    improve.add_argument('--seed', type=int, default=0)
+    improve.set_defaults(func=benchImprove)
+
+    auction = commands.add_parser('auction', help='auction matcher with epsilon scaling vs. stable match')
+    auction.add_argument('--size', type=int, default=2000)
+    auction.add_argument('--tolerance', type=float, default=0.0)
+    auction.add_argument('--deadline', type=float, default=None)
+    auction.add_argument('--workers', type=int, default=1)
+    auction.add_argument('--seed', type=int, default=0)
+    auction.set_defaults(func=benchAuction)
+
+    scoring = commands.add_parser('scoring', help='pairs/s of every scoring function')
+    scoring.add_argument('--experts', type=int, default=2000)
+    scoring.add_argument('--papers', type=int, default=6000)
+    scoring.add_argument('--repeat', type=int, default=3)
+    scoring.add_argument('--seed', type=int, default=0)
+    scoring.set_defaults(func=benchScoring)
+
+    verify = commands.add_parser('verify', help='stability and quality check of a matching')
+    verify.add_argument('--size', type=int, default=10000)
+    verify.add_argument('--chunk', type=int, default=1024)
+    verify.add_argument('--seed', type=int, default=0)
+    verify.set_defaults(func=benchVerify)
+
+    checkpoint = commands.add_parser('checkpoint', help='cost of checkpointing a stable match and resuming it')
+    checkpoint.add_argument('--size', type=int, default=2000)
+    checkpoint.add_argument('--interval', type=float, default=0.05)
+    checkpoint.add_argument('--seed', type=int, default=0)
+    checkpoint.set_defaults(func=benchCheckpoint)
+
+    robustness = commands.add_parser('robustness', help='Monte Carlo reviewer dropout simulation in a process pool')
+    robustness.add_argument('--experts', type=int, default=2500)
+    robustness.add_argument('--papers', type=int, default=2000)
+    robustness.add_argument('--trials', type=int, default=200)
+    robustness.add_argument('--workers', type=int, default=None)
+    robustness.add_argument('--seed', type=int, default=0)
+    robustness.set_defaults(func=benchRobustness)
+
+    outofcore = commands.add_parser('outofcore', help='stable match on memory-mapped preference lists vs. in memory')
+    outofcore.add_argument('--experts', type=int, default=2000)
+    outofcore.add_argument('--papers', type=int, default=2000)
+    outofcore.add_argument('--chunk', type=int, default=512)
+    outofcore.add_argument('--no-memory', action='store_true', help='skip the (slow) traced runs for peak memory')
+    outofcore.add_argument('--seed', type=int, default=0)
+    outofcore.set_defaults(func=benchOutOfCore)
+
+    gui = commands.add_parser('gui', help='latency of the table refresh paths of the GUI (offscreen), with budgets')
+    gui.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    gui.add_argument('--repeat', type=int, default=1)
+    gui.add_argument('--budget', action='append', default=[], metavar='METHOD=US_PER_ROW',
+                     help='override a budget of GUI_BUDGETS, e.g. updateMatchTable=500')
+    gui.add_argument('--seed', type=int, default=0)
+    gui.set_defaults(func=benchGui)
+
+    records = commands.add_parser('records', help='memory of paper records vs. row tuples and parallel lists')
+    records.add_argument('--rows', type=int, default=100000)
+    records.add_argument('--seed', type=int, default=0)
+    records.set_defaults(func=benchRecords)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Periodic checkpoints of a running `matching.stableMatch`, so a long run can be resumed
+after a crash or after the window was closed.
+
+A checkpoint is two files:
+
+- `<path>.scores.npy`: the score matrix of the batch, written once on the first checkpoint
+  (so a resumed run sees exactly the same scores even if the database changed since),
+- `<path>`: the matcher state (`np.savez`, uncompressed): who holds which paper, the
+  current scores, the sweep number and the next expert of the sweep, plus the batch ids
+  and labels the caller passes as metadata and the values of its `extra` callback (e.g.
+  how many events of the run are in the event log). It is a few bytes per expert and paper.
+
+The state file is written to a temporary file, synced to disk and moved over the previous
+one with `os.replace` (and the directory is synced where the platform allows it), so a crash
+or power loss while writing leaves the last complete checkpoint in place.
+"""
+import os
+import time
+import numpy as np
+
+STATE_KEYS = ('expert_match', 'paper_match', 'expert_score', 'sweep', 'next_expert', 'changed', 'matched')
+
+
+def scoresPath(path: str):
+    return path + '.scores.npy'
+
+
+class MatchCheckpoint:
+    """
+    Writes the state of one matching run at most every `interval` seconds and measures the cost.
+
+    Usage:
+        checkpoint = MatchCheckpoint('match_checkpoint.npz', scores, interval=5.0,
+                                     meta={'expert_ids': experts.ids, 'paper_ids': papers.ids})
+        stableMatch(scores, checkpoint=checkpoint)
+        checkpoint.discard()  # the run finished, nothing to resume
+
+    `extra`, if given, is called right before every save and returns further values to store
+    with the state (read back with the metadata by `loadCheckpoint`).
+
+    Attributes:
+    ----------
+    count : int
+        Number of checkpoints written.
+    seconds : float
+        Total time spent writing them (including the one-off score matrix).
+    bytes : int
+        Size of the last state file.
+    """
+    def __init__(self, path: str, scores: np.ndarray, interval: float = 5.0, meta: dict = None, extra=None):
+        self.path = path
+        self.scores = scores
+        self.interval = interval
+        self.meta = {key: np.asarray(value) for key, value in (meta or {}).items()}
+        self.extra = extra
+        self.last = time.perf_counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.scores_written = False
+
+    def due(self):
+        """
+        True if `interval` seconds have passed since the last checkpoint (or the start).
+        """
+        return time.perf_counter() - self.last >= self.interval
+
+    def save(self, **state):
+        """
+        Writes `state` (the `STATE_KEYS` of `stableMatch`) and the metadata atomically.
+        """
+        start = time.perf_counter()
+        if not self.scores_written:
+            writeAtomic(scoresPath(self.path), lambda file: np.save(file, self.scores))
+            self.scores_written = True
+        arrays = {key: np.asarray(value, dtype=np.int64) for key, value in state.items()}
+        extra = {key: np.asarray(value) for key, value in (self.extra() if self.extra else {}).items()}
+        writeAtomic(self.path, lambda file: np.savez(file, **arrays, **self.meta, **extra))
+        self.bytes = os.path.getsize(self.path)
+        self.count += 1
+        self.last = time.perf_counter()
+        self.seconds += self.last - start
+
+    def stats(self):
+        """
+        Returns the count, total and mean seconds and the state size of the checkpoints so far.
+        """
+        return {'count': self.count, 'seconds': self.seconds, 'mean': self.seconds / self.count if self.count else 0.0,
+                'bytes': self.bytes}
+
+    def discard(self):
+        """
+        Removes the checkpoint files once the run no longer needs to be resumed.
+        """
+        discardCheckpoint(self.path)
+
+
+def writeAtomic(path: str, write):
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        write(file)
+        # The data must be on disk before the rename is, or a power loss can keep the rename without it
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    syncDirectory(os.path.dirname(os.path.abspath(path)))
+
+
+def syncDirectory(directory: str):
+    """
+    Makes a rename in `directory` durable. Windows cannot open directories and needs no such sync.
+    """
+    if os.name == 'nt':
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def loadCheckpoint(path: str):
+    """
+    Reads a checkpoint written by `MatchCheckpoint`.
+
+    Returns:
+    - tuple: (scores, state, meta). `state` can be passed to `stableMatch(scores, state=state)`
+      to continue the run; `meta` holds the metadata arrays given to `MatchCheckpoint`.
+    """
+    scores = np.load(scoresPath(path))
+    with np.load(path) as data:
+        state = {key: data[key] for key in STATE_KEYS}
+        meta = {key: data[key] for key in data.files if key not in STATE_KEYS}
+    return scores, state, meta
+
+
+def discardCheckpoint(path: str):
+    for name in (path, scoresPath(path), path + '.tmp', scoresPath(path) + '.tmp'):
+        if os.path.exists(name):
+            os.remove(name)
@@ -0,0 +1,197 @@
+"""
+Side-by-side comparison of selection and matching strategies.
+
+A snapshot of the database is taken once in the GUI and every strategy runs on
+that same snapshot in its own worker process. Nothing is written to the database;
+the caller decides which result (if any) to keep.
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import os
+import sqlite3
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scoring import scoreTables, cooccurrenceSimilarity
+from matching import stableMatch, kWayAssign, improveMatching, auctionMatch
+from verify import verifyMatching
+from records import TopicIndex, ExpertTable, PaperTable, loadExperts, loadPapers
+from selection import greedySelect, nonGreedySelect
+
+
+def takeSnapshot(connection: sqlite3.Connection, topics: TopicIndex, constraints, similarity: np.ndarray = None):
+    """
+    Reads everything the strategies need from the database.
+
+    Returns:
+    - dict: All experts and papers as compact record tables, the number of topic codes, the
+      constraint store and the topic similarity matrix (`similarity`, or derived from topic
+      co-occurrence if None). The dictionary is picklable, so it can be sent to worker processes as is.
+    """
+    experts = loadExperts(connection, topics)
+    papers = loadPapers(connection, topics)
+    if similarity is None:
+        similarity = cooccurrenceSimilarity([experts.data['topics'], papers.data['topics']], len(topics))
+    return {'experts': experts, 'papers': papers, 'n_topics': len(topics), 'constraints': constraints,
+            'similarity': similarity}
+
+
+def selectGreedy(snapshot: dict, params: dict):
+    return greedySelect(snapshot['experts'], snapshot['papers'])
+
+
+def selectNonGreedy(snapshot: dict, params: dict):
+    return nonGreedySelect(snapshot['experts'], snapshot['papers'], params['expert_depth'], params['paper_depth'])
+
+
+def matchStable(scores: np.ndarray, experts: ExpertTable, papers: PaperTable, params: dict):
+    expert_match, _ = stableMatch(scores)
+    return np.asarray(expert_match, dtype=np.int64)
+
+
+def matchStableDualThread(scores: np.ndarray, experts: ExpertTable, papers: PaperTable, params: dict):
+    """
+    The "Dual Thread" mode of the GUI: each half of the batch is matched on its own.
+    """
+    mid = len(experts) // 2
+    first, _ = stableMatch(scores[:mid, :mid])
+    second, _ = stableMatch(scores[mid:, mid:])
+    return np.asarray(first + [p + mid if p >= 0 else -1 for p in second], dtype=np.int64)
+
+
+def matchDeferredAcceptance(scores: np.ndarray, experts: ExpertTable, papers: PaperTable, params: dict):
+    """
+    Paper-proposing deferred acceptance, one paper per expert (`kWayAssign` with k=1).
+    """
+    n_experts, n_papers = scores.shape
+    e_idx, p_idx, _, _, _ = kWayAssign(scores, 1, np.ones(n_papers), np.ones(n_experts))
+    expert_match = np.full(n_experts, -1, dtype=np.int64)
+    expert_match[e_idx] = p_idx
+    return expert_match
+
+
+def matchStableLocalSearch(scores: np.ndarray, experts: ExpertTable, papers: PaperTable, params: dict):
+    """
+    Stable match followed by `improveMatching` (2-swaps and 3-cycles) with the `balance` and
+    `time_budget` params (defaults 0.01 and 1 s).
+    """
+    expert_match = matchStable(scores, experts, papers, params)
+    improved, _ = improveMatching(scores, expert_match, papers.data['pages'], experts.data['load'], experts.data['maxload'],
+                                  balance=params.get('balance', 0.01), time_budget=params.get('time_budget', 1.0), cycles=True)
+    return improved
+
+
+def matchAuction(scores: np.ndarray, experts: ExpertTable, papers: PaperTable, params: dict):
+    """
+    Maximum-score assignment by `auctionMatch`, with the `tolerance` and `deadline` params (defaults exact, 10 s).
+    """
+    expert_match, _ = auctionMatch(scores, tolerance=params.get('tolerance', 0.0), deadline=params.get('deadline', 10.0))
+    return expert_match
+
+
+SELECTIONS = {
+    'Greedy': selectGreedy,
+    'Non-Greedy': selectNonGreedy,
+}
+
+MATCHERS = {
+    'Stable': matchStable,
+    'Stable (dual thread)': matchStableDualThread,
+    'Deferred Acceptance': matchDeferredAcceptance,
+    'Stable + Local Search': matchStableLocalSearch,
+    'Auction': matchAuction,
+}
+
+
+def runStrategy(snapshot: dict, selection: str, matcher: str, params: dict):
+    """
+    Runs one selection + matching strategy on a snapshot and measures the result.
+
+    Parameters:
+    - snapshot (dict): Output of `takeSnapshot`, optionally with the full masked score matrix
+      of all experts x papers under `'scores'`.
+    - selection (str): Key of `SELECTIONS`.
+    - matcher (str): Key of `MATCHERS`.
+    - params (dict): `batch_size`, `expert_depth` and `paper_depth` from the GUI spin boxes, and
+      optionally `scoring` (a key of `scoring.SCORINGS`, default 'Positional').
+
+    Returns:
+    - dict: Strategy name, chosen pairs (`expert_ids`, `paper_ids`, `scores`), the selected `experts`
+      and `papers` tables, the metrics `total_score`, `assigned`, `load_variance` (of the batch experts'
+      loads after saving, as in the verification report), `violations` (blocking pairs) and `wall_time`,
+      and the full `verify.verifyMatching` report of the batch under `verification`.
+    """
+    start = time.perf_counter()
+    experts, papers = SELECTIONS[selection](snapshot, params)
+    length = min(len(experts), len(papers), params['batch_size'])
+    experts, papers = experts[:length], papers[:length]
+    scoring = params.get('scoring', 'Positional')
+    if snapshot.get('scores') is not None and snapshot.get('scoring', 'Positional') == scoring and scoring != 'Pages-Normalized':
+        # Warm snapshot (see `service.py`): the full masked score matrix is already there
+        # (pages-normalized scores depend on the batch, so they are always recomputed)
+        rows = snapshot['experts'].rowOf(experts.ids)
+        cols = snapshot['papers'].rowOf(papers.ids)
+        scores = snapshot['scores'][np.ix_(rows, cols)]
+    else:
+        scores = scoreTables(experts, papers, snapshot['n_topics'], snapshot['constraints'], scoring,
+                             snapshot.get('similarity'))
+    expert_match = MATCHERS[matcher](scores, experts, papers, params)
+    wall_time = time.perf_counter() - start
+
+    matched = np.flatnonzero(expert_match >= 0)
+    pair_scores = scores[matched, expert_match[matched]]
+    verification = verifyMatching(scores, expert_match, papers.data['pages'], experts.data['load'], experts.data['maxload'])
+
+    return {
+        'name': f'{selection} + {matcher}',
+        'scoring': scoring,
+        'experts': experts,
+        'papers': papers,
+        'expert_ids': experts.ids[matched].tolist(),
+        'paper_ids': papers.ids[expert_match[matched]].tolist(),
+        'scores': pair_scores.tolist(),
+        'total_score': int(pair_scores.sum()),
+        'assigned': len(matched),
+        'load_variance': verification['load_variance'],
+        'violations': verification['blocking'],
+        'wall_time': wall_time,
+        'verification': verification,
+    }
+
+
+def compareStrategies(snapshot: dict, params: dict, on_result=None, max_workers=None):
+    """
+    Runs every selection x matcher combination in parallel worker processes.
+
+    Parameters:
+    - snapshot (dict): Output of `takeSnapshot`.
+    - params (dict): Parameters passed to `runStrategy`.
+    - on_result (Callable, optional): Called with each result dict as soon as its worker finishes
+      (from a background thread); a failed strategy is reported as `{'name': ..., 'error': ...}`.
+      If omitted, the call blocks and returns all results.
+    - max_workers (int, optional): Number of worker processes, defaults to one per strategy up to the CPU count.
+
+    Returns:
+    - list: Result dicts in strategy order if `on_result` is None, otherwise the list of futures.
+    """
+    strategies = [(selection, matcher) for selection in SELECTIONS for matcher in MATCHERS]
+    workers = max_workers or min(len(strategies), os.cpu_count() or 1)
+    # Spawned workers do not inherit the Qt state of the GUI process
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    futures = [executor.submit(runStrategy, snapshot, selection, matcher, params) for selection, matcher in strategies]
+    if on_result is None:
+        results = [future.result() for future in futures]
+        executor.shutdown()
+        return results
+
+    def report(name, future):
+        if future.exception() is not None:
+            on_result({'name': name, 'error': str(future.exception())})
+        else:
+            on_result(future.result())
+
+    for (selection, matcher), future in zip(strategies, futures):
+        future.add_done_callback(lambda done, name=f'{selection} + {matcher}': report(name, done))
+    executor.shutdown(wait=False)
+    return futures
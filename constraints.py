@@ -0,0 +1,203 @@
+"""
+Conflict-of-interest constraints for expert-paper matching.
+
+Exclusions are kept as flat NumPy id arrays and compiled into a boolean mask over
+the (experts x papers) score matrix of a batch. Masked pairs get a score of 0, which
+the matchers already treat as "not compatible", so no per-pair checks are needed
+inside the matching loops.
+
+Reviewer bids are kept in the same store. They do not exclude pairs; the bid-weighted
+scoring function (`scoring.SCORINGS`) scales scores by `bidFactors`.
+"""
+import sqlite3
+import numpy as np
+from records import lookupPositions
+
+REASONS = ('affiliation', 'coauthor', 'bid')
+
+# Bid levels from -2 (rather not) to 2 (eager); a pair without a bid counts as 0
+BID_LEVELS = range(-2, 3)
+
+
+def ensureSchema(connection: sqlite3.Connection):
+    """
+    Creates the `conflicts` and `affiliations` tables if they do not exist yet.
+
+    - `conflicts` holds explicit expert-paper exclusions (co-authorship, bids to avoid).
+    - `affiliations` holds the institutions of experts and of paper authors; an expert
+      conflicts with every paper that shares one of their affiliations.
+    - `bids` holds the bid level (-2 to 2) of an expert for a paper.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS conflicts (
+            expertid INTEGER NOT NULL,
+            paperid INTEGER NOT NULL,
+            reason TEXT NOT NULL DEFAULT 'coauthor',
+            PRIMARY KEY (expertid, paperid, reason)
+        )''')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS affiliations (
+            kind TEXT NOT NULL CHECK (kind IN ('expert', 'paper')),
+            id INTEGER NOT NULL,
+            affiliation TEXT NOT NULL
+        )''')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS bids (
+            expertid INTEGER NOT NULL,
+            paperid INTEGER NOT NULL,
+            bid INTEGER NOT NULL CHECK (bid BETWEEN -2 AND 2),
+            PRIMARY KEY (expertid, paperid)
+        )''')
+    connection.commit()
+
+
+class ConstraintStore:
+    """
+    In-memory store of expert-paper exclusions.
+
+    Attributes:
+    ----------
+    pair_expert, pair_paper : np.ndarray
+        Expert and paper ids of explicit conflict pairs.
+    pair_reason : np.ndarray
+        Index into `REASONS` for each explicit pair.
+    expert_affiliation, paper_affiliation : tuple of np.ndarray
+        (ids, affiliation codes) for experts and papers. A record may have several rows.
+    affiliation_codes : dict
+        Mapping of affiliation name to integer code.
+    bid_expert, bid_paper, bid_level : np.ndarray
+        Expert id, paper id and bid level of every bid.
+    """
+    def __init__(self):
+        self.pair_expert = np.empty(0, dtype=np.int64)
+        self.pair_paper = np.empty(0, dtype=np.int64)
+        self.pair_reason = np.empty(0, dtype=np.int8)
+        self.expert_affiliation = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.paper_affiliation = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.affiliation_codes = {}
+        self.bid_expert = np.empty(0, dtype=np.int64)
+        self.bid_paper = np.empty(0, dtype=np.int64)
+        self.bid_level = np.empty(0, dtype=np.int8)
+
+    @classmethod
+    def load(cls, connection: sqlite3.Connection):
+        """
+        Builds a store from the `conflicts` and `affiliations` tables.
+        """
+        store = cls()
+        rows = connection.execute('SELECT expertid, paperid, reason FROM conflicts').fetchall()
+        if rows:
+            expert_ids, paper_ids, reasons = zip(*rows)
+            store.addConflicts(expert_ids, paper_ids, reasons)
+        for kind in ('expert', 'paper'):
+            rows = connection.execute('SELECT id, affiliation FROM affiliations WHERE kind = ?', (kind,)).fetchall()
+            if rows:
+                ids, names = zip(*rows)
+                store.addAffiliations(kind, ids, names)
+        rows = connection.execute('SELECT expertid, paperid, bid FROM bids').fetchall()
+        if rows:
+            store.addBids(*zip(*rows))
+        return store
+
+    def addConflicts(self, expert_ids, paper_ids, reason='coauthor'):
+        """
+        Adds explicit exclusions.
+
+        Parameters:
+        - expert_ids (array-like): Expert ids.
+        - paper_ids (array-like): Paper ids, same length as `expert_ids`.
+        - reason (str or list of str): One of `REASONS`, either shared or one per pair.
+        """
+        expert_ids = np.asarray(expert_ids, dtype=np.int64)
+        paper_ids = np.asarray(paper_ids, dtype=np.int64)
+        if isinstance(reason, str):
+            reason_codes = np.full(len(expert_ids), REASONS.index(reason), dtype=np.int8)
+        else:
+            reason_codes = np.array([REASONS.index(r) for r in reason], dtype=np.int8)
+        self.pair_expert = np.concatenate([self.pair_expert, expert_ids])
+        self.pair_paper = np.concatenate([self.pair_paper, paper_ids])
+        self.pair_reason = np.concatenate([self.pair_reason, reason_codes])
+
+    def addAffiliations(self, kind: str, ids, affiliations):
+        """
+        Adds affiliation rows for experts (`kind='expert'`) or papers (`kind='paper'`).
+        """
+        codes = np.array([self.affiliation_codes.setdefault(a, len(self.affiliation_codes)) for a in affiliations],
+                         dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        current_ids, current_codes = self.expert_affiliation if kind == 'expert' else self.paper_affiliation
+        merged = (np.concatenate([current_ids, ids]), np.concatenate([current_codes, codes]))
+        if kind == 'expert':
+            self.expert_affiliation = merged
+        else:
+            self.paper_affiliation = merged
+
+    def addBids(self, expert_ids, paper_ids, levels):
+        """
+        Adds bids; `levels` are in `BID_LEVELS`.
+        """
+        self.bid_expert = np.concatenate([self.bid_expert, np.asarray(expert_ids, dtype=np.int64)])
+        self.bid_paper = np.concatenate([self.bid_paper, np.asarray(paper_ids, dtype=np.int64)])
+        self.bid_level = np.concatenate([self.bid_level, np.asarray(levels, dtype=np.int8)])
+
+    def bidFactors(self, expert_ids, paper_ids):
+        """
+        Returns the (experts x papers) float matrix `1 + bid / 4`: 0.5 for -2, 1.0 without a bid, 1.5 for 2.
+        """
+        factors = np.ones((len(expert_ids), len(paper_ids)))
+        rows = lookupPositions(expert_ids, self.bid_expert)
+        cols = lookupPositions(paper_ids, self.bid_paper)
+        hit = (rows >= 0) & (cols >= 0)
+        factors[rows[hit], cols[hit]] = 1 + self.bid_level[hit] / 4
+        return factors
+
+    def compileMask(self, expert_ids, paper_ids):
+        """
+        Compiles all exclusions that touch this batch into a boolean mask.
+
+        Parameters:
+        - expert_ids (array-like): Expert ids in the row order of the score matrix.
+        - paper_ids (array-like): Paper ids in the column order of the score matrix.
+
+        Returns:
+        - np.ndarray: bool matrix of shape (experts, papers); True marks an excluded pair.
+
+        Notes:
+        - Explicit pairs are mapped to matrix positions with one sorted search per side.
+        - Affiliation conflicts are expanded with a sort-merge join on the affiliation code,
+          restricted to the records in the batch, so the cost grows with the batch and the
+          number of conflicts rather than with all experts times all papers.
+        """
+        mask = np.zeros((len(expert_ids), len(paper_ids)), dtype=bool)
+
+        rows = lookupPositions(expert_ids, self.pair_expert)
+        cols = lookupPositions(paper_ids, self.pair_paper)
+        hit = (rows >= 0) & (cols >= 0)
+        mask[rows[hit], cols[hit]] = True
+
+        e_ids, e_codes = self.expert_affiliation
+        p_ids, p_codes = self.paper_affiliation
+        e_pos = lookupPositions(expert_ids, e_ids)
+        p_pos = lookupPositions(paper_ids, p_ids)
+        e_pos, e_codes = e_pos[e_pos >= 0], e_codes[e_pos >= 0]
+        p_pos, p_codes = p_pos[p_pos >= 0], p_codes[p_pos >= 0]
+        if len(e_pos) and len(p_pos):
+            order = np.argsort(p_codes, kind='stable')
+            p_pos, p_codes = p_pos[order], p_codes[order]
+            lo = np.searchsorted(p_codes, e_codes, side='left')
+            hi = np.searchsorted(p_codes, e_codes, side='right')
+            counts = hi - lo
+            total = int(counts.sum())
+            if total:
+                starts = np.cumsum(counts) - counts
+                offsets = np.arange(total) - np.repeat(starts, counts) + np.repeat(lo, counts)
+                mask[np.repeat(e_pos, counts), p_pos[offsets]] = True
+        return mask
+
+    def apply(self, scores: np.ndarray, expert_ids, paper_ids):
+        """
+        Zeroes the score of every excluded pair in place and returns the matrix.
+        """
+        if len(self.pair_expert) or len(self.expert_affiliation[0]):
+            scores[self.compileMask(expert_ids, paper_ids)] = 0
+        return scores
@@ -0,0 +1,169 @@
+"""
+Append-only binary log of the make-up/break-up events of `matching.stableMatch`.
+
+Each event is one fixed-width 32-byte record (`EVENT_DTYPE`) after a 16-byte header,
+so the file can be memory-mapped as a NumPy array and any event found by offset.
+Readers only touch the pages they look at, which keeps millions of events on disk
+instead of in RAM or table widgets.
+"""
+import os
+import threading
+import numpy as np
+
+MAGIC = b'MATCHEV1'
+HEADER_SIZE = 16
+
+MAKE_UP, BREAK_UP = 0, 1
+STATUS_NAMES = ('Make-up!', 'Break-up!')
+
+EVENT_DTYPE = np.dtype([
+    ('seq', '<i8'),
+    ('expert', '<i4'),
+    ('paper', '<i4'),
+    ('score', '<i4'),
+    ('weights', '<i2', (5,)),
+    ('status', 'i1'),
+    ('thread', 'i1'),
+])
+
+
+class EventLogWriter:
+    """
+    Appends events to a log file; safe to share between matching threads.
+
+    Events are buffered as tuples and converted and written in chunks of `chunk`
+    records, so logging costs no per-event system call or array write.
+
+    Usage:
+        log = EventLogWriter('match_events.bin')
+        log.append(expert_id, paper_id, score, weights, MAKE_UP, thread=1)
+        log.close()
+    """
+    def __init__(self, path: str, truncate: bool = True, chunk: int = 4096):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'wb' if truncate else 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC + EVENT_DTYPE.itemsize.to_bytes(8, 'little'))
+        self.seq = (self.file.tell() - HEADER_SIZE) // EVENT_DTYPE.itemsize
+        self.chunk = chunk
+        self.pending = []
+
+    def append(self, expert: int, paper: int, score: int, weights, status: int, thread: int = 0):
+        with self.lock:
+            self.pending.append((self.seq, expert, paper, score, tuple(weights), status, thread))
+            self.seq += 1
+            if len(self.pending) == self.chunk:
+                self.flushLocked()
+
+    def flushLocked(self):
+        if self.pending:
+            self.file.write(np.array(self.pending, dtype=EVENT_DTYPE).tobytes())
+            self.pending = []
+
+    def flush(self):
+        with self.lock:
+            self.flushLocked()
+            self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def keepEvents(path: str, counts: dict):
+    """
+    Cuts a log back to the first `counts[thread]` events of every thread (none of threads not in
+    `counts`), e.g. to the events covered by the checkpoints a run is resumed from, so the events
+    the resumed run writes again are not in the log twice. Sequence numbers are renumbered.
+
+    If the kept events are a prefix of the log, the file is just truncated; otherwise it is rewritten.
+    """
+    log = EventLog(path)
+    if len(log) == 0:
+        return
+    thread = np.asarray(log.events['thread'], dtype=np.int64)
+    # Position of every event among the events of its thread
+    order = np.argsort(thread, kind='stable')
+    sorted_thread = thread[order]
+    rank = np.empty(len(thread), dtype=np.int64)
+    rank[order] = np.arange(len(thread)) - np.searchsorted(sorted_thread, sorted_thread, side='left')
+    limit = np.zeros(int(thread.max()) + 1, dtype=np.int64)
+    for key, count in counts.items():
+        if 0 <= key < len(limit):
+            limit[key] = count
+    keep = rank < limit[thread]
+    kept = int(keep.sum())
+    if keep[:kept].all():
+        del log
+        with open(path, 'r+b') as file:
+            file.truncate(HEADER_SIZE + kept * EVENT_DTYPE.itemsize)
+        return
+    events = np.array(log.events[keep])
+    del log
+    events['seq'] = np.arange(len(events))
+    with open(path, 'wb') as file:
+        file.write(MAGIC + EVENT_DTYPE.itemsize.to_bytes(8, 'little'))
+        file.write(events.tobytes())
+
+
+class EventLog:
+    """
+    Read-only, memory-mapped view of an event log.
+
+    Indexing returns records straight from the mapping (an int gives one record, a slice a
+    record array); nothing is read until it is accessed. Call `refresh` to see events
+    appended after the log was opened.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.events = np.zeros(0, dtype=EVENT_DTYPE)
+        self.refresh()
+
+    def refresh(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        count = max(0, (size - HEADER_SIZE) // EVENT_DTYPE.itemsize)
+        if count == 0:
+            self.events = np.zeros(0, dtype=EVENT_DTYPE)
+            return
+        with open(self.path, 'rb') as file:
+            header = file.read(HEADER_SIZE)
+        if header[:8] != MAGIC or int.from_bytes(header[8:], 'little') != EVENT_DTYPE.itemsize:
+            raise ValueError(f'{self.path} is not a match event log')
+        self.events = np.memmap(self.path, dtype=EVENT_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+    def __len__(self):
+        return len(self.events)
+
+    def __getitem__(self, index):
+        return self.events[index]
+
+    def find(self, expert: int = None, paper: int = None):
+        """
+        Returns the positions of the events of one expert and/or paper.
+        """
+        mask = np.ones(len(self.events), dtype=bool)
+        if expert is not None:
+            mask &= self.events['expert'] == expert
+        if paper is not None:
+            mask &= self.events['paper'] == paper
+        return np.flatnonzero(mask)
+
+    def stateAt(self, position: int):
+        """
+        Replays the events up to and including `position`.
+
+        Returns:
+        - tuple: (expert_ids, paper_ids, scores) of the pairs matched at that point; an
+          expert's state is decided by their last event (make-up holds, break-up frees).
+        """
+        events = self.events[:position + 1]
+        if len(events) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        # Last event of every expert: unique over the reversed prefix
+        experts, last = np.unique(events['expert'][::-1], return_index=True)
+        last = len(events) - 1 - last
+        held = events['status'][last] == MAKE_UP
+        last = last[held]
+        return experts[held], events['paper'][last], events['score'][last]
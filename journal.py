@@ -0,0 +1,194 @@
+"""
+Append-only change journal with undo, redo and point-in-time restore.
+
+Every save or review action is recorded as one transaction in `journal_txn` and its
+individual changes in `journal`:
+
+- `load` entries store the change of `expertname.load` as a delta, so undo/redo can be
+  applied on top of whatever the other rows look like at that point.
+- `expertid` and `status` entries store the old and new value of the paper column.
+- `assignment` entries record a row added to the `assignments` junction table (paper, expert,
+  slot and score); undo deletes the row again and redo re-inserts it.
+
+Undo and redo touch only the rows recorded in one transaction (O(delta)); nothing is
+rewritten table-wide.
+"""
+import sqlite3
+import time
+
+# States of a transaction in `journal_txn.undone`
+APPLIED, UNDONE, DISCARDED = 0, 1, 2
+
+
+def ensureSchema(connection: sqlite3.Connection):
+    """
+    Creates the `journal_txn` and `journal` tables if they do not exist yet.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS journal_txn (
+            txn INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL,
+            created REAL NOT NULL,
+            score INTEGER NOT NULL DEFAULT 0,
+            undone INTEGER NOT NULL DEFAULT 0
+        )''')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            txn INTEGER NOT NULL REFERENCES journal_txn (txn),
+            kind TEXT NOT NULL CHECK (kind IN ('load', 'expertid', 'status', 'assignment')),
+            entity INTEGER NOT NULL,
+            old REAL,
+            new REAL,
+            score INTEGER
+        )''')
+    connection.execute('CREATE INDEX IF NOT EXISTS journal_by_txn ON journal (txn)')
+    connection.commit()
+
+
+class ChangeJournal:
+    """
+    Records changes made through the GUI and replays them backwards or forwards.
+
+    Usage:
+        journal.begin('Save 10 matches')
+        journal.logLoad(expert_id, delta)
+        journal.logAssignment(paper_id, old_expert_id, new_expert_id)
+        journal.logReviewer(paper_id, expert_id, slot, score)
+        journal.commit(score)
+    """
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.label = None
+        self.entries = []
+
+    def begin(self, label: str):
+        """
+        Starts buffering a new transaction.
+        """
+        self.label = label
+        self.entries = []
+
+    def logLoad(self, expert_id, delta):
+        self.entries.append(('load', int(expert_id), None, float(delta), None))
+
+    def logAssignment(self, paper_id, old_expert_id, new_expert_id):
+        self.entries.append(('expertid', int(paper_id), int(old_expert_id), int(new_expert_id), None))
+
+    def logStatus(self, paper_id, old_status, new_status):
+        self.entries.append(('status', int(paper_id), int(old_status), int(new_status), None))
+
+    def logReviewer(self, paper_id, expert_id, slot, score):
+        """
+        Records a row added to the `assignments` junction table.
+        """
+        self.entries.append(('assignment', int(paper_id), int(expert_id), int(slot), int(score)))
+
+    def commit(self, score=0):
+        """
+        Appends the buffered transaction and commits the database.
+
+        A new transaction makes the currently undone ones unreachable for redo, as in
+        any editor, so they are marked as discarded.
+
+        Returns:
+        - int or None: The id of the new transaction, or None if nothing was logged.
+        """
+        if not self.entries:
+            self.connection.commit()
+            return None
+        with self.connection:
+            self.connection.execute('UPDATE journal_txn SET undone = ? WHERE undone = ?', (DISCARDED, UNDONE))
+            txn = self.connection.execute('INSERT INTO journal_txn (label, created, score) VALUES (?, ?, ?)',
+                                          (self.label, time.time(), score)).lastrowid
+            self.connection.executemany('INSERT INTO journal (txn, kind, entity, old, new, score) VALUES (?, ?, ?, ?, ?, ?)',
+                                        [(txn, *entry) for entry in self.entries])
+        self.entries = []
+        return txn
+
+    def discardAll(self):
+        """
+        Makes every recorded transaction unreachable, e.g. after a global reset.
+        """
+        with self.connection:
+            self.connection.execute('UPDATE journal_txn SET undone = ? WHERE undone != ?', (DISCARDED, DISCARDED))
+
+    def history(self):
+        """
+        Returns (txn, label, created, score, undone) for every reachable transaction, oldest first.
+        """
+        return self.connection.execute('SELECT txn, label, created, score, undone FROM journal_txn '
+                                       'WHERE undone != ? ORDER BY txn', (DISCARDED,)).fetchall()
+
+    def replay(self, txn: int, forward: bool):
+        """
+        Applies (`forward=True`) or reverts the changes of one transaction.
+        """
+        rows = self.connection.execute('SELECT kind, entity, old, new, score FROM journal WHERE txn = ? ORDER BY seq',
+                                       (txn,)).fetchall()
+        if not forward:
+            rows.reverse()
+        sign = 1 if forward else -1
+        loads = [(sign * new, entity) for kind, entity, old, new, _ in rows if kind == 'load']
+        experts = [((new if forward else old), entity) for kind, entity, old, new, _ in rows if kind == 'expertid']
+        statuses = [((new if forward else old), entity) for kind, entity, old, new, _ in rows if kind == 'status']
+        reviewers = [(entity, int(old), int(new), score) for kind, entity, old, new, score in rows if kind == 'assignment']
+        with self.connection:
+            if forward:
+                self.connection.executemany('INSERT OR REPLACE INTO assignments (paperid, expertid, slot, score) '
+                                            'VALUES (?, ?, ?, ?)', reviewers)
+            else:
+                self.connection.executemany('DELETE FROM assignments WHERE paperid = ? AND expertid = ?',
+                                            [(paper_id, expert_id) for paper_id, expert_id, _, _ in reviewers])
+            self.connection.executemany('UPDATE expertname SET load = MAX(0, MIN(100, ROUND(load + ?, 2))) '
+                                        'WHERE expertid = ?', loads)
+            self.connection.executemany('UPDATE papers SET expertid = ? WHERE paperid = ?', experts)
+            self.connection.executemany('UPDATE papers SET status = ? WHERE paperid = ?', statuses)
+            self.connection.execute('UPDATE journal_txn SET undone = ? WHERE txn = ?', (APPLIED if forward else UNDONE, txn))
+
+    def undo(self):
+        """
+        Reverts the most recent applied transaction.
+
+        Returns:
+        - tuple or None: (txn, label, score) of the reverted transaction, or None if there is nothing to undo.
+        """
+        row = self.connection.execute('SELECT txn, label, score FROM journal_txn WHERE undone = ? '
+                                      'ORDER BY txn DESC LIMIT 1', (APPLIED,)).fetchone()
+        if row:
+            self.replay(row[0], forward=False)
+        return row
+
+    def redo(self):
+        """
+        Re-applies the oldest undone transaction.
+
+        Returns:
+        - tuple or None: (txn, label, score) of the re-applied transaction, or None if there is nothing to redo.
+        """
+        row = self.connection.execute('SELECT txn, label, score FROM journal_txn WHERE undone = ? '
+                                      'ORDER BY txn ASC LIMIT 1', (UNDONE,)).fetchone()
+        if row:
+            self.replay(row[0], forward=True)
+        return row
+
+    def restore(self, txn: int):
+        """
+        Brings the database to the state right after transaction `txn` (0 = before the first one)
+        by undoing or redoing only the transactions in between.
+
+        Returns:
+        - int: The change of the total score caused by the transactions that were undone or redone.
+        """
+        score_change = 0
+        while True:
+            last = self.connection.execute('SELECT MAX(txn) FROM journal_txn WHERE undone = ?', (APPLIED,)).fetchone()[0]
+            if last is None or last <= txn:
+                break
+            score_change -= self.undo()[2]
+        while True:
+            following = self.connection.execute('SELECT MIN(txn) FROM journal_txn WHERE undone = ?', (UNDONE,)).fetchone()[0]
+            if following is None or following > txn:
+                break
+            score_change += self.redo()[2]
+        return score_change
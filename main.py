@@ -1,4 +1,6 @@
 import sys
+import os
+import glob
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
@@ -8,8 +10,40 @@ import numpy as np
 import threading
 import time
 from main_gui import Ui_mainWindow
+from scoring import SCORINGS, scoreTables, cooccurrenceSimilarity, loadSimilarity
+from constraints import ConstraintStore, ensureSchema as ensureConstraintSchema
+from matching import kWayAssign, stableMatch, improveMatching
+from assignments import saveAssignments, saveMatches, setReviewedPapers, reviewersByPaper, ensureSchema as ensureAssignmentSchema
+from journal import ChangeJournal, ensureSchema as ensureJournalSchema
+from compare import takeSnapshot, compareStrategies, SELECTIONS, MATCHERS
+from verify import verifyMatching, describeVerification
+from tracks import runTracks, combineResults, trackName
+from robustness import simulateDropout, describeRobustness
+from memo import MatchCache, runKey, describeCache
+from records import TopicIndex, ExpertTable, PaperTable, EXPERT_DTYPE, PAPER_DTYPE, loadExperts, loadPapers
+from selection import greedySelect, nonGreedySelect
+from eventlog import EventLog, EventLogWriter, keepEvents, MAKE_UP, BREAK_UP, STATUS_NAMES
+from checkpoint import MatchCheckpoint, loadCheckpoint, discardCheckpoint
+from service import connectService
 
 dbpath = 'mydb.db'
+# Make-up/break-up events beyond this many per run go only to the event log, not to `tableMatchOutput`
+LIVE_EVENT_LIMIT = 2000
+# Seconds the Improve button may spend on local search
+IMPROVE_TIME_BUDGET = 2.0
+# Optional `topic_a,topic_b,similarity` file next to the database; without it topic
+# similarity is derived from co-occurrence in the expert and paper records
+SIMILARITY_FILE = 'topic_similarity.csv'
+# Seconds between checkpoints of a running Stable Match (one file per thread next to the database)
+CHECKPOINT_INTERVAL = 5.0
+# Perturbed re-matchings run by the Robustness button
+ROBUSTNESS_TRIALS = 200
+# Stable Match results kept for identical re-runs, and their total pickled size
+RUN_CACHE_ENTRIES = 32
+RUN_CACHE_BYTES = 16 * 2**20
+# Address of a running `service.py` (`host:port` or a Unix socket path); if set, Select, Stable Match,
+# Save and Reviewed go through the service instead of computing and writing in this process
+SERVICE_ADDRESS = os.environ.get('MATCHING_SERVICE')
 
 class ReturnableThread(threading.Thread):
     """
@@ -39,44 +73,344 @@ class ReturnableThread(threading.Thread):
     def run(self) -> None:
         self.result = self.target()
 
+class EventLogModel(QAbstractTableModel):
+    """
+    Table model over a memory-mapped `eventlog.EventLog`.
+
+    The view asks only for the rows it shows, so the model reads those records from the
+    mapping on demand and a log of millions of events costs no widgets.
+    """
+    COLUMNS = ['Seq', 'Expert ID', 'Paper ID', 'Score', 'W1', 'W2', 'W3', 'W4', 'W5', 'Status', 'Thread']
+
+    def __init__(self, log: EventLog, parent=None):
+        super(EventLogModel, self).__init__(parent)
+        self.log = log
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.log)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        event = self.log[index.row()]
+        col = index.column()
+        if col < 4:
+            return str(event[('seq', 'expert', 'paper', 'score')[col]])
+        if col < 9:
+            return str(event['weights'][col - 4])
+        if col == 9:
+            return STATUS_NAMES[event['status']]
+        return f'thread{event["thread"]}'
+
+
+class EventLogDialog(QDialog):
+    """
+    Replay viewer for the event log written by `MainWindow.stableMatch`.
+
+    The slider scrubs through the run; the table jumps to the event and the label shows
+    the matching as it stood at that point (replayed by `EventLog.stateAt`).
+    """
+    def __init__(self, log: EventLog, parent=None):
+        super(EventLogDialog, self).__init__(parent)
+        self.setWindowTitle(f'Event Log - {len(log)} events')
+        self.log = log
+        self.model = EventLogModel(log, self)
+        self.view = QTableView(self)
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.view.verticalHeader().setVisible(False)
+        # Fixed row heights keep the view from measuring every row of a long log
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.slider = QSlider(Qt.Horizontal, self)
+        self.slider.setRange(0, max(0, len(log) - 1))
+        self.label = QLabel(self)
+        self.slider.valueChanged.connect(self.scrubTo)
+        self.view.clicked.connect(lambda index: self.slider.setValue(index.row()))
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttons.rejected.connect(self.reject)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+        layout.addWidget(self.slider)
+        layout.addWidget(self.label)
+        layout.addWidget(buttons)
+        self.resize(900, 500)
+        self.scrubTo(0)
+
+    def scrubTo(self, position: int):
+        if len(self.log) == 0:
+            self.label.setText('No events recorded. Run Stable Match first.')
+            return
+        self.view.selectRow(position)
+        self.view.scrollTo(self.model.index(position, 0), QAbstractItemView.PositionAtCenter)
+        experts, papers, scores = self.log.stateAt(position)
+        self.label.setText(f'Event {position + 1} of {len(self.log)}: {len(experts)} papers matched, '
+                           f'total score {int(scores.sum())}')
+
+
+class TracksDialog(QDialog):
+    """
+    Combined view of a multi-track run (`tracks.runTracks`).
+
+    Every track database is selected and matched in its own worker process against one global
+    capacity ledger; the table shows the progress and result of each track as it arrives and
+    the label below it the totals over all tracks. Rows are keyed by the track's path. Papers whose
+    expert has no global capacity left are re-matched within the track; those that still find
+    nobody stay unassigned for a later run ('Left for Capacity').
+    """
+    COLUMNS = ['Track', 'Progress', 'Experts', 'Papers', 'Assigned', 'Total Score', 'Re-matched', 'Left for Capacity',
+               'Wall Time (s)']
+    progressReady = pyqtSignal(str, str, float)
+    resultReady = pyqtSignal(dict)
+
+    def __init__(self, params: dict, parent=None):
+        super(TracksDialog, self).__init__(parent)
+        self.setWindowTitle('Multi-Track Matching')
+        self.params = params
+        self.paths = []
+        self.results = []
+        self.cbSelection = QComboBox(self)
+        self.cbSelection.addItems(list(SELECTIONS))
+        self.cbMatcher = QComboBox(self)
+        self.cbMatcher.addItems(list(MATCHERS))
+        self.cbSave = QCheckBox('Save to track databases', self)
+        self.btnAdd = QPushButton('Add Tracks...', self)
+        self.btnRun = QPushButton('Run', self)
+        self.btnRun.setEnabled(False)
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.label = QLabel(self)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttons.rejected.connect(self.reject)
+        options = QHBoxLayout()
+        for widget in (self.cbSelection, self.cbMatcher, self.cbSave, self.btnAdd, self.btnRun):
+            options.addWidget(widget)
+        layout = QVBoxLayout(self)
+        layout.addLayout(options)
+        layout.addWidget(self.table)
+        layout.addWidget(self.label)
+        layout.addWidget(buttons)
+        self.btnAdd.clicked.connect(self.onAddClicked)
+        self.btnRun.clicked.connect(self.onRunClicked)
+        self.progressReady.connect(self.setProgress)
+        self.resultReady.connect(self.addResult)
+        self.resize(1000, 360)
+
+    def onAddClicked(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, 'Track Databases', '', 'SQLite databases (*.db);;All files (*)')
+        self.addTracks(paths)
+
+    def addTracks(self, paths: list):
+        for path in paths:
+            if path in self.paths:
+                continue
+            row = len(self.paths)
+            name = trackName(path)
+            if any(trackName(other) == name for other in self.paths):
+                # Same file name in another folder
+                name = os.path.join(os.path.basename(os.path.dirname(path)), name)
+            self.paths.append(path)
+            self.table.insertRow(row)
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.item(row, 0).setToolTip(path)
+            bar = QProgressBar(self.table)
+            bar.setRange(0, 100)
+            bar.setValue(0)
+            self.table.setCellWidget(row, 1, bar)
+        self.btnRun.setEnabled(bool(self.paths))
+        self.table.resizeColumnsToContents()
+
+    def onRunClicked(self):
+        self.results = []
+        self.btnRun.setEnabled(False)
+        self.btnAdd.setEnabled(False)
+        self.label.setText(f'Running {len(self.paths)} tracks...')
+        for row in range(len(self.paths)):
+            self.table.cellWidget(row, 1).setValue(0)
+            self.table.cellWidget(row, 1).setFormat('%p%')
+        runTracks(self.paths, self.cbSelection.currentText(), self.cbMatcher.currentText(), self.params,
+                  save=self.cbSave.isChecked(), on_progress=self.progressReady.emit, on_result=self.resultReady.emit)
+
+    def rowOfTrack(self, path: str):
+        return self.paths.index(path) if path in self.paths else -1
+
+    def setProgress(self, path: str, stage: str, fraction: float):
+        row = self.rowOfTrack(path)
+        if row >= 0:
+            bar = self.table.cellWidget(row, 1)
+            bar.setValue(int(fraction * 100))
+            bar.setFormat(stage)
+
+    def addResult(self, result: dict):
+        self.results.append(result)
+        row = self.rowOfTrack(result['path'])
+        if 'error' in result:
+            self.table.cellWidget(row, 1).setFormat('failed')
+            self.table.setItem(row, 2, QTableWidgetItem(f'Failed: {result["error"]}'))
+        else:
+            values = [result['experts'], result['papers'], result['assigned'], result['total_score'],
+                      result['reassigned'], result['capacity_conflicts'], f'{result["wall_time"]:.3f}']
+            for col, value in enumerate(values, start=2):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.table.resizeColumnsToContents()
+        totals = combineResults(self.results)
+        self.label.setText(f'{totals["tracks"]}/{len(self.paths)} tracks done ({totals["failed"]} failed): '
+                           f'total score {totals["total_score"]}, {totals["assigned"]} papers assigned, '
+                           f'{totals["reassigned"]} re-matched and {totals["capacity_conflicts"]} left unassigned for '
+                           f'global capacity, slowest track {totals["wall_time"]:.3f} s')
+        if len(self.results) == len(self.paths):
+            self.btnRun.setEnabled(True)
+            self.btnAdd.setEnabled(True)
+
+
+class CompareDialog(QDialog):
+    """
+    Result table of the strategy comparison started by `MainWindow.onCompareClicked`.
+
+    Rows are added by `addResult` as the worker processes finish, so the dialog stays
+    responsive while slower strategies are still running. Nothing is written to the
+    database; `selectedResult` returns the row the user chose to keep.
+    """
+    COLUMNS = ['Strategy', 'Total Score', 'Papers Assigned', 'Load Variance', 'Stability Violations', 'Wall Time (s)']
+
+    def __init__(self, parent=None):
+        super(CompareDialog, self).__init__(parent)
+        self.setWindowTitle('Compare Strategies')
+        self.results = []
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeaderItem(self.COLUMNS.index('Load Variance')).setToolTip(
+            'Variance of the loads of the experts in the batch after saving, as in the verification report')
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        self.btnUse = self.buttons.addButton('Use Selected', QDialogButtonBox.AcceptRole)
+        self.btnUse.setEnabled(False)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        self.table.itemSelectionChanged.connect(lambda: self.btnUse.setEnabled(self.selectedResult() is not None))
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addWidget(self.buttons)
+        self.resize(900, 320)
+
+    def addResult(self, result: dict):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.results.append(result)
+        self.table.setItem(row, 0, QTableWidgetItem(result['name']))
+        if 'error' in result:
+            self.table.setItem(row, 1, QTableWidgetItem(f'Failed: {result["error"]}'))
+        else:
+            values = [result['total_score'], result['assigned'], f'{result["load_variance"]:.2f}',
+                      result['violations'], f'{result["wall_time"]:.3f}']
+            for col, value in enumerate(values, start=1):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.table.resizeColumnsToContents()
+
+    def selectedResult(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.results) and 'error' not in self.results[row]:
+            return self.results[row]
+        return None
+
 class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
     resultsReady = pyqtSignal(list, dict, str, dict, dict, int)
+    compareResultReady = pyqtSignal(dict)
     def __init__(self, *args, obj=None, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
         self.showMaximized()
         self.connection = sqlite3.connect(dbpath)
+        ensureConstraintSchema(self.connection)
+        ensureAssignmentSchema(self.connection)
+        ensureJournalSchema(self.connection)
+        self.journal = ChangeJournal(self.connection)
+        self.constraints = ConstraintStore.load(self.connection)
+        self.event_log_path = os.path.join(os.path.dirname(os.path.abspath(dbpath)), 'match_events.bin')
+        self.checkpoint_pattern = os.path.join(os.path.dirname(os.path.abspath(dbpath)), 'match_checkpoint.{}.npz')
+        self.checkpoints = {}
+        self.run_cache = MatchCache(RUN_CACHE_ENTRIES, RUN_CACHE_BYTES)
+        self.service = connectService(SERVICE_ADDRESS) if SERVICE_ADDRESS else None
+        self.selection = 'Greedy'
+        self.topics = TopicIndex(self.executeQuery('SELECT * FROM expertise'))
         self.setupUi(self)
+        self.cbScoring.addItems(list(SCORINGS))
+        self.scoring = 'Positional'
         self.check_list = []
-        self.paper_details = []
-        self.expert_details = []
-        self.free_expert_id = []
-        self.free_expert_spec = []
-        self.free_paper_id = []
-        self.free_paper_spec = []
-        self.expert_id = []
-        self.expert_name = []
+        self.experts = ExpertTable(np.zeros(0, dtype=EXPERT_DTYPE), [])
+        self.papers = PaperTable(np.zeros(0, dtype=PAPER_DTYPE), [])
+        self.free_experts = self.experts
+        self.free_papers = self.papers
+        self.match_experts = self.experts
+        self.match_papers = self.papers
         self.expert_match_list = []
         self.totalScore = 0
+        self.reviewer_assignment = None
+        self.verification = None
+        # Write generation of the loaded records and the background precompute of the next selection
+        self.generation = 0
+        self.precompute_lock = threading.Lock()
+        self.precompute_thread = None
+        self.precompute_generation = -1
+        self.precomputed = None
+        self.candidate_scores = None
         self.btnReviewed.setEnabled(False)
         self.btnNotReviewed.setEnabled(False)
         self.updateLoadTable()
         self.updatePaperTable()
+        self.similarity = self.loadTopicSimilarity()
         self.mutex = True
         
         self.resultsReady.connect(self.updateMatchTable)
         self.btnReset.clicked.connect(self.onResetClicked)
         self.btnStableMatch.clicked.connect(self.onStableMatchClicked)
+        self.btnCompare.clicked.connect(self.onCompareClicked)
+        self.btnImprove.clicked.connect(self.onImproveClicked)
+        self.btnTracks.clicked.connect(self.onTracksClicked)
+        self.btnEventLog.clicked.connect(self.onEventLogClicked)
+        self.btnRobustness.clicked.connect(self.onRobustnessClicked)
         self.btnGreedySelect.clicked.connect(self.onGreedySelectClicked)
         self.btnNonGreedySelect.clicked.connect(self.onNonGreedySelectClicked)
         self.btnSave.clicked.connect(self.onSaveClicked)
+        self.btnAssignReviewers.clicked.connect(self.onAssignReviewersClicked)
+        self.btnSaveReviewers.clicked.connect(self.onSaveReviewersClicked)
         self.tableMatchOutput.cellClicked.connect(self.onMatchTableCellClicked)
-        self.tablePapers.cellClicked.connect(self.onPapersTableClicked)
+        self.tablePapers.itemSelectionChanged.connect(self.onPapersSelectionChanged)
         self.btnReviewed.clicked.connect(self.onReviewedClicked)
         self.btnNotReviewed.clicked.connect(self.onNotReviewedClicked)
+        self.btnUndo.clicked.connect(self.onUndoClicked)
+        self.btnRedo.clicked.connect(self.onRedoClicked)
+        self.btnHistory.clicked.connect(self.onHistoryClicked)
+        self.offerResume()
     
+    def loadTopicSimilarity(self):
+        """
+        Returns the topic similarity matrix used by the 'Topic Similarity' scoring function:
+        read from `SIMILARITY_FILE` next to the database if it exists, otherwise derived from
+        the co-occurrence of topics in all experts and papers.
+        """
+        path = os.path.join(os.path.dirname(os.path.abspath(dbpath)), SIMILARITY_FILE)
+        if os.path.exists(path):
+            return loadSimilarity(path, self.topics)
+        return cooccurrenceSimilarity([self.experts.data['topics'], self.papers.data['topics']], len(self.topics))
+
     def closeEvent(self, event):
         self.connection.commit()
         self.connection.close()
+        if self.service is not None:
+            self.service.close()
     
     def executeQuery(self, query, params=None, fetch_all=True, commit=False):
         """
@@ -111,16 +445,18 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         finally:
             cursor.close()
     
-    def stableMatch(self, expert: list, expert_spec: list[list], paper: list, paper_spec: list[list], thread_name: str):
+    def stableMatch(self, experts: ExpertTable, papers: PaperTable, thread_name: str, scores: np.ndarray = None,
+                    state: dict = None, logged: int = 0):
         """
         Implements a stable matching algorithm to match experts with papers based on their compatibility scores.
 
         Parameters:
-        - expert (list): A list of experts to be matched.
-        - expert_spec (list): A list of specifications for each expert. Each entry corresponds to an expert in `expert`.
-        - paper (list): A list of papers to be matched.
-        - paper_spec (list): A list of specifications for each paper. Each entry corresponds to a paper in `paper`.
+        - experts (ExpertTable): The experts to be matched.
+        - papers (PaperTable): The papers to be matched.
         - thread_name (str): The name of the thread, used for tracking and updating match progress in a multi-threaded environment.
+        - scores (np.ndarray, optional): Scores of the batch, computed here if None.
+        - state (dict, optional): Matcher state of a checkpoint to continue from (see `offerResume`).
+        - logged (int, optional): Events of this thread already in the event log (those covered by that checkpoint).
 
         Returns:
         - tuple: A tuple containing:
@@ -128,54 +464,82 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
             - score_list (dict): A dictionary containing the match score for each expert, with unmatched experts having a score of 0.
 
         Notes:
-        - The method initializes each expert and paper as "free" (unmatched) and iteratively scores pairs to find optimal matches.
-        - Calls `self.matchScore()` to compute compatibility scores between an expert's specifications and a paper's specifications.
-        - Calls `self.updateMatchTable()` to update the match table UI or log as progress is made.
+        - The matching itself is done by `matching.stableMatch()`; this method maps its make-up/break-up events back to
+          expert and paper ids and emits them to the match table.
+        - Scores the whole batch up front with the scoring function `self.scoring` (`scoring.scoreTables()`, from
+          the integer topic codes of the records), and zeroes excluded pairs through `self.constraints`, so conflicts of
+          interest are never matched. The weight columns show the function's breakdown of each score.
+        - Calls `self.updateMatchTable()` to update the match table UI as progress is made, for the first
+          `LIVE_EVENT_LIMIT` events; every event is also appended to `self.event_log` for `EventLogDialog`.
         - Updates a progress bar (`self.pbProgress`) based on the current number of matched experts.
         - Implements a mechanism to handle situations where a new, higher score allows for rematching, ensuring each expert-paper pair is matched optimally.
+        - Checkpoints the matcher state every `CHECKPOINT_INTERVAL` seconds (`checkpoint.MatchCheckpoint`), so an
+          interrupted run can be resumed the next time the application starts. Each checkpoint flushes the event
+          log first and stores how many events of this thread it covers.
         """
+        # Score the whole batch at once and mask out conflicts of interest
+        expert_codes = experts.data['topics']
+        paper_codes = papers.data['topics']
+        scoring = SCORINGS[self.scoring]
+        if scores is None:
+            scores = scoreTables(experts, papers, len(self.topics), self.constraints, self.scoring, self.similarity)
+        records = [logged]
+
+        def loggedEvents():
+            # Every event the checkpoint covers must be in the file before the checkpoint is
+            self.event_log.flush()
+            return {'events': records[0]}
+
+        checkpoint = MatchCheckpoint(self.checkpoint_pattern.format(thread_name), scores, CHECKPOINT_INTERVAL,
+                                     dict(self.checkpoint_meta, thread=thread_name), loggedEvents)
+        self.checkpoints[thread_name] = checkpoint
+        expert = experts.ids.tolist()
+        paper = papers.ids.tolist()
+
         # Initialize all lists and dictionaries
         expert_match = {e: 'free' for e in expert}
-        paper_match = {p: 'free' for p in paper}
         score_list = {e: 0 for e in expert}
-        status = {e: '' for e in expert}
         initial_score = [0 for w in range(5)]
         score_weights_list = {e: initial_score for e in expert}
         score_list['free'] = 0
-        length_match_values = len(list(paper_match.values()))
-        
-        self.pbProgress.setMaximum(length_match_values - 1)
-        progress = 0
-        while 'free' in paper_match.values():
-            for e in expert:
-                for p in paper:
-                    status = {e: '' for e in expert}
-                    score, score_weights = self.matchScore(expert_spec[expert.index(e)], paper_spec[paper.index(p)])
-                    if score > 0 and expert_match[e] == 'free' and paper_match[p] == 'free':
-                        expert_match[e] = p
-                        paper_match[p] = e
-                        score_list[e] = score
-                        score_weights_list[e] = score_weights
-                        status[e] = 'Make-up!'
-                        self.resultsReady.emit(list(expert_match.items()), score_list.copy(), thread_name, score_weights_list.copy(), status.copy(), progress)
-                    elif score > score_list[e]:
-                        if score > score_list[paper_match[p]]:
-                            prev_e_match = expert_match[e]
-                            prev_p_match = paper_match[p]
-                            expert_match[e] = p
-                            paper_match[p] = e
-                            score_list[e] = score
-                            score_weights_list[e] = score_weights
-                            status[e] = 'Make-up!'
-                            if prev_e_match != 'free': 
-                                paper_match[prev_e_match] = 'free'
-                            if prev_p_match != 'free': 
-                                score_list[prev_p_match] = 0
-                                score_weights_list[prev_p_match] = initial_score
-                                status[prev_p_match] = 'Break-up!'
-                                expert_match[prev_p_match] = 'free'
-                            self.resultsReady.emit(list(expert_match.items()).copy(), score_list.copy(), thread_name, score_weights_list.copy(), status.copy(), progress)
-                    progress = length_match_values - list(expert_match.values()).count('free')
+        if state is not None:
+            # Pairs held when the checkpoint was taken
+            for ei, (pi, score) in enumerate(zip(state['expert_match'].tolist(), state['expert_score'].tolist())):
+                if pi >= 0:
+                    expert_match[expert[ei]] = paper[pi]
+                    score_list[expert[ei]] = score
+                    score_weights_list[expert[ei]] = scoring.weights(expert_codes[ei], paper_codes[pi], score, self.similarity)
+        self.pbProgress.setMaximum(len(paper) - 1)
+        thread = int(thread_name[-1]) if thread_name[-1].isdigit() else 0
+        events = [0]
+
+        def onEvent(ei, pi, score, broken, matched):
+            # Mirror every make-up/break-up of the engine into the dictionaries shown in the match table
+            e = expert[ei]
+            expert_match[e] = paper[pi]
+            score_list[e] = score
+            score_weights_list[e] = scoring.weights(expert_codes[ei], paper_codes[pi], score, self.similarity)
+            self.event_log.append(e, paper[pi], score, score_weights_list[e], MAKE_UP, thread)
+            records[0] += 1
+            if broken >= 0:
+                expert_match[expert[broken]] = 'free'
+                score_list[expert[broken]] = 0
+                score_weights_list[expert[broken]] = initial_score
+                self.event_log.append(expert[broken], paper[pi], 0, initial_score, BREAK_UP, thread)
+                records[0] += 1
+            events[0] += 1
+            if events[0] <= LIVE_EVENT_LIMIT:
+                # The per-expert status column is only built for the events shown live
+                status = {other: '' for other in expert}
+                status[e] = 'Make-up!'
+                if broken >= 0:
+                    status[expert[broken]] = 'Break-up!'
+                self.resultsReady.emit(list(expert_match.items()), score_list.copy(), thread_name, score_weights_list.copy(), status, matched)
+            elif events[0] % 1000 == 0:
+                # Past the limit only the progress bar is updated; the full story is in the event log
+                self.resultsReady.emit([], {}, thread_name, {}, {}, matched)
+
+        stableMatch(scores, onEvent, checkpoint=checkpoint, state=state)
         return expert_match, score_list
     
     def setColortoRow(self, table: QTableWidget, rowIndex: int, color: QColor, alpha=None):
@@ -243,6 +607,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         """
         self.pbProgress.setValue(progress)
         color = self.randomLightColor()  # Generate a random light color for row backgrounds
+        weight_max = SCORINGS[self.scoring].weight_max
         
         for row in range(len(match_list)):
             self.tableMatchOutput.insertRow(0)  # Insert a new row at the top
@@ -258,9 +623,9 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
                 weight = score_weights_list[int(match_list[row][0])][col - 5]
                 self.tableMatchOutput.setItem(0, col, QTableWidgetItem(str(weight)))
             
-            # Scale alpha based on weight values: lighter for low weight, darker for high weight
+            # Scale alpha based on weight values relative to the largest weight of the scoring function
             alpha = [70, 70, 70, 70, 70] + [
-                int((weight / 25) * 200) for weight in score_weights_list[int(match_list[row][0])]
+                min(255, int((weight / weight_max) * 200)) for weight in score_weights_list[int(match_list[row][0])]
             ] + [70]
             # Alpha values now range from 100 (lightest) to 30 (darkest) based on weight scaling            
             self.setColortoRow(self.tableMatchOutput, 0, color, alpha)
@@ -271,35 +636,32 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         Updates `tableLoadTable` with data from the `expertname` table, applying
         color to rows based on a percentage value.
 
-        Retrieves data from the database, clears existing rows, and sets new rows
-        with `expert_details`. Each row's background color is set based on the
+        Reloads `experts` from the database, clears existing rows, and sets new rows
+        from its records. Each row's background color is set based on the
         percentage value in column 2.
 
         Attributes:
         ----------
-        expert_id : list
-            Stores expert IDs extracted from the database.
-        expert_name : list
-            Stores expert names extracted from the database.
+        experts : ExpertTable
+            All experts, used to look up names and loads by id.
         """
-        # Clear table and local lists
+        # Clear table and reload experts
         self.tableLoadTable.setRowCount(0)
-        expert_details = np.array(self.executeQuery('SELECT * FROM expertname'))
-        self.expert_id.clear()
-        self.expert_name.clear()
+        self.invalidatePrecompute()
+        self.experts = loadExperts(self.connection, self.topics)
+        data = self.experts.data
         
         # Populate table with new data
-        for row, data in enumerate(expert_details):
-            self.expert_id.append(int(data[0]))
-            self.expert_name.append(str(data[1]))
+        for row in range(len(self.experts)):
             self.tableLoadTable.insertRow(row)
-            
-            for col in range(9):  # Assuming there are 9 columns
-                item = QTableWidgetItem(str(data[col]))
+            values = [data['id'][row], self.experts.names[row], f'{data["load"][row]:g}', f'{data["maxload"][row]:g}']
+            values += [self.topics.name(code) for code in data['topics'][row].tolist()]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
                 self.tableLoadTable.setItem(row, col, item)
             
             # Apply color based on percentage value in column 2
-            percent = int(float(data[2]))
+            percent = int(data['load'][row])
             color = QColor(255, 0, 0, percent)
             self.setColortoRow(self.tableLoadTable, row, color)
         
@@ -312,36 +674,42 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         Clears existing rows in the table and populates it with new data retrieved 
         from the database. Each row displays information about papers, including 
         assignment and review status. Rows are color-coded based on the review status.
+        Papers with several reviewers (see `onAssignReviewersClicked`) list all of them
+        in the tooltip of the 'Expert Assigned' cell.
 
         Attributes:
         ----------
-        paper_details : np.ndarray
-            An array containing the details of the papers retrieved from the database.
+        papers : PaperTable
+            All papers, in the row order of `tablePapers`.
         """
-        # Clear the table and reset paper details
+        # Clear the table and reload papers
         self.tablePapers.setRowCount(0)
-        paper_details = np.array(self.executeQuery('SELECT * FROM papers'))
-        self.paper_details = paper_details
+        self.invalidatePrecompute()
+        self.papers = loadPapers(self.connection, self.topics)
+        data = self.papers.data
+        reviewers = reviewersByPaper(self.connection)
+        expert_rows = self.experts.rowOf(data['expertid'])
 
         # Populate table with paper details
-        for row, data in enumerate(paper_details):
+        for row in range(len(self.papers)):
             self.tablePapers.insertRow(row)
 
             # Set items in each column
-            self.tablePapers.setItem(row, 0, QTableWidgetItem(str(data[0])))
-            self.tablePapers.setItem(row, 1, QTableWidgetItem('Not Assigned' if int(data[3]) == -1 
-                                                                else self.expert_name[self.expert_id.index(int(data[3]))]))
-            self.tablePapers.setItem(row, 2, QTableWidgetItem('Not Reviewed' if int(data[4]) == 0 else 'Reviewed'))
-            self.tablePapers.setItem(row, 3, QTableWidgetItem(str(data[2])))
-            self.tablePapers.setItem(row, 4, QTableWidgetItem(str(data[1])))
-            self.tablePapers.setItem(row, 5, QTableWidgetItem(str(data[5])))
-            self.tablePapers.setItem(row, 6, QTableWidgetItem(str(data[6])))
-            self.tablePapers.setItem(row, 7, QTableWidgetItem(str(data[7])))
-            self.tablePapers.setItem(row, 8, QTableWidgetItem(str(data[8])))
-            self.tablePapers.setItem(row, 9, QTableWidgetItem(str(data[9])))
+            paper_id = int(data['id'][row])
+            self.tablePapers.setItem(row, 0, QTableWidgetItem(str(paper_id)))
+            self.tablePapers.setItem(row, 1, QTableWidgetItem('Not Assigned' if expert_rows[row] < 0
+                                                                else self.experts.names[expert_rows[row]]))
+            self.tablePapers.setItem(row, 2, QTableWidgetItem('Not Reviewed' if data['status'][row] == 0 else 'Reviewed'))
+            self.tablePapers.setItem(row, 3, QTableWidgetItem(str(data['pages'][row])))
+            self.tablePapers.setItem(row, 4, QTableWidgetItem(self.papers.titles[row]))
+            for col, code in enumerate(data['topics'][row].tolist(), start=5):
+                self.tablePapers.setItem(row, col, QTableWidgetItem(self.topics.name(code)))
+            if paper_id in reviewers:
+                names = [self.experts.names[r] for r in self.experts.rowOf(reviewers[paper_id]) if r >= 0]
+                self.tablePapers.item(row, 1).setToolTip(', '.join(names))
 
             # Apply color if the paper has been reviewed
-            if int(data[4]) != 0:
+            if data['status'][row] != 0:
                 color = QColor(0, 255, 0, 100)
                 self.setColortoRow(self.tablePapers, row, color)
 
@@ -391,28 +759,32 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         updates the database to reset loads and statuses, and refreshes 
         the user interface components, including tables and progress bars.
         Displays a message box to inform the user that the reset is complete.
+
+        The reset cannot be undone and discards the undo/redo history; use
+        `onUndoClicked` or `onHistoryClicked` to roll back individual saves instead.
         """
         # Clear lists and reset attributes
         self.check_list = []
-        self.paper_details = []
-        self.expert_details = []
-        self.free_expert_id = []
-        self.free_expert_spec = []
-        self.free_paper_id = []
-        self.free_paper_spec = []
-        self.expert_id = []
-        self.expert_name = []
+        self.free_experts = self.experts[:0]
+        self.free_papers = self.papers[:0]
+        self.match_experts = self.experts[:0]
+        self.match_papers = self.papers[:0]
         self.expert_match_list = []
         self.totalScore = 0
+        self.reviewer_assignment = None
+        self.verification = None
         
         # Disable buttons and reset label
         self.btnReviewed.setEnabled(False)
         self.btnNotReviewed.setEnabled(False)
         self.lblTotalScore.setText('Total Score: ')
+        self.lblTotalScore.setToolTip('')
         
         # Update the database to reset values
         self.executeQuery('UPDATE expertname SET load = 0')
         self.executeQuery('UPDATE papers SET expertid = -1, status = 0')
+        self.executeQuery('DELETE FROM assignments')
+        self.journal.discardAll()
         
         # Clear tables and reset progress
         self.tableLoadTable.setRowCount(0)
@@ -431,47 +803,31 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         # Inform the user that the reset is complete
         QMessageBox.information(self, "Information", 'Reset done.')
     
-    def updateSelectTable(self, free_paper_list, free_expert_list):
+    def updateSelectTable(self):
         """
-        Updates the free expert and paper tables with data from the provided lists.
+        Updates the free expert and paper tables from `free_experts` and `free_papers`.
 
-        This method fetches the expertise data from the database and populates 
-        the `tableFreeExpert` and `tableFreePaper` tables with the corresponding 
-        free experts and papers. The number of entries displayed is determined 
-        by the minimum length of the free expert IDs, free paper IDs, and the 
-        value of the batch size spinner.
-
-        Parameters:
-        ----------
-        free_paper_list : list
-            A list of free papers, where each paper is represented as a tuple.
-        free_expert_list : list
-            A list of free experts, where each expert is represented as a tuple.
-        """
-        expertise_list = self.executeQuery('SELECT * FROM expertise')
-        expertise = {e[1]: e[0] for e in expertise_list}
-        length = min(len(self.free_expert_id), len(self.free_paper_id), self.spinBatcSize.value())
+        This method populates the `tableFreeExpert` and `tableFreePaper` tables with
+        the corresponding free experts and papers, showing the `expertise` table id of
+        each topic. The number of entries displayed is determined by the minimum length
+        of the free experts, free papers, and the value of the batch size spinner.
+        """
+        length = min(len(self.free_experts), len(self.free_papers), self.spinBatcSize.value())
         self.tableFreeExpert.setRowCount(0)
+        self.tableFreeExpert.setRowCount(length)
         for row in range(length):
-            self.tableFreeExpert.setRowCount(self.tableFreeExpert.rowCount() + 1)
-            self.tableFreeExpert.setItem(row, 0, QTableWidgetItem(str(free_expert_list[row][0])))
-            self.tableFreeExpert.setItem(row, 1, QTableWidgetItem(str(expertise[free_expert_list[row][4]])))
-            self.tableFreeExpert.setItem(row, 2, QTableWidgetItem(str(expertise[free_expert_list[row][5]])))
-            self.tableFreeExpert.setItem(row, 3, QTableWidgetItem(str(expertise[free_expert_list[row][6]])))
-            self.tableFreeExpert.setItem(row, 4, QTableWidgetItem(str(expertise[free_expert_list[row][7]])))
-            self.tableFreeExpert.setItem(row, 5, QTableWidgetItem(str(expertise[free_expert_list[row][8]])))
-            self.tableFreeExpert.setItem(row, 6, QTableWidgetItem(str(free_expert_list[row][1])))
+            self.tableFreeExpert.setItem(row, 0, QTableWidgetItem(str(self.free_experts.ids[row])))
+            for col, code in enumerate(self.free_experts.data['topics'][row].tolist(), start=1):
+                self.tableFreeExpert.setItem(row, col, QTableWidgetItem(str(self.topics.expid(code))))
+            self.tableFreeExpert.setItem(row, 6, QTableWidgetItem(self.free_experts.names[row]))
         self.tableFreeExpert.resizeColumnsToContents()
         self.tableFreePaper.setRowCount(0)
+        self.tableFreePaper.setRowCount(length)
         for row in range(length):
-            self.tableFreePaper.setRowCount(self.tableFreePaper.rowCount() + 1)
-            self.tableFreePaper.setItem(row, 0, QTableWidgetItem(str(free_paper_list[row][0])))
-            self.tableFreePaper.setItem(row, 1, QTableWidgetItem(str(expertise[free_paper_list[row][5]])))
-            self.tableFreePaper.setItem(row, 2, QTableWidgetItem(str(expertise[free_paper_list[row][6]])))
-            self.tableFreePaper.setItem(row, 3, QTableWidgetItem(str(expertise[free_paper_list[row][7]])))
-            self.tableFreePaper.setItem(row, 4, QTableWidgetItem(str(expertise[free_paper_list[row][8]])))
-            self.tableFreePaper.setItem(row, 5, QTableWidgetItem(str(expertise[free_paper_list[row][9]])))
-            self.tableFreePaper.setItem(row, 6, QTableWidgetItem(str(free_paper_list[row][1])))
+            self.tableFreePaper.setItem(row, 0, QTableWidgetItem(str(self.free_papers.ids[row])))
+            for col, code in enumerate(self.free_papers.data['topics'][row].tolist(), start=1):
+                self.tableFreePaper.setItem(row, col, QTableWidgetItem(str(self.topics.expid(code))))
+            self.tableFreePaper.setItem(row, 6, QTableWidgetItem(self.free_papers.titles[row]))
         self.tableFreePaper.resizeColumnsToContents()
         
     def onGreedySelectClicked(self):
@@ -479,96 +835,179 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         Handles the greedy selection of papers and experts based on availability and load constraints.
 
         This method:
-        - Retrieves a list of papers without assigned experts (`expertid == -1`) and resets the
-        `free_paper_id` and `free_paper_spec` lists with the resulting data.
-        - Retrieves a list of available experts with load less than 80, ordered by ascending load.
-        Resets `free_expert_id` and `free_expert_spec` lists with the resulting data.
+        - Selects all papers without assigned experts (`expertid == -1`) into `free_papers`.
+        - Selects the available experts with load less than 80, ordered by ascending load, into `free_experts`.
         - Updates the selection table to reflect the current state of free papers and available experts.
 
         Notes:
-        - Calls `executeQuery()` for database operations and `updateSelectTable()` to update the table display.
-        - Assumes the `free_paper_id`, `free_paper_spec`, `free_expert_id`, and `free_expert_spec` lists exist.
+        - The selection is made by `selection.greedySelect()` on the records loaded by
+          `updateLoadTable()` and `updatePaperTable()`, without further database queries.
+        - After a save, the selection and the scores of its batch are usually ready from
+          `startPrecompute()` and are taken from there.
 
         Returns:
         - None
         """
-        
-        # Retrieve and process list of unassigned papers
-        free_paper_list = self.executeQuery('SELECT * FROM papers WHERE expertid = -1')
-        self.free_paper_id.clear()
-        self.free_paper_spec.clear()
-        if free_paper_list:
-            self.free_paper_id = [int(row[0]) for row in free_paper_list]
-            self.free_paper_spec = [[row[5], row[6], row[7], row[8], row[9]] for row in free_paper_list]
-
-        # Retrieve and process list of available experts
-        free_expert_list = self.executeQuery('SELECT * FROM expertname WHERE load < 80 ORDER BY load ASC')
-        self.free_expert_id.clear()
-        self.free_expert_spec.clear()
-        if free_expert_list:
-            self.free_expert_id = [int(row[0]) for row in free_expert_list]
-            self.free_expert_spec = [[row[4], row[5], row[6], row[7], row[8]] for row in free_expert_list]
-
-        # Update selection table to reflect the new lists
-        self.updateSelectTable(free_paper_list, free_expert_list)
+        self.selection = 'Greedy'
+        precomputed = self.takePrecomputed('Greedy') if self.service is None else None
+        if self.service is not None:
+            self.free_experts, self.free_papers = self.selectWithService('Greedy')
+        elif precomputed is None:
+            self.free_experts, self.free_papers = greedySelect(self.experts, self.papers)
+        else:
+            self.free_experts, self.free_papers = precomputed
+        self.updateSelectTable()
     
     def onNonGreedySelectClicked(self):
         """
         Handles non-greedy selection by finding available experts for unassigned papers based on expertise matches.
 
         This method:
-        - Retrieves unassigned papers (where `expertid == -1`).
+        - Takes the unassigned papers (where `expertid == -1`).
         - For each paper, searches for suitable experts within specified depth limits for both experts and paper requirements.
-        - Populates `free_expert_id` and `free_expert_spec` with unique experts and associates them with compatible papers.
+        - Populates `free_experts` with unique experts and `free_papers` with the paper each one was found for.
         - Updates the selection table with the selected papers and experts.
+        - Like `onGreedySelectClicked`, takes the result of `startPrecompute()` if it is still valid.
 
         Returns:
         - None
         """
-        
-        # Retrieve unassigned papers
-        free_paper = self.executeQuery('SELECT * FROM papers WHERE expertid = -1')
-        free_paper_spec = [[row[5], row[6], row[7], row[8], row[9]] for row in free_paper] if free_paper else []
-        
-        # Clear current expert and paper lists
-        self.free_expert_id.clear()
-        self.free_expert_spec.clear()
-        self.free_paper_id.clear()
-        self.free_paper_spec.clear()
-        free_expert_list = []
-        free_paper_list = []
-        
-        # Loop through each paper to find a suitable expert match
-        for paper_index, paper_spec in enumerate(free_paper_spec):
-            found_expert = False  # Track if a match is found for current paper
-            # Search for experts with matching expertise within depth limits
-            for e_depth in range(self.spinExpertDepth.value()):
-                for p_depth in range(self.spinPaperDepth.value()):
-                    query = f'''
-                        SELECT * FROM expertname 
-                        WHERE load < 100 AND expertise{e_depth + 1} = "{paper_spec[p_depth]}"
-                        ORDER BY load ASC
-                    '''
-                    free_expert = self.executeQuery(query, fetch_all=False)
-                    
-                    if free_expert and int(free_expert[0]) not in self.free_expert_id:
-                        # Add the expert and associated paper details if the expert is unique
-                        self.free_expert_id.append(int(free_expert[0]))
-                        self.free_expert_spec.append([free_expert[4], free_expert[5], free_expert[6], free_expert[7], free_expert[8]])
-                        free_expert_list.append(free_expert)
-                        
-                        paper = free_paper[paper_index]
-                        self.free_paper_id.append(int(paper[0]))
-                        self.free_paper_spec.append([paper[5], paper[6], paper[7], paper[8], paper[9]])
-                        free_paper_list.append(paper)
-                        
-                        found_expert = True  # Match found, move to the next paper
-                        break
-                
-                if found_expert:
-                    break
-        # Update selection table with the results
-        self.updateSelectTable(free_paper_list, free_expert_list)
+        self.selection = 'Non-Greedy'
+        precomputed = self.takePrecomputed('Non-Greedy') if self.service is None else None
+        if self.service is not None:
+            self.free_experts, self.free_papers = self.selectWithService('Non-Greedy')
+        elif precomputed is None:
+            self.free_experts, self.free_papers = nonGreedySelect(self.experts, self.papers, self.spinExpertDepth.value(),
+                                                                  self.spinPaperDepth.value())
+        else:
+            self.free_experts, self.free_papers = precomputed
+        self.updateSelectTable()
+
+    def serviceParams(self):
+        return {
+            'batch_size': self.spinBatcSize.value(),
+            'expert_depth': self.spinExpertDepth.value(),
+            'paper_depth': self.spinPaperDepth.value(),
+            'scoring': self.cbScoring.currentText(),
+        }
+
+    def recordsOf(self, expert_ids: list, paper_ids: list):
+        """
+        Returns the `ExpertTable` and `PaperTable` of the given ids from the loaded records, in id order.
+        """
+        expert_rows = self.experts.rowOf(expert_ids)
+        paper_rows = self.papers.rowOf(paper_ids)
+        return self.experts[expert_rows[expert_rows >= 0]], self.papers[paper_rows[paper_rows >= 0]]
+
+    def selectWithService(self, selection: str):
+        """
+        Asks the matching service (`SERVICE_ADDRESS`) for the next batch of `selection`.
+        """
+        result = self.service.select(selection, **self.serviceParams())
+        return self.recordsOf(result['expert_ids'], result['paper_ids'])
+
+    def matchWithService(self):
+        """
+        Runs Stable Match (one or two threads) on the service for the current selection and
+        shows the result like a `Compare...` result, ready for `onSaveClicked`.
+        """
+        matcher = 'Stable (dual thread)' if self.cbMultithread.checkState() == 2 else 'Stable'
+        result = self.service.match(self.selection, matcher, **self.serviceParams())
+        result['experts'], result['papers'] = self.recordsOf(result['batch_expert_ids'], result['batch_paper_ids'])
+        self.useCompareResult(result)
+        if result['cached']:
+            self.statusbar.showMessage(f'{self.statusbar.currentMessage()} (from the service cache)')
+
+    def invalidatePrecompute(self):
+        """
+        Starts a new write generation: the records are about to be reloaded, so any background
+        result computed from the previous ones is thrown away (also if it arrives later).
+        """
+        with self.precompute_lock:
+            self.generation += 1
+            self.precomputed = None
+            self.candidate_scores = None
+
+    def startPrecompute(self):
+        """
+        Speculatively computes the next Greedy and Non-Greedy selections and the scores of their
+        batches on a background thread, right after a save, so the next Select and Stable Match
+        clicks do not have to.
+
+        The result is tagged with the write generation and the batch size, depths and scoring it
+        was computed for; `takePrecomputed` only hands it out while all of them still hold.
+        """
+        generation = self.generation
+        experts, papers = self.experts, self.papers
+        params = {
+            'batch_size': self.spinBatcSize.value(),
+            'expert_depth': self.spinExpertDepth.value(),
+            'paper_depth': self.spinPaperDepth.value(),
+            'scoring': self.cbScoring.currentText(),
+        }
+        selections = {
+            'Greedy': lambda: greedySelect(experts, papers),
+            'Non-Greedy': lambda: nonGreedySelect(experts, papers, params['expert_depth'], params['paper_depth']),
+        }
+
+        def precompute():
+            start = time.perf_counter()
+            result = {'generation': generation, 'params': params}
+            for name, select in selections.items():
+                free_experts, free_papers = select()
+                length = min(len(free_experts), len(free_papers), params['batch_size'])
+                scores = scoreTables(free_experts[:length], free_papers[:length], len(self.topics), self.constraints,
+                                     params['scoring'], self.similarity)
+                result[name] = (free_experts, free_papers, scores)
+            result['seconds'] = time.perf_counter() - start
+            with self.precompute_lock:
+                # A write since the start makes the result stale
+                if generation == self.generation:
+                    self.precomputed = result
+
+        self.precompute_generation = generation
+        self.precompute_thread = threading.Thread(target=precompute, daemon=True)
+        self.precompute_thread.start()
+
+    def takePrecomputed(self, selection: str):
+        """
+        Returns the (free_experts, free_papers) of `selection` ('Greedy' or 'Non-Greedy') from
+        `startPrecompute` if they are valid for the current records and parameters, otherwise None.
+        The scores of the batch are kept in `candidate_scores` for `onStableMatchClicked`.
+        """
+        if self.precompute_thread is not None and self.precompute_generation == self.generation:
+            # Still running for the current records: waiting is never slower than starting over
+            self.precompute_thread.join()
+        with self.precompute_lock:
+            result = self.precomputed
+            if result is None or result['generation'] != self.generation:
+                return None
+            params = result['params']
+            if selection == 'Non-Greedy' and (params['expert_depth'], params['paper_depth']) != (
+                    self.spinExpertDepth.value(), self.spinPaperDepth.value()):
+                return None
+            free_experts, free_papers, scores = result[selection]
+            self.candidate_scores = None
+            if params['batch_size'] == self.spinBatcSize.value():
+                self.candidate_scores = (self.generation, params['scoring'], free_experts.ids[:len(scores)],
+                                         free_papers.ids[:scores.shape[1]], scores)
+        self.statusbar.showMessage(f'{selection} selection precomputed in the background after the last save '
+                                   f'({result["seconds"] * 1000:.0f} ms).')
+        return free_experts, free_papers
+
+    def candidateScoresFor(self, experts: ExpertTable, papers: PaperTable):
+        """
+        Returns the precomputed score matrix of the batch `experts` x `papers` under the current
+        scoring if `takePrecomputed` left a valid one, otherwise None.
+        """
+        with self.precompute_lock:
+            if self.candidate_scores is None:
+                return None
+            generation, scoring, expert_ids, paper_ids, scores = self.candidate_scores
+            if (generation != self.generation or scoring != self.scoring or not np.array_equal(expert_ids, experts.ids)
+                    or not np.array_equal(paper_ids, papers.ids)):
+                return None
+            return scores
             
     def onStableMatchClicked(self):
         """
@@ -580,31 +1019,339 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         process are then stored for further processing.
 
         The matching is performed using the `stableMatch` method, and the results 
-        are combined if multi-threading is enabled.
+        are combined if multi-threading is enabled. The combined match is then checked
+        against the scores of the whole batch by `verifyCurrentMatch` (the two halves of
+        Dual Thread are matched separately, so pairs across them can block).
+
+        Runs are memoized in `run_cache` under a hash of the batch records (ids, loads, topic specs,
+        pages), the conflicts, the scoring, the thread split and the selection parameters; an
+        identical re-run takes its result from the cache instead of matching again. Otherwise the scores
+        precomputed after the last save are used if they belong to this batch (`candidateScoresFor`).
+
+        With `SERVICE_ADDRESS` set, the batch is matched by the service instead (`matchWithService`).
 
         Raises:
         ------
         Exception: If no experts or papers are available for matching.
         """        
-        if len(self.free_expert_id) > 0 and len(self.free_paper_id) > 0:
-            self.tableMatchOutput.setRowCount(0)
-            length = min(len(self.free_expert_id), len(self.free_paper_id), self.spinBatcSize.value())
+        if self.service is not None and len(self.free_experts) > 0 and len(self.free_papers) > 0:
+            self.matchWithService()
+        elif len(self.free_experts) > 0 and len(self.free_papers) > 0:
+            length = min(len(self.free_experts), len(self.free_papers), self.spinBatcSize.value())
             mid = length//2 if self.cbMultithread.checkState() == 2 else length
-            newThread1 = ReturnableThread(target=lambda: self.stableMatch(self.free_expert_id[0:mid], self.free_expert_spec[0:mid], self.free_paper_id[0:mid], self.free_paper_spec[0:mid], 'thread1'))
-            newThread2 = ReturnableThread(target=lambda: self.stableMatch(self.free_expert_id[mid:length], self.free_expert_spec[mid:length], self.free_paper_id[mid:length], self.free_paper_spec[mid:length], 'thread2'))
-            newThread1.start()
-            if self.cbMultithread.checkState() == 2:
-                newThread2.start()
-            newThread1.join()
-            if self.cbMultithread.checkState() == 2:
-                newThread2.join()
-            expert_match_list, match_score = newThread1.result
-            if self.cbMultithread.checkState() == 2:
-                expert_match_list2, match_score2 = newThread2.result
-                expert_match_list.update(expert_match_list2)
-                match_score.update(match_score2)
-            self.expert_match_list = list(expert_match_list.items())
-            self.match_score = match_score
+            self.scoring = self.cbScoring.currentText()
+            experts, papers = self.free_experts[:length], self.free_papers[:length]
+            key = runKey('Stable Match', experts, papers, self.constraints, self.similarity, {
+                'scoring': self.scoring,
+                'mid': mid,
+                'batch_size': self.spinBatcSize.value(),
+                'expert_depth': self.spinExpertDepth.value(),
+                'paper_depth': self.spinPaperDepth.value(),
+            })
+            cached = self.run_cache.get(key)
+            if cached is not None:
+                self.match_experts, self.match_papers = experts, papers
+                self.expert_match_list = list(cached[0])
+                self.match_score = dict(cached[1])
+                self.pbProgress.setValue(self.pbProgress.maximum())
+                self.showMatchList('cached')
+                self.statusbar.showMessage(f'Same state as an earlier run, result taken from the run cache. '
+                                           f'{describeVerification(self.verifyCurrentMatch())}; '
+                                           f'{describeCache(self.run_cache.stats())}')
+                return
+            self.runStableMatch(experts, papers, mid, scores=self.candidateScoresFor(experts, papers))
+            self.run_cache.put(key, (list(self.expert_match_list), dict(self.match_score)))
+            self.statusbar.showMessage(f'{self.statusbar.currentMessage()}; {describeCache(self.run_cache.stats())}')
+
+    def runStableMatch(self, experts: ExpertTable, papers: PaperTable, mid: int, resume: dict = None,
+                       scores: np.ndarray = None):
+        """
+        Matches the batch `experts` x `papers` in one thread, or in two threads split at `mid`
+        if `mid` is less than the batch size, then verifies the result.
+
+        Parameters:
+        - experts (ExpertTable), papers (PaperTable): The batch.
+        - mid (int): Size of the first half.
+        - resume (dict, optional): Thread name -> (scores, state, events) of checkpoints to continue from;
+          threads without a checkpoint start over. The event log is cut back to the `events` each
+          checkpoint covers (none for threads that start over) and appended to.
+        - scores (np.ndarray, optional): Score matrix of the whole batch if already known (see
+          `startPrecompute`); each thread takes its block of it instead of scoring its half.
+
+        Each thread checkpoints its state while it runs; the checkpoints are removed once the
+        whole batch is matched, and their count and cost are shown with the verification.
+        """
+        resume = resume or {}
+        length = len(experts)
+        dual = mid < length
+        given = {} if scores is None else {'thread1': (scores[:mid, :mid], None, 0), 'thread2': (scores[mid:, mid:], None, 0)}
+        given.update(resume)
+        self.tableMatchOutput.setRowCount(0)
+        for thread_name in ('thread1', 'thread2'):
+            if thread_name not in resume:
+                discardCheckpoint(self.checkpoint_pattern.format(thread_name))
+        self.checkpoints = {}
+        self.checkpoint_meta = {'batch_expert_ids': experts.ids, 'batch_paper_ids': papers.ids, 'mid': mid,
+                                'scoring': self.scoring}
+        if resume and os.path.exists(self.event_log_path):
+            # Events written after the checkpoints would be written again by the resumed run
+            keepEvents(self.event_log_path, {int(name[-1]): events for name, (_, _, events) in resume.items()})
+        self.event_log = EventLogWriter(self.event_log_path, truncate=not resume)
+        newThread1 = ReturnableThread(target=lambda: self.stableMatch(experts[0:mid], papers[0:mid], 'thread1',
+                                                                      *given.get('thread1', (None, None, 0))))
+        newThread2 = ReturnableThread(target=lambda: self.stableMatch(experts[mid:length], papers[mid:length], 'thread2',
+                                                                      *given.get('thread2', (None, None, 0))))
+        newThread1.start()
+        if dual:
+            newThread2.start()
+        newThread1.join()
+        if dual:
+            newThread2.join()
+        self.event_log.close()
+        expert_match_list, match_score = newThread1.result
+        if dual:
+            expert_match_list2, match_score2 = newThread2.result
+            expert_match_list.update(expert_match_list2)
+            match_score.update(match_score2)
+        self.expert_match_list = list(expert_match_list.items())
+        self.match_score = match_score
+        self.match_experts = experts
+        self.match_papers = papers
+        message = describeVerification(self.verifyCurrentMatch())
+        stats = [checkpoint.stats() for checkpoint in self.checkpoints.values()]
+        count = sum(stat['count'] for stat in stats)
+        if count:
+            message += (f'; {count} checkpoint(s), {sum(stat["seconds"] for stat in stats) / count * 1000:.1f} ms each, '
+                        f'{max(stat["bytes"] for stat in stats) / 1024:.0f} KiB')
+        for checkpoint in self.checkpoints.values():
+            checkpoint.discard()
+        self.statusbar.showMessage(message)
+
+    def offerResume(self):
+        """
+        Offers to continue a Stable Match run that was interrupted (crash or kill) from its
+        latest checkpoints; if declined, or the batch no longer exists, the checkpoints are removed.
+        """
+        loaded = {}
+        for path in sorted(glob.glob(self.checkpoint_pattern.format('*'))):
+            try:
+                scores, state, meta = loadCheckpoint(path)
+                loaded[str(meta['thread'])] = (scores, state, meta)
+            except (OSError, ValueError, KeyError):
+                discardCheckpoint(path)
+        if not loaded:
+            return
+        meta = next(iter(loaded.values()))[2]
+        expert_rows = self.experts.rowOf(meta['batch_expert_ids'])
+        paper_rows = self.papers.rowOf(meta['batch_paper_ids'])
+        answer = QMessageBox.No
+        if (expert_rows >= 0).all() and (paper_rows >= 0).all() and str(meta['scoring']) in SCORINGS:
+            matched = sum(int(state['matched']) for _, state, _ in loaded.values())
+            answer = QMessageBox.question(self, 'Resume', f'An interrupted Stable Match run of {len(expert_rows)} experts x '
+                                          f'{len(paper_rows)} papers ({matched} matched so far) was found. Resume it?',
+                                          QMessageBox.Yes | QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            for path in glob.glob(self.checkpoint_pattern.format('*')):
+                discardCheckpoint(path)
+            return
+        self.scoring = str(meta['scoring'])
+        self.cbScoring.setCurrentText(self.scoring)
+        self.free_experts = self.experts[expert_rows]
+        self.free_papers = self.papers[paper_rows]
+        self.updateSelectTable()
+        self.runStableMatch(self.free_experts, self.free_papers, int(meta['mid']),
+                            {thread: (scores, state, int(meta.get('events', 0)))
+                             for thread, (scores, state, meta) in loaded.items()})
+
+    def currentMatchRows(self):
+        """
+        Returns the paper row (in `match_papers`) of every expert row of `match_experts` in the current match, -1 if free.
+        """
+        matched = [(expert_id, paper_id) for expert_id, paper_id in self.expert_match_list if paper_id != 'free']
+        expert_match = np.full(len(self.match_experts), -1, dtype=np.int64)
+        expert_match[self.match_experts.rowOf([e for e, _ in matched])] = self.match_papers.rowOf([p for _, p in matched])
+        return expert_match
+
+    def verifyCurrentMatch(self, scores: np.ndarray = None):
+        """
+        Checks the current match with `verify.verifyMatching` over the whole batch: blocking pairs,
+        free but compatible pairs, invalid pairs, score distribution and load variance.
+
+        The report is kept in `self.verification` and shown in the tooltip of the total score.
+        """
+        experts, papers = self.match_experts, self.match_papers
+        if scores is None:
+            scores = scoreTables(experts, papers, len(self.topics), self.constraints, self.scoring, self.similarity)
+        self.verification = verifyMatching(scores, self.currentMatchRows(), papers.data['pages'], experts.data['load'],
+                                           experts.data['maxload'])
+        report = self.verification
+        pairs = ', '.join(f'{experts.ids[e]}-{papers.ids[p]} ({score})' for e, p, score in report['blocking_sample'])
+        self.lblTotalScore.setToolTip(describeVerification(report) + (f'\nBlocking pairs (expert-paper): {pairs}' if pairs else ''))
+        return report
+
+    def onTracksClicked(self):
+        """
+        Opens the multi-track view, starting with the current database as the first track.
+
+        If the run saved into the current database, the load and paper tables are refreshed.
+        """
+        params = {
+            'batch_size': self.spinBatcSize.value(),
+            'expert_depth': self.spinExpertDepth.value(),
+            'paper_depth': self.spinPaperDepth.value(),
+            'balance': self.spinBalance.value(),
+            'scoring': self.cbScoring.currentText(),
+        }
+        dialog = TracksDialog(params, self)
+        dialog.addTracks([os.path.abspath(dbpath)])
+        dialog.exec()
+        if any(result.get('saved') and os.path.samefile(result['path'], dbpath) for result in dialog.results):
+            self.updateLoadTable()
+            self.updatePaperTable()
+
+    def onRobustnessClicked(self):
+        """
+        Shows how fragile the current match is if reviewers drop out or lose capacity before it is done.
+
+        This method:
+        - Takes the experts of the current match plus the other selected experts as spare reviewers,
+          and scores them against the papers of the match.
+        - Runs `ROBUSTNESS_TRIALS` perturbed re-matchings with `robustness.simulateDropout` in worker
+          processes (5-15% dropout, 10% of the experts losing 10-50% of their capacity).
+        - Shows the distributions of total score, unassigned papers and the experts with the largest
+          load spikes.
+
+        Nothing is written to the database.
+        """
+        if not self.expert_match_list:
+            QMessageBox.information(self, "Information", 'Run Stable Match first.')
+            return
+        spares = self.free_experts.ids[np.isin(self.free_experts.ids, self.match_experts.ids, invert=True)]
+        pool = self.experts[self.experts.rowOf(np.concatenate([self.match_experts.ids, spares]))]
+        papers = self.match_papers
+        scores = scoreTables(pool, papers, len(self.topics), self.constraints, self.scoring, self.similarity)
+        expert_match = np.concatenate([self.currentMatchRows(), np.full(len(spares), -1, dtype=np.int64)])
+        self.statusbar.showMessage(f'Simulating {ROBUSTNESS_TRIALS} dropout scenarios...')
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = simulateDropout(scores, expert_match, papers.data['pages'], pool.data['load'], pool.data['maxload'],
+                                     trials=ROBUSTNESS_TRIALS)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.statusbar.showMessage(f'Robustness: {result["trials"]} trials, median total score '
+                                   f'{np.median(result["total_score"]):g} of {result["baseline"]["total_score"]}, '
+                                   f'up to {result["unassigned"].max()} unassigned paper(s)')
+        QMessageBox.information(self, "Robustness", f'{len(pool)} experts ({len(spares)} spare), {len(papers)} papers\n'
+                                + describeRobustness(result, pool.ids.tolist()))
+
+    def onEventLogClicked(self):
+        """
+        Opens the make-up/break-up events of the last Stable Match run in an `EventLogDialog`.
+        """
+        EventLogDialog(EventLog(self.event_log_path), self).exec()
+
+    def onCompareClicked(self):
+        """
+        Runs every selection and matching strategy side by side on the current database state.
+
+        This method:
+        - Takes one snapshot of the experts, papers, topics and conflicts.
+        - Runs each strategy of `compare.compareStrategies` (Greedy / Non-Greedy selection x
+          Stable / Stable dual thread / Deferred Acceptance matching) in its own worker process,
+          using the current batch size and expertise depths.
+        - Shows total score, papers assigned, load variance, stability violations and wall time
+          per strategy in a `CompareDialog` as results arrive.
+
+        Nothing is written to the database. If the user picks a result, it becomes the current
+        match and can be stored with `onSaveClicked` as usual.
+        """
+        snapshot = takeSnapshot(self.connection, self.topics, self.constraints, self.similarity)
+        params = {
+            'batch_size': self.spinBatcSize.value(),
+            'expert_depth': self.spinExpertDepth.value(),
+            'paper_depth': self.spinPaperDepth.value(),
+            'balance': self.spinBalance.value(),
+            'scoring': self.cbScoring.currentText(),
+        }
+        dialog = CompareDialog(self)
+        self.compareResultReady.connect(dialog.addResult)
+        compareStrategies(snapshot, params, on_result=self.compareResultReady.emit)
+        accepted = dialog.exec()
+        self.compareResultReady.disconnect(dialog.addResult)
+        result = dialog.selectedResult()
+        if accepted and result is not None:
+            self.useCompareResult(result)
+
+    def showMatchList(self, source: str):
+        """
+        Lists the matched pairs of `expert_match_list` in `tableMatchOutput`, with `source` in the thread column.
+        """
+        pairs = [(expert_id, paper_id) for expert_id, paper_id in self.expert_match_list if paper_id != 'free']
+        self.tableMatchOutput.setRowCount(0)
+        self.tableMatchOutput.setRowCount(len(pairs))
+        for row, (expert_id, paper_id) in enumerate(pairs):
+            self.tableMatchOutput.setItem(row, 0, QTableWidgetItem(str(expert_id)))
+            self.tableMatchOutput.setItem(row, 1, QTableWidgetItem('==>'))
+            self.tableMatchOutput.setItem(row, 2, QTableWidgetItem(str(paper_id)))
+            self.tableMatchOutput.setItem(row, 3, QTableWidgetItem(str(self.match_score[expert_id])))
+            self.tableMatchOutput.setItem(row, 4, QTableWidgetItem(source))
+        self.tableMatchOutput.resizeColumnsToContents()
+
+    def onImproveClicked(self):
+        """
+        Improves the current match by local search before it is saved.
+
+        This method:
+        - Scores the batch of the current match (`match_experts` x `match_papers`) and masks conflicts.
+        - Runs `matching.improveMatching()` for up to `IMPROVE_TIME_BUDGET` seconds, swapping papers
+          between experts (2-swaps, then 3-cycles) while `total score - Balance * load variance` improves.
+        - Replaces `expert_match_list` and `match_score` with the improved match and reports the gain
+          and time of every round.
+
+        Nothing is written to the database; click Save to store the improved match.
+        """
+        if not self.expert_match_list:
+            QMessageBox.information(self, "Information", 'Run Stable Match first.')
+            return
+        experts, papers = self.match_experts, self.match_papers
+        scores = scoreTables(experts, papers, len(self.topics), self.constraints, self.scoring, self.similarity)
+        expert_match = self.currentMatchRows()
+        improved, stats = improveMatching(scores, expert_match, papers.data['pages'], experts.data['load'],
+                                          experts.data['maxload'], balance=self.spinBalance.value(),
+                                          time_budget=IMPROVE_TIME_BUDGET, cycles=True)
+        self.expert_match_list = [(int(e), int(papers.ids[p]) if p >= 0 else 'free') for e, p in zip(experts.ids, improved)]
+        self.match_score = {int(e): int(scores[row, p]) if p >= 0 else 0 for row, (e, p) in enumerate(zip(experts.ids, improved))}
+        self.match_score['free'] = 0
+        self.showMatchList('improved')
+        # Swaps raise the score and may give up stability, so the result is verified again
+        self.statusbar.showMessage(describeVerification(self.verifyCurrentMatch(scores)))
+        lines = [f'Local search: score {stats["score_before"]:g} -> {stats["score_after"]:g}, '
+                 f'load variance {stats["variance_before"]:.1f} -> {stats["variance_after"]:.1f} '
+                 f'in {len(stats["rounds"])} rounds, {stats["seconds"]:.3f} s. Click Save to store it.', '']
+        lines += [f'Round {i + 1}: {r["moves"]} {r["kind"]}(s), gain {r["gain"]:.2f} (score {r["score_gain"]:+g}) in {r["seconds"]:.3f} s'
+                 for i, r in enumerate(stats['rounds'][:20])]
+        if len(stats['rounds']) > 20:
+            lines.append(f'... {len(stats["rounds"]) - 20} more rounds')
+        if not stats['rounds']:
+            lines.append('No improving swap found.')
+        QMessageBox.information(self, "Local Search", '\n'.join(lines))
+
+    def useCompareResult(self, result: dict):
+        """
+        Makes a result of `onCompareClicked` the current selection and match, ready for `onSaveClicked`.
+        """
+        self.scoring = result.get('scoring', 'Positional')
+        self.free_experts = result['experts']
+        self.free_papers = result['papers']
+        self.match_experts = result['experts']
+        self.match_papers = result['papers']
+        self.updateSelectTable()
+        self.expert_match_list = list(zip(result['expert_ids'], result['paper_ids']))
+        self.match_score = dict(zip(result['expert_ids'], result['scores']))
+        self.showMatchList(result['name'])
+        self.verifyCurrentMatch()
+        self.statusbar.showMessage(f'Using {result["name"]}: total score {result["total_score"]}, '
+                                   f'{result["assigned"]} papers. Click Save to store it. {describeVerification(self.verification)}')
 
     def onSaveClicked(self):
         """
@@ -619,27 +1366,98 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
         - Expert loads based on the number of pages assigned to them.
         - Paper assignments for each expert.
 
+        The writes are done by `assignments.saveMatches()`, which records every load
+        delta and paper assignment as one transaction in `self.journal`, so the save
+        can be reverted with `onUndoClicked`. Experts left unmatched ('free') are skipped.
+        With `SERVICE_ADDRESS` set, the service makes the same journaled save.
+
         Raises:
         ------
         Exception: If an error occurs while executing database queries.
         """
         if self.check_list != self.expert_match_list:
             self.check_list = self.expert_match_list.copy()
+            pairs = [(expert_id, paper_id) for expert_id, paper_id in self.expert_match_list if paper_id != 'free']
+            score = sum(map(int, list(self.match_score.values())))
+            if self.service is not None:
+                self.service.save([e for e, _ in pairs], [p for _, p in pairs], score)
+            else:
+                saveMatches(self.connection, self.journal, [e for e, _ in pairs], [p for _, p in pairs], score)
             self.pbProgress.setMaximum(len(self.expert_match_list))
-            for idx, (expert_id, paper_id) in enumerate(self.expert_match_list):
-                load, max_load = self.executeQuery(f'SELECT load, maxload FROM expertname WHERE expertid={expert_id}', fetch_all=False)
-                pages, _ = self.executeQuery(f'SELECT pages, paperid FROM papers WHERE paperid={paper_id}', fetch_all=False)
-                revised_load = min(100, round(load + (pages / max_load) * 100, 2))
-                if revised_load != load:
-                    self.executeQuery(f'UPDATE expertname SET load={revised_load} WHERE expertid={expert_id}')
-                self.executeQuery(f'UPDATE papers SET expertid={expert_id} WHERE paperid={paper_id}')
-                self.pbProgress.setValue(idx + 1)
-            
-            self.totalScore += sum(map(int, list(self.match_score.values())))
+            self.pbProgress.setValue(len(self.expert_match_list))
+            self.totalScore += score
             self.lblTotalScore.setText(f'Total Score: {self.totalScore}')
             self.updateLoadTable()
             self.updatePaperTable()
+            if self.service is None:
+                self.startPrecompute()
     
+    def onAssignReviewersClicked(self):
+        """
+        Assigns `spinReviewers` reviewers to every unassigned paper in a single run.
+
+        This method:
+        - Loads all papers without reviewers and all experts whose load is below 100.
+        - Scores every expert-paper pair with the scoring function chosen in `cbScoring` and masks conflicts of interest.
+        - Runs `kWayAssign()` under each expert's remaining page capacity, taking at most one
+          reviewer per paper from each primary expertise (`expertise1`) for diversity.
+        - Shows the assignments in `tableMatchOutput` and the throughput and stability in the status bar.
+
+        Nothing is written to the database until `onSaveReviewersClicked` is called.
+        """
+        reviewed = set(reviewersByPaper(self.connection))
+        free_papers = self.papers[(self.papers.data['expertid'] == -1) & ~np.isin(self.papers.ids, list(reviewed))]
+        free_experts = self.experts[self.experts.data['load'] < 100]
+        if len(free_papers) == 0 or len(free_experts) == 0:
+            QMessageBox.information(self, "Information", 'No free papers or experts.')
+            return
+        start = time.perf_counter()
+        expert = free_experts.ids
+        paper = free_papers.ids
+        expert_codes = free_experts.data['topics']
+        paper_codes = free_papers.data['topics']
+        n_topics = len(self.topics)
+        scoring = self.cbScoring.currentText()
+        scores = scoreTables(free_experts, free_papers, n_topics, self.constraints, scoring, self.similarity)
+        capacity = free_experts.data['maxload'] * (100 - free_experts.data['load']) / 100
+        pages = free_papers.data['pages']
+        groups = np.where(expert_codes[:, 0] < 0, n_topics, expert_codes[:, 0])
+        k = self.spinReviewers.value()
+        e_idx, p_idx, score, slot, stats = kWayAssign(scores, k, pages, capacity, groups)
+        elapsed = time.perf_counter() - start
+        self.reviewer_assignment = (expert[e_idx], paper[p_idx], score, slot)
+
+        # Show one row per assignment
+        self.tableMatchOutput.setRowCount(0)
+        self.tableMatchOutput.setRowCount(len(e_idx))
+        for row in range(len(e_idx)):
+            self.tableMatchOutput.setItem(row, 0, QTableWidgetItem(str(expert[e_idx[row]])))
+            self.tableMatchOutput.setItem(row, 1, QTableWidgetItem('==>'))
+            self.tableMatchOutput.setItem(row, 2, QTableWidgetItem(str(paper[p_idx[row]])))
+            self.tableMatchOutput.setItem(row, 3, QTableWidgetItem(str(score[row])))
+            self.tableMatchOutput.setItem(row, 4, QTableWidgetItem(f'k-way slot {slot[row] + 1}'))
+            weights = SCORINGS[scoring].weights(expert_codes[e_idx[row]], paper_codes[p_idx[row]], score[row], self.similarity)
+            for col, weight in enumerate(weights, start=5):
+                self.tableMatchOutput.setItem(row, col, QTableWidgetItem(str(weight)))
+        self.tableMatchOutput.resizeColumnsToContents()
+        staffed = int((np.bincount(p_idx, minlength=len(paper)) == k).sum())
+        stability = 'stable' if stats['blocking'] == 0 else f'NOT stable: {stats["blocking"]} blocking pair(s)'
+        self.statusbar.showMessage(f'{len(e_idx)} reviewer slots, {staffed}/{len(paper)} papers fully staffed in '
+                                   f'{elapsed:.3f} s ({stats["rounds"]} rounds, {len(paper) / max(elapsed, 1e-9):.0f} papers/s); '
+                                   f'{stability}')
+
+    def onSaveReviewersClicked(self):
+        """
+        Saves the pending multi-reviewer assignment to the `assignments` table and
+        updates expert loads as one transaction in `self.journal` (see `assignments.saveAssignments`),
+        so the save can be reverted with `onUndoClicked`.
+        """
+        if self.reviewer_assignment is not None:
+            saveAssignments(self.connection, self.journal, *self.reviewer_assignment)
+            self.reviewer_assignment = None
+            self.updateLoadTable()
+            self.updatePaperTable()
+
     def onMatchTableCellClicked(self, row, _ ):
         """
         Handles the event when a cell in the match table is clicked.
@@ -667,58 +1485,99 @@ class MainWindow(QtWidgets.QMainWindow, Ui_mainWindow):
                 item = self.tableFreeExpert.item(rowIndex, 0)  
                 self.tableFreeExpert.setCurrentItem(item)
     
-    def onPapersTableClicked(self, row, _ ):
+    def selectedPapers(self):
+        """
+        Returns the `PaperTable` of the rows selected in the papers table (several rows can be
+        selected with Ctrl/Shift-click).
         """
-        Handles the event when a row in the papers table is clicked.
+        rows = sorted({index.row() for index in self.tablePapers.selectionModel().selectedRows()})
+        return self.papers[np.array(rows, dtype=np.int64)]
 
-        This method retrieves the selected expert, paper ID, and paper status 
-        from the clicked row. It then enables or disables the review buttons 
-        based on the paper's review status and whether an expert is assigned.
+    def onPapersSelectionChanged(self):
+        """
+        Enables Reviewed if any selected paper is assigned and not reviewed yet, and
+        Not Reviewed if any selected paper is assigned and reviewed.
+        """
+        selected = self.selectedPapers().data
+        assigned = selected['expertid'] != -1
+        self.btnReviewed.setEnabled(bool((assigned & (selected['status'] == 0)).any()))
+        self.btnNotReviewed.setEnabled(bool((assigned & (selected['status'] != 0)).any()))
 
-        Parameters:
-        ----------
-        row : int
-            The index of the clicked row in the papers table.
-        _ : Any
-            The index of the clicked column (unused).
+    def setSelectedReviewed(self, reviewed: bool):
         """
-        self.selected_expert = self.tablePapers.item(row, 1).text()
-        self.selected_paper_id = self.tablePapers.item(row, 0).text()
-        self.selected_paper_status = self.tablePapers.item(row, 2).text()
-        if self.expert_name != 'Not Assigned' and self.selected_paper_status == 'Not Reviewed':
-            self.btnReviewed.setEnabled(True)
-            self.btnNotReviewed.setEnabled(False)
-        if self.expert_name != 'Not Assigned' and self.selected_paper_status == 'Reviewed':
-            self.btnReviewed.setEnabled(False)
-            self.btnNotReviewed.setEnabled(True)
-    
-    def onReviewedClicked(self):
-        if self.selected_expert != 'Not Assigned' and self.selected_paper_status == 'Not Reviewed':
-            expert_id = str(self.expert_id[self.expert_name.index(self.selected_expert)])
-            paper_id = self.selected_paper_id
-            load, max_load = self.executeQuery('select load, maxload from expertname where expertid=' + expert_id)[0]
-            pages, = self.executeQuery('select pages from papers where paperid=' + paper_id)[0]
-            revised_load = round((max_load * load / 100 - int(pages)) / max_load * 100, 2)
-            revised_load = 0 if revised_load < 0 else revised_load
-            self.executeQuery('update expertname set load=' + str(revised_load) + ' where expertid=' + expert_id)
-            self.executeQuery('update papers set status=1 where paperid='+ paper_id)
+        Marks all selected papers as reviewed or not reviewed with one set-based, journaled
+        update (`assignments.setReviewedPapers`) and reloads the tables once.
+        """
+        paper_ids = self.selectedPapers().ids.tolist()
+        if self.service is not None:
+            changed = self.service.reviewMany(paper_ids, reviewed)['changed']
+        else:
+            changed = setReviewedPapers(self.connection, self.journal, paper_ids, reviewed)
+        if changed:
             self.updatePaperTable()
             self.updateLoadTable()
-    
+            self.statusbar.showMessage(f'{changed} paper(s) marked as {"reviewed" if reviewed else "not reviewed"}.')
+
+    def onReviewedClicked(self):
+        self.setSelectedReviewed(True)
+
     def onNotReviewedClicked(self):
-        if self.expert_name != 'Not Assigned' and self.selected_paper_status == 'Reviewed':
-            expert_id = str(self.expert_id[self.expert_name.index(self.selected_expert)])
-            paper_id = self.selected_paper_id
-            load, max_load = self.executeQuery('select load, maxload from expertname where expertid=' + expert_id)[0]
-            pages, = self.executeQuery('select pages from papers where paperid=' + paper_id)[0]
-            revised_load = round((max_load * load / 100 + int(pages)) / max_load * 100, 2)
-            revised_load = 100 if revised_load > 100 else revised_load
-            self.executeQuery('update expertname set load=' + str(revised_load) + ' where expertid=' + expert_id)
-            self.executeQuery('update papers set status=0 where paperid='+ paper_id)
-            self.updatePaperTable()
-            self.updateLoadTable()
+        self.setSelectedReviewed(False)
+
+    def refreshAfterJournal(self, score_change):
+        """
+        Refreshes the tables and total score after the journal changed the database.
+        """
+        self.check_list = []
+        self.totalScore += score_change
+        self.lblTotalScore.setText(f'Total Score: {self.totalScore}')
+        self.btnReviewed.setEnabled(False)
+        self.btnNotReviewed.setEnabled(False)
+        self.updateLoadTable()
+        self.updatePaperTable()
+
+    def onUndoClicked(self):
+        """
+        Reverts the most recent save or review change recorded in the journal.
+        """
+        txn = self.journal.undo()
+        if txn is None:
+            self.statusbar.showMessage('Nothing to undo.')
+            return
+        self.refreshAfterJournal(-txn[2])
+        self.statusbar.showMessage(f'Undone: {txn[1]}')
+
+    def onRedoClicked(self):
+        """
+        Re-applies the most recently undone change.
+        """
+        txn = self.journal.redo()
+        if txn is None:
+            self.statusbar.showMessage('Nothing to redo.')
+            return
+        self.refreshAfterJournal(txn[2])
+        self.statusbar.showMessage(f'Redone: {txn[1]}')
+
+    def onHistoryClicked(self):
+        """
+        Lets the user pick a point in the journal history and restores the database to it.
+
+        Only the transactions between the current state and the chosen one are undone or redone.
+        """
+        history = self.journal.history()
+        items = ['#0 Initial state'] + [
+            f'#{txn} {label} ({time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))})' + (' [undone]' if undone else '')
+            for txn, label, created, _, undone in history
+        ]
+        current = max([0] + [index + 1 for index, row in enumerate(history) if not row[4]])
+        item, ok = QInputDialog.getItem(self, 'History', 'Restore to:', items, current, False)
+        if ok:
+            txn = int(item.split()[0][1:])
+            self.refreshAfterJournal(self.journal.restore(txn))
+            self.statusbar.showMessage(f'Restored to {item}')
 
-app = QtWidgets.QApplication(sys.argv)
-window = MainWindow()
-window.show()
-app.exec()
\ No newline at end of file
+if __name__ == '__main__':
+    app = QtWidgets.QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    app.exec()
\ No newline at end of file
@@ -154,6 +154,7 @@ class Ui_mainWindow(object):
         self.verticalLayout_3.setObjectName("verticalLayout_3")
         self.tablePapers = QtWidgets.QTableWidget(self.groupBox_2)
         self.tablePapers.setAlternatingRowColors(True)
+        self.tablePapers.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.tablePapers.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.tablePapers.setObjectName("tablePapers")
         self.tablePapers.setColumnCount(10)
@@ -248,12 +249,49 @@ class Ui_mainWindow(object):
         self.groupBox_7.setObjectName("groupBox_7")
         self.verticalLayout_9 = QtWidgets.QVBoxLayout(self.groupBox_7)
         self.verticalLayout_9.setObjectName("verticalLayout_9")
+        self.horizontalLayout_10 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_10.setObjectName("horizontalLayout_10")
+        self.label_8 = QtWidgets.QLabel(self.groupBox_7)
+        self.label_8.setObjectName("label_8")
+        self.horizontalLayout_10.addWidget(self.label_8)
+        self.cbScoring = QtWidgets.QComboBox(self.groupBox_7)
+        self.cbScoring.setObjectName("cbScoring")
+        self.horizontalLayout_10.addWidget(self.cbScoring)
+        self.verticalLayout_9.addLayout(self.horizontalLayout_10)
         self.cbMultithread = QtWidgets.QCheckBox(self.groupBox_7)
         self.cbMultithread.setObjectName("cbMultithread")
         self.verticalLayout_9.addWidget(self.cbMultithread)
         self.btnStableMatch = QtWidgets.QPushButton(self.groupBox_7)
         self.btnStableMatch.setObjectName("btnStableMatch")
         self.verticalLayout_9.addWidget(self.btnStableMatch)
+        self.horizontalLayout_9 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_9.setObjectName("horizontalLayout_9")
+        self.label_7 = QtWidgets.QLabel(self.groupBox_7)
+        self.label_7.setObjectName("label_7")
+        self.horizontalLayout_9.addWidget(self.label_7)
+        self.spinBalance = QtWidgets.QDoubleSpinBox(self.groupBox_7)
+        self.spinBalance.setDecimals(3)
+        self.spinBalance.setMaximum(10.0)
+        self.spinBalance.setSingleStep(0.01)
+        self.spinBalance.setProperty("value", 0.01)
+        self.spinBalance.setObjectName("spinBalance")
+        self.horizontalLayout_9.addWidget(self.spinBalance)
+        self.btnImprove = QtWidgets.QPushButton(self.groupBox_7)
+        self.btnImprove.setObjectName("btnImprove")
+        self.horizontalLayout_9.addWidget(self.btnImprove)
+        self.verticalLayout_9.addLayout(self.horizontalLayout_9)
+        self.btnCompare = QtWidgets.QPushButton(self.groupBox_7)
+        self.btnCompare.setObjectName("btnCompare")
+        self.verticalLayout_9.addWidget(self.btnCompare)
+        self.btnEventLog = QtWidgets.QPushButton(self.groupBox_7)
+        self.btnEventLog.setObjectName("btnEventLog")
+        self.verticalLayout_9.addWidget(self.btnEventLog)
+        self.btnTracks = QtWidgets.QPushButton(self.groupBox_7)
+        self.btnTracks.setObjectName("btnTracks")
+        self.verticalLayout_9.addWidget(self.btnTracks)
+        self.btnRobustness = QtWidgets.QPushButton(self.groupBox_7)
+        self.btnRobustness.setObjectName("btnRobustness")
+        self.verticalLayout_9.addWidget(self.btnRobustness)
         self.lblTotalScore = QtWidgets.QLabel(self.groupBox_7)
         self.lblTotalScore.setObjectName("lblTotalScore")
         self.verticalLayout_9.addWidget(self.lblTotalScore)
@@ -261,12 +299,47 @@ class Ui_mainWindow(object):
         self.btnSave.setObjectName("btnSave")
         self.verticalLayout_9.addWidget(self.btnSave)
         self.verticalLayout_10.addWidget(self.groupBox_7)
+        self.groupBox_8 = QtWidgets.QGroupBox(self.centralwidget)
+        self.groupBox_8.setObjectName("groupBox_8")
+        self.verticalLayout_12 = QtWidgets.QVBoxLayout(self.groupBox_8)
+        self.verticalLayout_12.setObjectName("verticalLayout_12")
+        self.horizontalLayout_7 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_7.setObjectName("horizontalLayout_7")
+        self.label_6 = QtWidgets.QLabel(self.groupBox_8)
+        self.label_6.setObjectName("label_6")
+        self.horizontalLayout_7.addWidget(self.label_6)
+        self.spinReviewers = QtWidgets.QSpinBox(self.groupBox_8)
+        self.spinReviewers.setMinimum(1)
+        self.spinReviewers.setMaximum(5)
+        self.spinReviewers.setProperty("value", 3)
+        self.spinReviewers.setObjectName("spinReviewers")
+        self.horizontalLayout_7.addWidget(self.spinReviewers)
+        self.verticalLayout_12.addLayout(self.horizontalLayout_7)
+        self.btnAssignReviewers = QtWidgets.QPushButton(self.groupBox_8)
+        self.btnAssignReviewers.setObjectName("btnAssignReviewers")
+        self.verticalLayout_12.addWidget(self.btnAssignReviewers)
+        self.btnSaveReviewers = QtWidgets.QPushButton(self.groupBox_8)
+        self.btnSaveReviewers.setObjectName("btnSaveReviewers")
+        self.verticalLayout_12.addWidget(self.btnSaveReviewers)
+        self.verticalLayout_10.addWidget(self.groupBox_8)
         self.btnReviewed = QtWidgets.QPushButton(self.centralwidget)
         self.btnReviewed.setObjectName("btnReviewed")
         self.verticalLayout_10.addWidget(self.btnReviewed)
         self.btnNotReviewed = QtWidgets.QPushButton(self.centralwidget)
         self.btnNotReviewed.setObjectName("btnNotReviewed")
         self.verticalLayout_10.addWidget(self.btnNotReviewed)
+        self.horizontalLayout_8 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_8.setObjectName("horizontalLayout_8")
+        self.btnUndo = QtWidgets.QPushButton(self.centralwidget)
+        self.btnUndo.setObjectName("btnUndo")
+        self.horizontalLayout_8.addWidget(self.btnUndo)
+        self.btnRedo = QtWidgets.QPushButton(self.centralwidget)
+        self.btnRedo.setObjectName("btnRedo")
+        self.horizontalLayout_8.addWidget(self.btnRedo)
+        self.btnHistory = QtWidgets.QPushButton(self.centralwidget)
+        self.btnHistory.setObjectName("btnHistory")
+        self.horizontalLayout_8.addWidget(self.btnHistory)
+        self.verticalLayout_10.addLayout(self.horizontalLayout_8)
         self.btnReset = QtWidgets.QPushButton(self.centralwidget)
         self.btnReset.setObjectName("btnReset")
         self.verticalLayout_10.addWidget(self.btnReset)
@@ -398,10 +471,24 @@ class Ui_mainWindow(object):
         self.label_4.setText(_translate("mainWindow", "Paper"))
         self.btnNonGreedySelect.setText(_translate("mainWindow", "&Non Greedy Select"))
         self.groupBox_7.setTitle(_translate("mainWindow", "Stable Match"))
+        self.label_8.setText(_translate("mainWindow", "Scoring"))
         self.cbMultithread.setText(_translate("mainWindow", "Dual Thread"))
         self.btnStableMatch.setText(_translate("mainWindow", "Stable &Match"))
+        self.label_7.setText(_translate("mainWindow", "Balance"))
+        self.btnImprove.setText(_translate("mainWindow", "&Improve"))
+        self.btnCompare.setText(_translate("mainWindow", "&Compare..."))
+        self.btnEventLog.setText(_translate("mainWindow", "Event &Log..."))
+        self.btnTracks.setText(_translate("mainWindow", "&Tracks..."))
+        self.btnRobustness.setText(_translate("mainWindow", "&Robustness..."))
         self.lblTotalScore.setText(_translate("mainWindow", "Total Score:"))
         self.btnSave.setText(_translate("mainWindow", "&Save"))
+        self.groupBox_8.setTitle(_translate("mainWindow", "Multi Reviewer:"))
+        self.label_6.setText(_translate("mainWindow", "Reviewers/Paper"))
+        self.btnAssignReviewers.setText(_translate("mainWindow", "Assign Reviewers"))
+        self.btnSaveReviewers.setText(_translate("mainWindow", "Save Reviewers"))
         self.btnReviewed.setText(_translate("mainWindow", "&Reviewed"))
         self.btnNotReviewed.setText(_translate("mainWindow", "&Not Reviewed"))
+        self.btnUndo.setText(_translate("mainWindow", "&Undo"))
+        self.btnRedo.setText(_translate("mainWindow", "Re&do"))
+        self.btnHistory.setText(_translate("mainWindow", "&History..."))
         self.btnReset.setText(_translate("mainWindow", "Reset &All"))
@@ -0,0 +1,541 @@
+"""
+Matching engines that work directly on a precomputed (experts x papers) score matrix.
+
+A score of 0 means "not compatible" (no shared topic, or masked out by
+`constraints.ConstraintStore`), so engines never assign such a pair.
+"""
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from verify import verifyMatching, kWayWants, kWayAccepts
+
+
+def kWayAssign(scores: np.ndarray, k: int, pages: np.ndarray, capacity: np.ndarray,
+               groups: np.ndarray = None, max_per_group: int = 1, max_rounds: int = None):
+    """
+    Assigns up to `k` reviewers to every paper in a single run.
+
+    Papers propose to experts and experts tentatively hold the best proposals that fit in their
+    page capacity (many-to-many deferred acceptance). Every round is a handful of array operations
+    over all papers at once:
+
+    - the blocking pairs of the current assignment are found: pairs of a paper that wants the expert
+      (`verify.kWayWants`) and an expert that would accept the paper (`verify.kWayAccepts`); both sides
+      are only recomputed for the papers and experts whose assignments changed in the last round,
+    - each such paper proposes to its best blocking experts, one per open slot (one if it is full,
+      to replace its worst reviewer),
+    - each expert goes through its held and new proposals best score first and keeps every one that
+      still fits in its capacity,
+    - each paper keeps its best `k` reviewers within the per-group limit; the experts it releases
+      get the pages back.
+
+    Proposals are made against the current assignment every round, so an expert that rejected or
+    was released by a paper gets it again as soon as it can take it. The run ends when no blocking
+    pair is left, so no paper keeps an open slot while a compatible expert has room for it.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - k (int): Number of reviewers wanted per paper.
+    - pages (np.ndarray): Page count of each paper.
+    - capacity (np.ndarray): Remaining page capacity of each expert.
+    - groups (np.ndarray, optional): Diversity group of each expert (e.g. primary expertise code).
+    - max_per_group (int, optional): Maximum reviewers of one paper drawn from the same group.
+    - max_rounds (int, optional): Stops after this many rounds even if blocking pairs are left
+      (defaults to 10 x k x papers, far more than needed in practice).
+
+    Returns:
+    - tuple: (expert_index, paper_index, score, slot, stats). The first four are arrays with one
+      entry per assignment, sorted by paper and then by slot (0 = best reviewer). `stats` holds
+      the number of rounds and proposals made and the blocking pairs left (0 unless `max_rounds` was hit).
+    """
+    n_experts, n_papers = scores.shape
+    pages = np.asarray(pages, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    if max_rounds is None:
+        max_rounds = 10 * max(k, 1) * max(n_papers, 1)
+    if groups is not None:
+        groups = np.asarray(groups, dtype=np.int64)
+
+    held_e = np.empty(0, dtype=np.int64)
+    held_p = np.empty(0, dtype=np.int64)
+    held_count = np.zeros(n_papers, dtype=np.int64)
+    rounds = proposals = 0
+
+    wants = kWayWants(scores, held_e, held_p, k, groups, max_per_group)
+    accepts = kWayAccepts(scores, held_e, held_p, pages, capacity)
+    while True:
+        blocking = wants & accepts
+        wanting = np.flatnonzero(blocking.any(axis=0))
+        if len(wanting) == 0 or rounds == max_rounds:
+            break
+        rounds += 1
+
+        # Every paper proposes to its best blocking experts, one per open slot (lowest index on equal scores)
+        offers = np.where(blocking[:, wanting], scores[:, wanting], 0)
+        allowance = np.maximum(k - held_count[wanting], 1)
+        new_e, new_p = [], []
+        for slot in range(int(allowance.max())):
+            best = offers.argmax(axis=0)
+            columns = np.flatnonzero((offers[best, np.arange(len(wanting))] > 0) & (slot < allowance))
+            new_e.append(best[columns])
+            new_p.append(wanting[columns])
+            offers[best[columns], columns] = 0
+        new_e, new_p = np.concatenate(new_e), np.concatenate(new_p)
+        proposals += len(new_e)
+        before = held_e * n_papers + held_p
+
+        # Experts keep, best score first (held before new on equal scores), every proposal that still fits
+        cand_e = np.concatenate([held_e, new_e])
+        cand_p = np.concatenate([held_p, new_p])
+        kind = np.concatenate([np.zeros(len(held_e), dtype=np.int8), np.ones(len(new_e), dtype=np.int8)])
+        idx = np.lexsort((cand_p, kind, -scores[cand_e, cand_p], cand_e))
+        cand_e, cand_p = cand_e[idx], cand_p[idx]
+        accept = np.ones(len(cand_e), dtype=bool)
+        active = np.arange(len(cand_e))
+        while len(active):
+            # Only the proposals of experts that are still over capacity are looked at again
+            sub_e = cand_e[active]
+            segment_start = np.searchsorted(sub_e, sub_e, side='left')
+            used = np.cumsum(np.where(accept[active], pages[cand_p[active]], 0.0))
+            used -= np.concatenate([[0.0], used])[segment_start]
+            over = np.flatnonzero(accept[active] & (used > capacity[sub_e]))
+            if len(over) == 0:
+                break
+            # Reject the first proposal of each such expert that does not fit, then look again
+            _, first = np.unique(segment_start[over], return_index=True)
+            accept[active[over[first]]] = False
+            active = active[np.isin(sub_e, sub_e[over])]
+        held_e, held_p = cand_e[accept], cand_p[accept]
+
+        # Papers keep their best `k` reviewers within the per-group limit
+        held_s = scores[held_e, held_p]
+        idx = np.lexsort((held_e, -held_s, held_p))
+        held_e, held_p = held_e[idx], held_p[idx]
+        if groups is not None:
+            key = held_p * (int(groups.max()) + 1) + groups[held_e]
+            key_order = np.argsort(key, kind='stable')
+            sorted_key = key[key_order]
+            within = np.empty(len(key), dtype=np.int64)
+            within[key_order] = np.arange(len(key)) - np.searchsorted(sorted_key, sorted_key, side='left')
+            keep = within < max_per_group
+            held_e, held_p = held_e[keep], held_p[keep]
+        keep = np.arange(len(held_p)) - np.searchsorted(held_p, held_p, side='left') < k
+        held_e, held_p = held_e[keep], held_p[keep]
+        held_count = np.bincount(held_p, minlength=n_papers)
+
+        # Only the papers and experts whose assignments changed need their side of the blocking pairs again
+        changed = np.setxor1d(before, held_e * n_papers + held_p)
+        changed_p, changed_e = np.unique(changed % n_papers), np.unique(changed // n_papers)
+        wants[:, changed_p] = kWayWants(scores, held_e, held_p, k, groups, max_per_group, changed_p)
+        accepts[changed_e] = kWayAccepts(scores, held_e, held_p, pages, capacity, changed_e)
+
+    held_s = scores[held_e, held_p]
+    idx = np.lexsort((held_e, -held_s, held_p))
+    held_e, held_p, held_s = held_e[idx], held_p[idx], held_s[idx]
+    slot = np.arange(len(held_p)) - np.searchsorted(held_p, held_p, side='left')
+    return held_e, held_p, held_s, slot, {'rounds': rounds, 'proposals': proposals,
+                                           'blocking': int(blocking.sum())}
+
+
+def stableMatch(scores: np.ndarray, on_event=None, checkpoint=None, state: dict = None):
+    """
+    Runs the make-up/break-up stable matching used by `MainWindow.stableMatch` on a score matrix.
+
+    Experts sweep over all papers; a free pair with a positive score is matched ("make-up"), and
+    an expert takes over a paper when the new score beats both its own current score and that of
+    the paper's current expert, who becomes free again ("break-up"). Sweeps repeat while papers are
+    free and the previous sweep changed something.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - on_event (Callable, optional): Called as `on_event(expert, paper, score, broken_expert, matched)`
+      on every make-up. `broken_expert` is the index of the expert who lost the paper, or -1.
+      `matched` is the number of matched experts after the event.
+    - checkpoint (checkpoint.MatchCheckpoint, optional): Saves the state after an expert's row
+      whenever the checkpoint is due.
+    - state (dict, optional): A saved state (`checkpoint.loadCheckpoint`) to continue from; the run
+      picks up at the saved expert of the saved sweep and ends with the same result as an
+      uninterrupted run.
+
+    Returns:
+    - tuple: (expert_match, expert_score) lists; `expert_match[e]` is the paper index of expert `e`
+      or -1 if the expert stayed free.
+    """
+    n_experts, n_papers = scores.shape
+    rows = scores.tolist()
+    expert_match = [-1] * n_experts
+    paper_match = [-1] * n_papers
+    expert_score = [0] * n_experts
+    matched = 0
+    changed = True
+    sweep, first = 0, 0
+    if state is not None:
+        expert_match = np.asarray(state['expert_match']).tolist()
+        paper_match = np.asarray(state['paper_match']).tolist()
+        expert_score = np.asarray(state['expert_score']).tolist()
+        matched, changed = int(state['matched']), bool(state['changed'])
+        sweep, first = int(state['sweep']), int(state['next_expert'])
+    while first > 0 or (matched < n_papers and changed):
+        if first == 0:
+            changed = False
+        for e in range(first, n_experts):
+            row = rows[e]
+            for p in range(n_papers):
+                score = row[p]
+                if score > 0 and expert_match[e] < 0 and paper_match[p] < 0:
+                    expert_match[e] = p
+                    paper_match[p] = e
+                    expert_score[e] = score
+                    matched += 1
+                    changed = True
+                    if on_event:
+                        on_event(e, p, score, -1, matched)
+                elif score > expert_score[e]:
+                    holder = paper_match[p]
+                    if score > (expert_score[holder] if holder >= 0 else 0):
+                        previous = expert_match[e]
+                        if previous >= 0:
+                            paper_match[previous] = -1
+                        if holder >= 0:
+                            expert_match[holder] = -1
+                            expert_score[holder] = 0
+                        expert_match[e] = p
+                        paper_match[p] = e
+                        expert_score[e] = score
+                        matched += (previous < 0) - (holder >= 0)
+                        changed = True
+                        if on_event:
+                            on_event(e, p, score, holder, matched)
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(expert_match=expert_match, paper_match=paper_match, expert_score=expert_score,
+                                sweep=sweep, next_expert=e + 1, changed=changed, matched=matched)
+        first = 0
+        sweep += 1
+    return expert_match, expert_score
+
+
+def blockingPairs(scores: np.ndarray, expert_match):
+    """
+    Counts the pairs that would rather be matched to each other than keep their current partners.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers).
+    - expert_match (array-like): Paper index of each expert, -1 if free.
+
+    Returns:
+    - int: Number of compatible pairs (e, p) whose score beats both the current score of `e` and of `p`
+      (see `verify.verifyMatching` for the full report).
+    """
+    return verifyMatching(scores, expert_match, sample=0)['blocking']
+
+
+def improveMatching(scores: np.ndarray, expert_match, pages, load, maxload, balance: float = 0.0,
+                    time_budget: float = 1.0, cycles: bool = False, on_round=None, chunk: int = 256):
+    """
+    Improves a one-to-one matching by local search over swaps of papers between experts.
+
+    The objective is `total score - balance * variance of the expert loads after saving`, where
+    a paper adds `pages / maxload * 100` to its expert's load (the rule of `onSaveClicked`).
+    Every round evaluates the gain of all 2-swaps (two experts exchange their papers; a free
+    expert can take over a paper, freeing its expert) at once in NumPy, a block of `chunk`
+    experts at a time, and applies the best set of disjoint improving swaps. If no swap
+    improves and `cycles` is set, 3-cycles (a takes b's paper, b takes c's, c takes a's) are
+    tried among the best few moves of each expert. Rounds repeat until nothing improves or
+    `time_budget` seconds have passed.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - expert_match (array-like): Paper index of each expert, -1 if free.
+    - pages (array-like): Page count of each paper.
+    - load, maxload (array-like): Current load (percent) and maximum load of each expert.
+    - balance (float, optional): Weight of the load variance in the objective; 0 optimizes score only.
+    - time_budget (float, optional): Seconds after which no new round is started.
+    - cycles (bool, optional): Also try 3-cycles when no 2-swap improves.
+    - on_round (Callable, optional): Called as `on_round(round_stats)` after every round.
+
+    Returns:
+    - tuple: (expert_match, stats). `expert_match` is the improved array; `stats` holds the score
+      and variance before and after, and per round the move kind, moves applied, objective gain
+      and seconds.
+    """
+    start = time.perf_counter()
+    n_experts, n_papers = scores.shape
+    match = np.asarray(expert_match, dtype=np.int64).copy()
+    # Column `n_papers` is a dummy paper (score 0, no pages) held by every free expert
+    ext = np.zeros((n_experts, n_papers + 1), dtype=np.float64)
+    ext[:, :n_papers] = scores
+    allowed = ext > 0
+    allowed[:, n_papers] = True
+    ext_pages = np.append(np.asarray(pages, dtype=np.float64), 0.0)
+    base = np.asarray(load, dtype=np.float64)
+    per_page = 100.0 / np.asarray(maxload, dtype=np.float64)
+    held = np.where(match >= 0, match, n_papers)
+
+    def objective(held):
+        loads = base + ext_pages[held] * per_page
+        return ext[np.arange(n_experts), held].sum(), loads.var() if n_experts else 0.0
+
+    def moveGains(experts):
+        """
+        Objective gain of rotating papers along each row of `experts` (row i: experts[i, j]
+        takes the paper of experts[i, j + 1], the last takes the paper of the first).
+        """
+        takes = held[np.roll(experts, -1, axis=1)]
+        gain = (ext[experts, takes] - ext[experts, held[experts]]).sum(axis=1)
+        feasible = allowed[experts, takes].all(axis=1)
+        if balance:
+            old = base[experts] + ext_pages[held[experts]] * per_page[experts]
+            new = base[experts] + ext_pages[takes] * per_page[experts]
+            total = loads.sum()
+            squares = (loads ** 2).sum()
+            d_sum = (new - old).sum(axis=1)
+            d_squares = (new ** 2 - old ** 2).sum(axis=1)
+            variance = squares / n_experts - (total / n_experts) ** 2
+            new_variance = (squares + d_squares) / n_experts - ((total + d_sum) / n_experts) ** 2
+            gain -= balance * (new_variance - variance)
+        return np.where(feasible, gain, -np.inf)
+
+    def swapCandidates():
+        found_e, found_g = [], []
+        everyone = np.arange(n_experts)
+        for first in range(0, n_experts, chunk):
+            rows = everyone[first:first + chunk]
+            a = np.repeat(rows, n_experts)
+            b = np.tile(everyone, len(rows))
+            keep = (b > a) & (held[a] != held[b])
+            pairs = np.stack([a[keep], b[keep]], axis=1)
+            gain = moveGains(pairs)
+            improving = np.flatnonzero(gain > 1e-9)
+            if len(improving) > n_experts:
+                improving = improving[np.argpartition(-gain[improving], n_experts)[:n_experts]]
+            found_e.append(pairs[improving])
+            found_g.append(gain[improving])
+        return np.concatenate(found_e) if found_e else np.empty((0, 2), dtype=np.int64), \
+            np.concatenate(found_g) if found_g else np.empty(0)
+
+    def cycleCandidates(width: int = 8):
+        # Best `width` single moves (a takes b's paper) of every expert, then close a -> b -> c -> a
+        everyone = np.arange(n_experts)
+        width = min(width, n_experts - 1)
+        if width < 2:
+            return np.empty((0, 3), dtype=np.int64), np.empty(0)
+        best = np.empty((n_experts, width), dtype=np.int64)
+        for first in range(0, n_experts, chunk):
+            rows = everyone[first:first + chunk]
+            move = ext[rows][:, held] - ext[rows, held[rows]][:, None]
+            move[~allowed[rows][:, held]] = -np.inf
+            move[np.arange(len(rows)), rows] = -np.inf
+            best[rows] = np.argpartition(-move, width - 1, axis=1)[:, :width]
+        a = np.repeat(everyone, width * width)
+        b = np.repeat(best.reshape(-1), width)
+        c = best[best].reshape(-1)
+        keep = (c != a) & (held[a] != held[b]) & (held[b] != held[c]) & (held[a] != held[c])
+        triples = np.stack([a[keep], b[keep], c[keep]], axis=1)
+        gain = moveGains(triples)
+        improving = gain > 1e-9
+        return triples[improving], gain[improving]
+
+    def applyDisjoint(moves, gains):
+        """
+        Applies the best set of moves that share no expert; returns the number applied.
+        """
+        nonlocal held
+        used = np.zeros(n_experts, dtype=bool)
+        chosen = []
+        for index in np.argsort(-gains, kind='stable').tolist():
+            experts = moves[index]
+            if not used[experts].any():
+                used[experts] = True
+                chosen.append(index)
+        before = objective(held)
+        trial = held.copy()
+        for index in chosen:
+            trial[moves[index]] = held[np.roll(moves[index], -1)]
+        after = objective(trial)
+        if after[0] - balance * after[1] <= before[0] - balance * before[1] + 1e-9:
+            # The variance terms of disjoint moves interact; fall back to the single best move
+            chosen = chosen[:1]
+            trial = held.copy()
+            trial[moves[chosen[0]]] = held[np.roll(moves[chosen[0]], -1)]
+        held = trial
+        return len(chosen)
+
+    score_before, variance_before = objective(held)
+    rounds = []
+    while time.perf_counter() - start < time_budget:
+        round_start = time.perf_counter()
+        loads = base + ext_pages[held] * per_page
+        before = objective(held)
+        kind = 'swap'
+        moves, gains = swapCandidates()
+        if len(gains) == 0 and cycles:
+            kind = 'cycle'
+            moves, gains = cycleCandidates()
+        if len(gains) == 0:
+            break
+        applied = applyDisjoint(moves, gains)
+        after = objective(held)
+        rounds.append({
+            'kind': kind,
+            'moves': applied,
+            'gain': (after[0] - balance * after[1]) - (before[0] - balance * before[1]),
+            'score_gain': after[0] - before[0],
+            'seconds': time.perf_counter() - round_start,
+        })
+        if on_round:
+            on_round(rounds[-1])
+
+    score_after, variance_after = objective(held)
+    match = np.where(held == n_papers, -1, held)
+    return match, {
+        'score_before': score_before, 'score_after': score_after,
+        'variance_before': variance_before, 'variance_after': variance_after,
+        'rounds': rounds, 'seconds': time.perf_counter() - start,
+    }
+
+
+# Score matrix of the running auction and the shared memory holding it, attached by
+# `attachAuctionMatrix` in worker processes
+_auction_matrix = None
+_auction_memory = None
+
+
+def attachAuctionMatrix(name: str, shape: tuple):
+    global _auction_matrix, _auction_memory
+    _auction_memory = shared_memory.SharedMemory(name=name)
+    _auction_matrix = np.ndarray(shape, dtype=np.float64, buffer=_auction_memory.buf)
+
+
+def auctionBids(persons: np.ndarray, prices: np.ndarray, matrix: np.ndarray = None):
+    """
+    Best object of each person at the current prices and the price it bids for it
+    (before adding epsilon): `price + best value - second best value`.
+    """
+    values = (_auction_matrix if matrix is None else matrix)[persons] - prices
+    if values.shape[1] < 2:
+        return np.zeros(len(persons), dtype=np.int64), prices[0] + np.zeros(len(persons))
+    top = np.argpartition(-values, 1, axis=1)[:, :2]
+    rows = np.arange(len(persons))
+    first, second = values[rows, top[:, 0]], values[rows, top[:, 1]]
+    swap = second > first
+    best = np.where(swap, top[:, 1], top[:, 0])
+    return best, prices[best] + np.abs(first - second)
+
+
+def auctionMatch(scores: np.ndarray, tolerance: float = 0.0, scaling: float = 4.0, deadline: float = None,
+                 workers: int = 1, chunk: int = 2048):
+    """
+    One-to-one assignment maximizing the total score with the auction algorithm and epsilon scaling.
+
+    Unassigned experts bid for their best paper at the current prices, all of them at once in
+    every round (Jacobi bidding): each bids the price plus the gap between its best and second best
+    value plus epsilon, and every paper goes to its highest bidder. Epsilon starts large (fast,
+    rough) and is divided by `scaling` after every phase until it reaches the target precision.
+    The problem is padded to a square matrix; incompatible (0 score) pairs in the result count as
+    unmatched, so the result is a maximum-score matching.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - tolerance (float, optional): Quality/speed knob. The result is within `min(experts, papers) *
+      tolerance` of the optimum; 0 gives the exact optimum for integer scores.
+    - scaling (float, optional): Factor by which epsilon shrinks between phases.
+    - deadline (float, optional): Seconds after which bidding stops and the best result so far is returned.
+    - workers (int, optional): Worker processes that compute the bids of large rounds; the matrix is
+      shared with them through shared memory.
+    - chunk (int, optional): Rounds with fewer bidders than this are computed in-process.
+
+    Returns:
+    - tuple: (expert_match, stats). `expert_match[e]` is the paper index of expert `e` or -1.
+      `stats` holds the phases (epsilon, rounds, seconds), the total score `primal`, the dual upper
+      bound `dual` on the optimum, the `gap` between them, `timed_out` and `seconds`.
+    """
+    start = time.perf_counter()
+    n_experts, n_papers = scores.shape
+    size = max(n_experts, n_papers)
+    # Scaling by size + 1 makes epsilon = 1 exact for integer scores
+    scale = size + 1
+    matrix = np.zeros((size, size), dtype=np.float64)
+    matrix[:n_experts, :n_papers] = scores
+    matrix *= scale
+    final_epsilon = max(1.0, tolerance * scale)
+    epsilon = max(final_epsilon, matrix.max(initial=0.0) / scaling)
+    prices = np.zeros(size)
+    assigned = np.full(size, -1, dtype=np.int64)
+    owner = np.full(size, -1, dtype=np.int64)
+
+    executor = memory = None
+    if workers > 1 and size >= chunk:
+        memory = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+        shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=memory.buf)
+        shared[:] = matrix
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=attachAuctionMatrix, initargs=(memory.name, matrix.shape))
+
+    def bids(persons):
+        if executor is None or len(persons) < chunk:
+            return auctionBids(persons, prices, matrix)
+        parts = np.array_split(persons, workers)
+        results = list(executor.map(auctionBids, parts, [prices] * len(parts)))
+        return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+    def primal(assigned):
+        rows = np.flatnonzero(assigned[:n_experts] >= 0)
+        rows = rows[assigned[rows] < n_papers]
+        return scores[rows, assigned[rows]].sum() if len(rows) else 0
+
+    best, best_value = assigned.copy(), 0
+    phases = []
+    timed_out = False
+    try:
+        while True:
+            phase_start = time.perf_counter()
+            assigned[:] = -1
+            owner[:] = -1
+            rounds = 0
+            while True:
+                persons = np.flatnonzero(assigned < 0)
+                if len(persons) == 0:
+                    break
+                if deadline is not None and time.perf_counter() - start > deadline:
+                    timed_out = True
+                    break
+                objects, bid = bids(persons)
+                bid = bid + epsilon
+                # Every object goes to its highest bidder
+                order = np.lexsort((-bid, objects))
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = objects[order][1:] != objects[order][:-1]
+                winners = order[first]
+                won = objects[winners]
+                outbid = owner[won]
+                assigned[outbid[outbid >= 0]] = -1
+                owner[won] = persons[winners]
+                assigned[persons[winners]] = won
+                prices[won] = bid[winners]
+                rounds += 1
+            value = primal(assigned)
+            if value >= best_value:
+                best, best_value = assigned.copy(), value
+            phases.append({'epsilon': float(epsilon / scale), 'rounds': rounds, 'seconds': time.perf_counter() - phase_start})
+            if timed_out or epsilon <= final_epsilon:
+                break
+            epsilon = max(final_epsilon, epsilon / scaling)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+            memory.close()
+            memory.unlink()
+
+    # Any prices give an upper bound on the optimum (weak duality)
+    dual = (prices.sum() + (matrix - prices).max(axis=1).sum()) / scale if size else 0.0
+    expert_match = best[:n_experts].copy()
+    matched = np.flatnonzero((expert_match >= 0) & (expert_match < n_papers))
+    valid = np.zeros(n_experts, dtype=bool)
+    valid[matched] = scores[matched, expert_match[matched]] > 0
+    expert_match[~valid] = -1
+    return expert_match, {
+        'phases': phases, 'primal': int(best_value), 'dual': float(dual), 'gap': max(0.0, float(dual - best_value)),
+        'timed_out': timed_out, 'seconds': time.perf_counter() - start,
+    }
@@ -0,0 +1,139 @@
+"""
+Content-addressed memoization of complete match runs.
+
+A run is keyed by a SHA-256 digest of everything its result depends on: the expert and
+paper records (ids, loads, capacities, topic specs, pages, status), the conflicts and bids,
+the topic similarity, the algorithm and its parameters. Re-running the same request on the
+same state (an accidental click, a UI reset, an undo back to an earlier state) hashes to the
+same key and returns the stored result at once; any change to the inputs gives a new key,
+so entries never need to be invalidated, only evicted.
+
+`MatchCache` keeps the most recently used results up to an entry and a byte limit and counts
+hits and misses for the instrumentation (GUI status bar, `/metrics` of `service.py`).
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def feed(hasher, value):
+    """
+    Adds `value` to `hasher` with its type and shape, so equal digests mean equal inputs.
+
+    Supports NumPy arrays (including structured record arrays), `RecordTable`s (their records;
+    names and titles do not affect a match), dicts, lists, tuples, scalars, strings and None,
+    and other objects through their attributes (e.g. `ConstraintStore`).
+    """
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        hasher.update(f'a{value.dtype.descr}{value.shape}'.encode())
+        hasher.update(value.tobytes())
+    elif isinstance(value, dict):
+        hasher.update(f'd{len(value)}'.encode())
+        for key in sorted(value, key=repr):
+            feed(hasher, key)
+            feed(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f'l{len(value)}'.encode())
+        for item in value:
+            feed(hasher, item)
+    elif value is None or isinstance(value, (str, bytes, bool, int, float, np.generic)):
+        hasher.update(f'{type(value).__name__}:{value!r};'.encode())
+    elif hasattr(value, 'data') and hasattr(value, 'rowOf'):
+        feed(hasher, value.data)
+    else:
+        hasher.update(type(value).__name__.encode())
+        feed(hasher, vars(value))
+
+
+def runKey(*parts):
+    """
+    Returns the hex digest of `parts` (see `feed`).
+
+    Usage:
+        key = runKey('Stable', experts, papers, constraints, {'batch_size': 10, 'scoring': 'Positional'})
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        feed(hasher, part)
+    return hasher.hexdigest()
+
+
+class MatchCache:
+    """
+    Thread-safe LRU cache of run results with an entry and a byte limit.
+
+    The size of a result is its pickled size. Results larger than `max_bytes` are not stored.
+    Callers must not modify a result they got from the cache.
+
+    Attributes:
+    ----------
+    hits, misses, evictions : int
+        Lookups that found / did not find a result, and results dropped to make room.
+    """
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Returns the result stored under `key` and marks it most recently used, or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result):
+        """
+        Stores `result` under `key`, evicting the least recently used results beyond the limits.
+        """
+        size = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, dropped) = self.entries.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """
+        Returns the hit and miss counts, hit rate, evictions, entries and bytes in use.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'evictions': self.evictions, 'entries': len(self.entries), 'bytes': self.bytes,
+                    'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+
+
+def describeCache(stats: dict):
+    """
+    One-line summary of `MatchCache.stats` for the status bar and logs.
+    """
+    return (f'run cache {stats["hits"]}/{stats["hits"] + stats["misses"]} hits ({stats["hit_rate"]:.0%}), '
+            f'{stats["entries"]} entries, {stats["bytes"] / 1024:.0f} KiB')
@@ -0,0 +1,181 @@
+"""
+Out-of-core stable matching on memory-mapped preference lists.
+
+The in-memory engine (`matching.stableMatch`) needs the whole (experts x papers) score matrix,
+and a Python list copy of it, in RAM. Here the scores are written once, a block of experts at
+a time, as sorted preference lists on disk:
+
+- `offsets.npy`: where the list of every expert starts (experts + 1 int64),
+- `papers.bin`: the compatible papers (score > 0) of every expert, best score first and
+  equal scores by paper index (int32),
+- `scores.bin`: the score of every entry of `papers.bin`, i.e. the expert's ranking of the
+  papers as scores (int32).
+
+`streamStableMatch` memory-maps the lists and streams each expert's proposals from them. The
+make-up/break-up sweep of `stableMatch` takes, in paper order, every paper whose score beats both
+the expert's current score and that of the paper's holder. Those papers are exactly the "records"
+of the expert's sorted list: walking it from the top while scores beat the expert's current
+score, an eligible paper is taken if it comes before every eligible paper seen so far. So the
+walk stops as soon as the scores drop to the current one, and the result and the sequence
+of events are the same as with `stableMatch`.
+
+Besides the mapped files (paged in and out by the OS) the matcher holds only per-expert and
+per-paper arrays, so its memory grows with experts + papers instead of experts x papers.
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import os
+import numpy as np
+from scoring import scoreTables
+
+
+class PreferenceLists:
+    """
+    Read-only view of the preference lists written by `writePreferences`.
+
+    Attributes:
+    ----------
+    offsets : np.ndarray
+        Start of the list of each expert in `papers` and `scores` (in RAM, experts + 1 entries).
+    papers, scores : np.ndarray
+        Memory-mapped paper indices and scores of all lists.
+    shape : tuple
+        (experts, papers) of the scored batch.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.offsets = np.load(os.path.join(directory, 'offsets.npy'))
+        self.n_papers = int(np.load(os.path.join(directory, 'shape.npy'))[1])
+        count = int(self.offsets[-1])
+        # Plain ndarray views of the mappings: slicing them is cheaper than slicing np.memmap objects
+        self.papers = np.asarray(self.mapFile('papers.bin', count))
+        self.scores = np.asarray(self.mapFile('scores.bin', count))
+
+    def mapFile(self, name: str, count: int):
+        if count == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.memmap(os.path.join(self.directory, name), dtype=np.int32, mode='r', shape=(count,))
+
+    @property
+    def shape(self):
+        return len(self.offsets) - 1, self.n_papers
+
+    def nbytes(self):
+        """
+        Size of the lists on disk.
+        """
+        return self.offsets.nbytes + self.papers.nbytes + self.scores.nbytes
+
+
+def writePreferences(directory: str, score_blocks, n_papers: int):
+    """
+    Writes the preference lists of a score matrix given as consecutive blocks of expert rows.
+
+    Parameters:
+    - directory (str): Target directory, created if needed; existing lists are overwritten.
+    - score_blocks (iterable): (rows, papers) score arrays of consecutive experts; only one block is
+      in memory at a time.
+    - n_papers (int): Number of papers (columns).
+
+    Returns:
+    - PreferenceLists: The lists just written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    counts = []
+    with open(os.path.join(directory, 'papers.bin'), 'wb') as papers_file, \
+            open(os.path.join(directory, 'scores.bin'), 'wb') as scores_file:
+        for block in score_blocks:
+            block = np.asarray(block)
+            # Best score first; the stable sort keeps equal scores in paper order, as the sweep visits them
+            order = np.argsort(-block, axis=1, kind='stable')
+            ranked = np.take_along_axis(block, order, axis=1)
+            compatible = ranked > 0
+            papers_file.write(order[compatible].astype(np.int32).tobytes())
+            scores_file.write(ranked[compatible].astype(np.int32).tobytes())
+            counts.append(compatible.sum(axis=1))
+    counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    np.save(os.path.join(directory, 'offsets.npy'), np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+    np.save(os.path.join(directory, 'shape.npy'), np.array([len(counts), n_papers], dtype=np.int64))
+    return PreferenceLists(directory)
+
+
+def scorePreferences(directory: str, experts, papers, n_topics: int, constraints=None, scoring: str = 'Positional',
+                     similarity=None, chunk: int = 1024):
+    """
+    Scores an `ExpertTable` x `PaperTable` batch with `scoring.scoreTables`, `chunk` experts at a time,
+    and writes the preference lists, so the full score matrix never exists in memory.
+
+    Returns:
+    - PreferenceLists: The lists just written.
+    """
+    blocks = (scoreTables(experts[first:first + chunk], papers, n_topics, constraints, scoring, similarity)
+              for first in range(0, len(experts), chunk))
+    return writePreferences(directory, blocks, len(papers))
+
+
+def streamStableMatch(prefs: PreferenceLists, on_event=None, block: int = 64):
+    """
+    Runs the make-up/break-up stable matching of `matching.stableMatch` on preference lists on disk.
+
+    Parameters:
+    - prefs (PreferenceLists): Lists written by `writePreferences` or `scorePreferences`.
+    - on_event (Callable, optional): Called exactly as by `stableMatch`, with the same events in the same order.
+    - block (int, optional): Entries read at the start of a walk; the size doubles while an expert's
+      walk goes on (up to 64 times).
+
+    Returns:
+    - tuple: (expert_match, expert_score) lists, equal to those of `stableMatch` on the same scores.
+    """
+    n_experts, n_papers = prefs.shape
+    offsets = prefs.offsets.tolist()
+    expert_match = [-1] * n_experts
+    paper_match = [-1] * n_papers
+    expert_score = [0] * n_experts
+    # Score of the current holder of every paper (0 if free), for vectorized eligibility checks
+    paper_score = np.zeros(n_papers, dtype=np.int64)
+    matched = 0
+    changed = True
+    while matched < n_papers and changed:
+        changed = False
+        for e in range(n_experts):
+            current = expert_score[e]
+            position, end = offsets[e], offsets[e + 1]
+            size = block
+            first_col = n_papers
+            records = []
+            while position < end:
+                cols = prefs.papers[position:min(end, position + size)]
+                scores = prefs.scores[position:position + len(cols)]
+                # Scores are sorted, so nothing after the first one that does not beat the current one counts
+                stop = int(np.searchsorted(-scores, -current, side='left'))
+                cols, scores = cols[:stop], scores[:stop]
+                eligible = scores > paper_score[cols]
+                if eligible.any():
+                    cols, scores = cols[eligible], scores[eligible]
+                    before = np.minimum.accumulate(np.concatenate([[first_col], cols[:-1]]))
+                    record = cols < before
+                    records.extend(zip(cols[record].tolist(), scores[record].tolist()))
+                    first_col = min(first_col, int(cols.min()))
+                if stop < size:
+                    break
+                position += size
+                size = min(size * 2, block * 64)
+            # Records in paper order have rising scores: the sweep takes each of them in turn
+            for p, score in sorted(records):
+                holder = paper_match[p]
+                previous = expert_match[e]
+                if previous >= 0:
+                    paper_match[previous] = -1
+                    paper_score[previous] = 0
+                if holder >= 0:
+                    expert_match[holder] = -1
+                    expert_score[holder] = 0
+                expert_match[e] = p
+                paper_match[p] = e
+                expert_score[e] = score
+                paper_score[p] = score
+                matched += (previous < 0) - (holder >= 0)
+                changed = True
+                if on_event:
+                    on_event(e, p, score, holder, matched)
+    return expert_match, expert_score
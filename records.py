@@ -0,0 +1,223 @@
+"""
+Compact record types for experts and papers.
+
+Single records are `__slots__` classes (`Expert`, `Paper`). Collections are
+`RecordTable`s: a structured NumPy array of the numeric columns, with topics stored
+as int16 codes from a `TopicIndex`, plus a plain list for the one text column
+(expert name or paper description), which is only needed for display. Rows are found
+by id with a sorted search instead of `list.index()`.
+"""
+import sqlite3
+import numpy as np
+
+SPEC_LENGTH = 5
+
+EXPERT_DTYPE = np.dtype([
+    ('id', np.int32),
+    ('load', np.float64),
+    ('maxload', np.float64),
+    ('topics', np.int16, (SPEC_LENGTH,)),
+])
+
+PAPER_DTYPE = np.dtype([
+    ('id', np.int32),
+    ('pages', np.int32),
+    ('expertid', np.int32),
+    ('status', np.int8),
+    ('topics', np.int16, (SPEC_LENGTH,)),
+])
+
+
+def lookupPositions(keys, values):
+    """
+    Finds the position of each value in `keys` with a sorted search.
+
+    Parameters:
+    - keys (array-like): Ids in batch order (e.g. the ids of a `RecordTable`).
+    - values (array-like): Ids to look up.
+
+    Returns:
+    - np.ndarray: Position of each value in `keys`, or -1 where the value is absent.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    if len(keys) == 0 or len(values) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    pos = np.clip(np.searchsorted(sorted_keys, values), 0, len(keys) - 1)
+    return np.where(sorted_keys[pos] == values, order[pos], -1)
+
+
+class TopicIndex:
+    """
+    Two-way mapping between topic names and dense integer codes.
+
+    Codes follow the row order of the `expertise` table; `expids` keeps the table's own
+    ids for display. Topics not found in the table get new codes on first use (with None
+    as their id, since they have none), and empty slots are encoded as -1.
+    """
+    __slots__ = ('names', 'expids', 'codes')
+
+    def __init__(self, rows=()):
+        self.names = [row[1] for row in rows]
+        self.expids = [row[0] for row in rows]
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        if name is None:
+            return -1
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+            self.expids.append(None)
+        return code
+
+    def encode(self, specs):
+        """
+        Encodes a list of topic lists into an int16 array of shape (len(specs), 5).
+        """
+        return np.array([[self.code(topic) for topic in spec] for spec in specs], dtype=np.int16).reshape(-1, SPEC_LENGTH)
+
+    def name(self, code):
+        return self.names[code] if code >= 0 else 'None'
+
+    def expid(self, code):
+        expid = self.expids[code] if code >= 0 else None
+        return 'None' if expid is None else expid
+
+
+class Expert:
+    __slots__ = ('id', 'name', 'load', 'maxload', 'topics')
+
+    def __init__(self, id, name, load, maxload, topics):
+        self.id, self.name, self.load, self.maxload, self.topics = id, name, load, maxload, topics
+
+
+class Paper:
+    __slots__ = ('id', 'title', 'pages', 'expertid', 'status', 'topics')
+
+    def __init__(self, id, title, pages, expertid, status, topics):
+        self.id, self.title, self.pages, self.expertid, self.status, self.topics = id, title, pages, expertid, status, topics
+
+
+class RecordTable:
+    """
+    A structured array of records plus their text column.
+
+    Indexing with an integer returns a single record object; indexing with a slice,
+    integer array or boolean mask returns a new table with those rows.
+
+    Attributes:
+    ----------
+    data : np.ndarray
+        Structured array (`EXPERT_DTYPE` or `PAPER_DTYPE`).
+    text : list
+        Expert names or paper descriptions, aligned with `data`.
+    """
+    __slots__ = ('data', 'text')
+
+    def __init__(self, data, text):
+        self.data = data
+        self.text = list(text)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.record(int(index))
+        data = self.data[index]
+        if isinstance(index, slice):
+            text = self.text[index]
+        else:
+            positions = np.arange(len(self.data))[index]
+            text = [self.text[i] for i in positions.tolist()]
+        return type(self)(data, text)
+
+    @property
+    def ids(self):
+        return self.data['id']
+
+    def rowOf(self, ids):
+        """
+        Returns the row of each id (-1 where absent).
+        """
+        return lookupPositions(self.data['id'], ids)
+
+    def nbytes(self):
+        return self.data.nbytes
+
+
+class ExpertTable(RecordTable):
+    __slots__ = ()
+
+    def record(self, row: int):
+        item = self.data[row]
+        return Expert(int(item['id']), self.text[row], float(item['load']), float(item['maxload']), tuple(item['topics'].tolist()))
+
+    @property
+    def names(self):
+        return self.text
+
+
+class PaperTable(RecordTable):
+    __slots__ = ()
+
+    def record(self, row: int):
+        item = self.data[row]
+        return Paper(int(item['id']), self.text[row], int(item['pages']), int(item['expertid']), int(item['status']),
+                     tuple(item['topics'].tolist()))
+
+    @property
+    def titles(self):
+        return self.text
+
+
+def expertsFromRows(rows, topics: TopicIndex):
+    """
+    Builds an `ExpertTable` from `expertname` rows (expertid, name, load, maxload, expertise1..5).
+    """
+    data = np.zeros(len(rows), dtype=EXPERT_DTYPE)
+    if rows:
+        data['id'] = [row[0] for row in rows]
+        data['load'] = [row[2] for row in rows]
+        data['maxload'] = [row[3] for row in rows]
+        data['topics'] = topics.encode([row[4:9] for row in rows])
+    return ExpertTable(data, [row[1] for row in rows])
+
+
+def papersFromRows(rows, topics: TopicIndex):
+    """
+    Builds a `PaperTable` from `papers` rows (paperid, desc, pages, expertid, status, expertise1..5).
+    """
+    data = np.zeros(len(rows), dtype=PAPER_DTYPE)
+    if rows:
+        data['id'] = [row[0] for row in rows]
+        data['pages'] = [row[2] for row in rows]
+        data['expertid'] = [row[3] for row in rows]
+        data['status'] = [row[4] for row in rows]
+        data['topics'] = topics.encode([row[5:10] for row in rows])
+    return PaperTable(data, [row[1] for row in rows])
+
+
+def loadExperts(connection: sqlite3.Connection, topics: TopicIndex, where: str = '', params=()):
+    """
+    Reads experts from the `expertname` table, e.g. `loadExperts(conn, topics, 'WHERE load < ?', (80,))`.
+    """
+    rows = connection.execute('SELECT expertid, name, load, maxload, expertise1, expertise2, expertise3, '
+                              f'expertise4, expertise5 FROM expertname {where}', params).fetchall()
+    return expertsFromRows(rows, topics)
+
+
+def loadPapers(connection: sqlite3.Connection, topics: TopicIndex, where: str = '', params=()):
+    """
+    Reads papers from the `papers` table, e.g. `loadPapers(conn, topics, 'WHERE expertid = -1')`.
+    """
+    rows = connection.execute('SELECT paperid, desc, pages, expertid, status, expertise1, expertise2, expertise3, '
+                              f'expertise4, expertise5 FROM papers {where}', params).fetchall()
+    return papersFromRows(rows, topics)
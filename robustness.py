@@ -0,0 +1,210 @@
+"""
+Monte Carlo robustness check of a matching against reviewer dropout and shrinking capacities.
+
+Every trial perturbs the current state and repairs the matching the way it would be repaired
+in practice:
+
+- each expert drops out with a probability drawn from `dropout` (5-15% by default),
+- some of the remaining experts lose part of their page capacity (`shrink_rate`, `shrink`),
+- papers of dropped experts, and papers that no longer fit a shrunk capacity, become orphans,
+- the orphans are re-matched by `matching.stableMatch` to the present experts of the pool that
+  hold no paper and still have room for them.
+
+The trials run in a process pool. The score matrix is placed in shared memory once and every
+worker maps it instead of receiving a pickled copy, so hundreds of trials on a large pool cost
+no more transfer than one. Each trial draws from its own seed, so the result does not depend
+on the number of workers.
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import os
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matching import stableMatch
+
+# Shared score matrix and pool arrays of a worker process (set by `attachWorker`)
+worker = {}
+
+
+def attachWorker(name: str, shape: tuple, dtype: str, arrays: dict):
+    """
+    Pool initializer: maps the shared score matrix and keeps the small per-expert and per-paper arrays.
+    """
+    # Workers share the resource tracker of the parent, which owns and unlinks the segment
+    segment = shared_memory.SharedMemory(name=name)
+    worker['segment'] = segment
+    worker['scores'] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    worker.update(arrays)
+
+
+def runTrials(seeds: list, params: dict):
+    """
+    Runs the trials of `seeds` in a worker process on the arrays of `attachWorker`.
+
+    Returns:
+    - tuple: (total_score, unassigned, dropped, reassigned, load_spike) arrays with one entry (row) per trial.
+    """
+    scores = worker['scores']
+    expert_match, pages = worker['expert_match'], worker['pages']
+    used, maxload = worker['used'], worker['maxload']
+    n_experts, n_papers = scores.shape
+    matched = np.flatnonzero(expert_match >= 0)
+    baseline_pages = np.zeros(n_experts)
+    baseline_pages[matched] = pages[expert_match[matched]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        baseline_load = (used + baseline_pages) / maxload * 100
+
+    total_score = np.zeros(len(seeds), dtype=np.int64)
+    unassigned = np.zeros(len(seeds), dtype=np.int64)
+    dropped = np.zeros(len(seeds), dtype=np.int64)
+    reassigned = np.zeros(len(seeds), dtype=np.int64)
+    load_spike = np.full((len(seeds), n_experts), np.nan, dtype=np.float32)
+    for trial, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        present = rng.random(n_experts) >= rng.uniform(*params['dropout'])
+        shrunk = present & (rng.random(n_experts) < params['shrink_rate'])
+        capacity = maxload * np.where(shrunk, 1 - rng.uniform(*params['shrink'], size=n_experts), 1.0)
+
+        trial_match = expert_match.copy()
+        trial_match[~present] = -1
+        # A shrunk expert gives up a paper that no longer fits; pairs of unchanged experts are kept as they are
+        held = np.flatnonzero(trial_match >= 0)
+        overflow = held[shrunk[held] & (used[held] + pages[trial_match[held]] > capacity[held])]
+        trial_match[overflow] = -1
+        orphans = np.setdiff1d(expert_match[matched], trial_match[trial_match >= 0])
+        candidates = np.flatnonzero(present & (trial_match < 0))
+        if len(orphans) and len(candidates):
+            sub = scores[np.ix_(candidates, orphans)].astype(np.int64)
+            sub[used[candidates, None] + pages[None, orphans] > capacity[candidates, None]] = 0
+            sub_match, _ = stableMatch(sub)
+            sub_match = np.asarray(sub_match, dtype=np.int64)
+            taken = sub_match >= 0
+            trial_match[candidates[taken]] = orphans[sub_match[taken]]
+            reassigned[trial] = int(taken.sum())
+
+        now = np.flatnonzero(trial_match >= 0)
+        total_score[trial] = int(scores[now, trial_match[now]].sum())
+        unassigned[trial] = len(matched) - len(now)
+        dropped[trial] = int((~present).sum())
+        trial_pages = np.zeros(n_experts)
+        trial_pages[now] = pages[trial_match[now]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spike = (used + trial_pages) / capacity * 100 - baseline_load
+        load_spike[trial, present] = spike[present]
+    return total_score, unassigned, dropped, reassigned, load_spike
+
+
+def simulateDropout(scores: np.ndarray, expert_match, pages, load, maxload, trials: int = 200,
+                    dropout: tuple = (0.05, 0.15), shrink_rate: float = 0.1, shrink: tuple = (0.1, 0.5),
+                    seed: int = 0, max_workers=None, chunk: int = None):
+    """
+    Re-matches `trials` perturbed copies of the current state in parallel worker processes.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of the expert pool x the papers of the matching; 0 marks incompatible pairs.
+      The pool may hold more experts than the matching, they are the spare reviewers for orphaned papers.
+    - expert_match (array-like): Paper index of each expert of the pool, -1 if free.
+    - pages (array-like): Page count of each paper.
+    - load, maxload (array-like): Current load (percent) and maximum load (pages) of each expert.
+    - trials (int, optional): Number of perturbed re-matchings.
+    - dropout (tuple, optional): Range of the dropout rate; each trial draws its rate from it.
+    - shrink_rate (float, optional): Share of the present experts whose capacity shrinks in a trial.
+    - shrink (tuple, optional): Range of the share of capacity a shrunk expert loses.
+    - seed (int, optional): Seed of the trials.
+    - max_workers (int, optional): Number of worker processes, defaults to the CPU count.
+    - chunk (int, optional): Trials per task, defaults to an even split into four tasks per worker.
+
+    Returns:
+    - dict:
+        - `baseline`: `total_score` and `assigned` of the unperturbed matching,
+        - `total_score`, `unassigned` (papers of the matching left without a reviewer), `dropped` (experts)
+          and `reassigned` (orphans given to another expert): arrays with one value per trial,
+        - `load_spike`: (trials, experts) array of the change of each expert's load in percentage points
+          against the unperturbed matching (NaN where the expert dropped out),
+        - `trials`, `workers`, `seconds`.
+    """
+    start = time.perf_counter()
+    scores = np.ascontiguousarray(scores)
+    expert_match = np.asarray(expert_match, dtype=np.int64)
+    maxload = np.asarray(maxload, dtype=np.float64)
+    arrays = {
+        'expert_match': expert_match,
+        'pages': np.asarray(pages, dtype=np.float64),
+        'used': np.asarray(load, dtype=np.float64) * maxload / 100,
+        'maxload': maxload,
+    }
+    params = {'dropout': dropout, 'shrink_rate': shrink_rate, 'shrink': shrink}
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+    workers = max_workers or os.cpu_count() or 1
+    chunk = chunk or max(1, -(-trials // (workers * 4)))
+
+    segment = shared_memory.SharedMemory(create=True, size=max(1, scores.nbytes))
+    try:
+        np.ndarray(scores.shape, dtype=scores.dtype, buffer=segment.buf)[...] = scores
+        # Spawned workers do not inherit the Qt state of the GUI process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=attachWorker,
+                                 initargs=(segment.name, scores.shape, scores.dtype.str, arrays)) as executor:
+            tasks = [seeds[i:i + chunk] for i in range(0, trials, chunk)]
+            parts = list(executor.map(runTrials, tasks, [params] * len(tasks)))
+    finally:
+        segment.close()
+        segment.unlink()
+
+    matched = np.flatnonzero(expert_match >= 0)
+    result = {'baseline': {'total_score': int(scores[matched, expert_match[matched]].sum()), 'assigned': len(matched)}}
+    for index, key in enumerate(('total_score', 'unassigned', 'dropped', 'reassigned')):
+        result[key] = np.concatenate([part[index] for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+    result['load_spike'] = (np.concatenate([part[4] for part in parts]) if parts
+                            else np.zeros((0, len(expert_match)), dtype=np.float32))
+    result.update({'trials': trials, 'workers': workers, 'seconds': time.perf_counter() - start})
+    return result
+
+
+def spikeSummary(result: dict, top: int = 10):
+    """
+    The experts with the largest load spikes of a `simulateDropout` result.
+
+    Returns:
+    - list: Up to `top` (expert index, 95th percentile spike, max spike, share of trials with a spike) tuples,
+      largest 95th percentile first; experts that never take on more are left out.
+    """
+    spikes = result['load_spike']
+    if spikes.size == 0:
+        return []
+    present = ~np.isnan(spikes)
+    filled = np.where(present, spikes, 0)
+    p95 = np.percentile(filled, 95, axis=0)
+    peak = filled.max(axis=0)
+    share = (filled > 0.5).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+    order = [e for e in np.argsort(-p95, kind='stable').tolist() if peak[e] > 0.5][:top]
+    return [(e, float(p95[e]), float(peak[e]), float(share[e])) for e in order]
+
+
+def describeRobustness(result: dict, expert_ids=None):
+    """
+    Multi-line summary of a `simulateDropout` result for dialogs and logs; experts are shown by
+    their `expert_ids` if given, otherwise by index.
+    """
+    def spread(values, worst=None):
+        if len(values) == 0:
+            return 'n/a'
+        p5, median, p95 = np.percentile(values, [5, 50, 95]).tolist()
+        return f'median {median:g} (5%: {p5:g}, 95%: {p95:g}' + (f', worst {worst(values)})' if worst else ')')
+
+    baseline = result['baseline']
+    lines = [
+        f'{result["trials"]} trials in {result["seconds"]:.2f} s on {result["workers"]} worker(s)',
+        f'Total score: baseline {baseline["total_score"]}, {spread(result["total_score"], np.min)}',
+        f'Unassigned papers (of {baseline["assigned"]}): {spread(result["unassigned"], np.max)}',
+        f'Dropped experts: {spread(result["dropped"])}; orphans reassigned: {spread(result["reassigned"])}',
+    ]
+    spikes = spikeSummary(result)
+    if spikes:
+        lines.append('Largest load spikes (percentage points, 95% / max / share of trials):')
+        lines += [f'  expert {expert_ids[e] if expert_ids is not None else f"#{e}"}: +{p95:.1f} / +{peak:.1f} / {share:.0%}'
+                  for e, p95, peak, share in spikes]
+    return '\n'.join(lines)
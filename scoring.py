@@ -0,0 +1,367 @@
+"""
+Vectorized scoring helpers for expert-paper matching.
+
+`MainWindow.matchScore` scores one expert against one paper with nested Python
+loops. The same positional score can be written as a product of two topic-rank
+matrices, so a whole batch of experts and papers is scored with one matrix
+multiplication:
+
+    score[e, p] = sum_k expert_rank[e, k] * paper_rank[p, k]
+
+where `expert_rank[e, k]` holds `(5 - i)` for every position `i` at which expert
+`e` lists topic `k`, and `paper_rank[p, k]` holds `(5 - j)` for the first
+position `j` at which paper `p` lists topic `k`. Empty slots count as one more
+topic, as `list.index(None)` does in `matchScore`, so a blank slot of the expert
+matches the first blank slot of the paper.
+
+`SCORINGS` registers this positional score next to other functions written as
+kernels over the same rank matrices. Every kernel returns an int32 matrix where 0
+means "not compatible", so all matchers work with any of them; fractional scores
+are expressed in hundredths (`SCALE`) and a positive similarity never rounds to 0.
+
+Related topics earn partial credit through a (topics x topics) similarity matrix `S`,
+loaded from a CSV file (`loadSimilarity`) or derived from how often topics are listed
+together by experts and papers (`cooccurrenceSimilarity`):
+
+    score = expert_rank @ S @ paper_rank.T
+
+With `S` the identity this is exactly the positional score, so the richer score costs
+one extra (experts x topics x topics) product.
+"""
+import csv
+import numpy as np
+
+SPEC_LENGTH = 5
+
+
+def encodeBatch(expert_spec: list[list], paper_spec: list[list], topic_index: dict):
+    """
+    Converts expert and paper topic strings into integer topic codes.
+
+    Parameters:
+    - expert_spec (list[list]): Topic strings of each expert, in rank order.
+    - paper_spec (list[list]): Topic strings of each paper, in rank order.
+    - topic_index (dict): Mapping of topic string to code, usually built from the `expertise` table.
+
+    Returns:
+    - tuple: (expert_codes, paper_codes, n_topics). The code arrays are int32 with one row per
+      record and `-1` for empty slots. Topics missing from `topic_index` get fresh codes in a
+      local copy, so the caller's dictionary is never modified (safe to share between threads).
+    """
+    index = dict(topic_index)
+
+    def encode(specs):
+        codes = np.full((len(specs), SPEC_LENGTH), -1, dtype=np.int32)
+        for row, spec in enumerate(specs):
+            for col, topic in enumerate(spec[:SPEC_LENGTH]):
+                if topic is not None:
+                    codes[row, col] = index.setdefault(topic, len(index))
+        return codes
+
+    expert_codes = encode(expert_spec)
+    paper_codes = encode(paper_spec)
+    return expert_codes, paper_codes, len(index)
+
+
+def rankMatrix(codes: np.ndarray, n_topics: int, first_only: bool, blanks: bool = False):
+    """
+    Builds the (records x topics) rank matrix for a block of topic codes.
+
+    Parameters:
+    - codes (np.ndarray): Integer topic codes, one row per record, `-1` for empty slots.
+    - n_topics (int): Number of distinct topic codes.
+    - first_only (bool): If True only the first occurrence of a topic counts (paper side of
+      `matchScore`, which uses `list.index`); otherwise every occurrence adds its weight.
+    - blanks (bool, optional): If True empty slots get their own last column, so that they
+      match each other like the `None` entries compared by `matchScore`.
+
+    Returns:
+    - np.ndarray: int32 matrix of positional weights.
+    """
+    n_rows, width = codes.shape
+    rank = np.zeros((n_rows, n_topics + 1), dtype=np.int32)
+    weights = np.broadcast_to(width - np.arange(width, dtype=np.int32), codes.shape)
+    columns = np.where(codes < 0, n_topics, codes)
+    rows = np.broadcast_to(np.arange(n_rows)[:, None], codes.shape)
+    if first_only:
+        # Walk positions from last to first so the earliest position wins.
+        for col in range(width - 1, -1, -1):
+            rank[rows[:, col], columns[:, col]] = weights[:, col]
+    else:
+        np.add.at(rank, (rows, columns), weights)
+    return rank if blanks else rank[:, :n_topics]
+
+
+def scoreMatrix(expert_codes: np.ndarray, paper_codes: np.ndarray, n_topics: int):
+    """
+    Computes the positional `matchScore` for every expert-paper pair at once.
+
+    Parameters:
+    - expert_codes (np.ndarray): Expert topic codes from `encodeBatch`.
+    - paper_codes (np.ndarray): Paper topic codes from `encodeBatch`.
+    - n_topics (int): Number of distinct topic codes.
+
+    Returns:
+    - np.ndarray: int32 matrix of shape (experts, papers), identical to calling
+      `matchScore(expert_spec[e], paper_spec[p])[0]` for each pair.
+    """
+    # Small integers are exact in float32, and float products go through BLAS
+    expert_rank = rankMatrix(expert_codes, n_topics, first_only=False, blanks=True).astype(np.float32)
+    paper_rank = rankMatrix(paper_codes, n_topics, first_only=True, blanks=True).astype(np.float32)
+    return (expert_rank @ paper_rank.T).astype(np.int32)
+
+
+def pairWeights(expert_codes_row: np.ndarray, paper_codes_row: np.ndarray):
+    """
+    Returns the five per-position weights of `matchScore` for a single pair.
+
+    Only needed for pairs that are actually displayed, so it is computed on demand
+    rather than materialised for the whole (experts x papers x 5) block.
+    """
+    width = len(expert_codes_row)
+    hits = expert_codes_row[:, None] == paper_codes_row[None, :]
+    paper_weight = np.where(hits, width - np.arange(width), 0).max(axis=1)
+    return [int(w) for w in (width - np.arange(width)) * paper_weight]
+
+
+def cooccurrenceSimilarity(code_blocks, n_topics: int, partial: float = 0.5, min_similarity: float = 0.1):
+    """
+    Derives topic similarity from co-occurrence: two topics are similar when the same
+    experts and papers tend to list both.
+
+    Parameters:
+    - code_blocks (list): Topic code arrays (e.g. all expert and all paper codes).
+    - n_topics (int): Number of distinct topic codes.
+    - partial (float, optional): Credit of a related topic relative to an exact match.
+    - min_similarity (float, optional): Smaller similarities are dropped to 0.
+
+    Returns:
+    - np.ndarray: float32 (topics x topics) matrix, 1 on the diagonal, `partial` x the
+      cosine of the topics' co-occurrence vectors elsewhere.
+    """
+    presence = np.vstack([rankMatrix(codes, n_topics, first_only=True) > 0 for codes in code_blocks])
+    presence = presence.astype(np.float32)
+    together = presence.T @ presence
+    counts = np.sqrt(np.diag(together))
+    norms = counts[:, None] * counts[None, :]
+    similarity = partial * np.divide(together, norms, out=np.zeros_like(together), where=norms > 0)
+    similarity[similarity < min_similarity] = 0
+    np.fill_diagonal(similarity, 1)
+    return similarity
+
+
+def loadSimilarity(path: str, topics):
+    """
+    Reads a topic similarity matrix from a CSV file of `topic_a,topic_b,similarity` rows.
+
+    Pairs are symmetric (the larger value wins if both orders are given) and unlisted pairs
+    are 0. Topics unknown to `topics` (a `records.TopicIndex`) get new codes.
+
+    Returns:
+    - np.ndarray: float32 (topics x topics) matrix with 1 on the diagonal.
+    """
+    with open(path, newline='') as file:
+        rows = [row for row in csv.reader(file) if len(row) >= 3 and not row[0].startswith('#')]
+    pairs = []
+    for first, second, value in (row[:3] for row in rows):
+        try:
+            value = float(value)
+        except ValueError:
+            continue  # header line
+        pairs.append((topics.code(first.strip()), topics.code(second.strip()), value))
+    similarity = np.zeros((len(topics), len(topics)), dtype=np.float32)
+    for first, second, value in pairs:
+        similarity[first, second] = similarity[second, first] = max(similarity[first, second], value)
+    np.fill_diagonal(similarity, 1)
+    return similarity
+
+
+def fitSimilarity(similarity: np.ndarray, n_topics: int):
+    """
+    Pads `similarity` with the identity for topic codes added after it was built.
+    """
+    if similarity is None:
+        return np.eye(n_topics, dtype=np.float32)
+    if len(similarity) >= n_topics:
+        return similarity[:n_topics, :n_topics]
+    fitted = np.eye(n_topics, dtype=np.float32)
+    fitted[:len(similarity), :len(similarity)] = similarity
+    return fitted
+
+
+def blankSimilarity(similarity: np.ndarray, n_topics: int):
+    """
+    `fitSimilarity` plus a last row and column for empty slots, which are only similar to each other.
+    """
+    related = np.eye(n_topics + 1, dtype=np.float32)
+    related[:n_topics, :n_topics] = fitSimilarity(similarity, n_topics)
+    return related
+
+
+def similarityScoreMatrix(expert_codes: np.ndarray, paper_codes: np.ndarray, n_topics: int, similarity: np.ndarray):
+    """
+    `scoreMatrix` with partial credit: `expert_rank @ similarity @ paper_rank.T`, rounded to int32.
+    """
+    expert_rank = rankMatrix(expert_codes, n_topics, first_only=False, blanks=True).astype(np.float32)
+    paper_rank = rankMatrix(paper_codes, n_topics, first_only=True, blanks=True).astype(np.float32)
+    return np.rint((expert_rank @ blankSimilarity(similarity, n_topics)) @ paper_rank.T).astype(np.int32)
+
+
+SCALE = 100
+
+
+def toScores(similarity: np.ndarray):
+    """
+    Converts a non-negative float similarity matrix into int32 scores in hundredths,
+    keeping every positive similarity at least 1.
+    """
+    scaled = np.rint(similarity * SCALE)
+    return np.where(similarity > 0, np.maximum(scaled, 1), 0).astype(np.int32)
+
+
+def positionalScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    return scoreMatrix(expert_codes, paper_codes, n_topics)
+
+
+def jaccardScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    """
+    |shared topics| / |all topics of the pair|, ignoring ranks.
+    """
+    expert_set = (rankMatrix(expert_codes, n_topics, first_only=True) > 0).astype(np.float32)
+    paper_set = (rankMatrix(paper_codes, n_topics, first_only=True) > 0).astype(np.float32)
+    shared = expert_set @ paper_set.T
+    union = expert_set.sum(axis=1)[:, None] + paper_set.sum(axis=1)[None, :] - shared
+    return toScores(np.divide(shared, union, out=np.zeros_like(shared), where=union > 0))
+
+
+def rankCosineScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    """
+    Cosine similarity of the rank vectors (weight `5 - i` at the first position of each topic).
+    """
+    expert_rank = rankMatrix(expert_codes, n_topics, first_only=True).astype(np.float32)
+    paper_rank = rankMatrix(paper_codes, n_topics, first_only=True).astype(np.float32)
+    expert_norm = np.linalg.norm(expert_rank, axis=1)
+    paper_norm = np.linalg.norm(paper_rank, axis=1)
+    norms = expert_norm[:, None] * paper_norm[None, :]
+    dot = expert_rank @ paper_rank.T
+    return toScores(np.divide(dot, norms, out=np.zeros_like(dot), where=norms > 0))
+
+
+def bidWeightedScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    """
+    Positional score times the bid factor of the pair (`ConstraintStore.bidFactors`).
+    """
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    if bids is None:
+        return scores
+    return np.rint(scores * bids).astype(np.int32)
+
+
+def pagesNormalizedScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    """
+    Positional score per page, relative to the mean page count of the batch, so long papers
+    need a better topic fit to win a reviewer.
+    """
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    if pages is None or len(pages) == 0:
+        return scores
+    pages = np.maximum(np.asarray(pages, dtype=np.float64), 1)
+    return toScores(scores * (pages.mean() / pages)[None, :] / SCALE)
+
+
+def topicSimilarityScore(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None):
+    """
+    Positional score with partial credit for related topics (`similarityScoreMatrix`).
+    """
+    return similarityScoreMatrix(expert_codes, paper_codes, n_topics, similarity)
+
+
+def positionalParts(expert_row, paper_row, similarity=None):
+    return np.array(pairWeights(expert_row, paper_row), dtype=np.float64)
+
+
+def topicSimilarityParts(expert_row, paper_row, similarity=None):
+    width = len(expert_row)
+    ranks = width - np.arange(width)
+    # Paper side counts the first occurrence of a topic only, as in `rankMatrix`
+    first = np.array([code not in paper_row[:j].tolist() for j, code in enumerate(paper_row.tolist())])
+    n_topics = max(len(similarity) if similarity is not None else 0, int(max(expert_row.max(), paper_row.max())) + 1)
+    # Empty slots (-1) index the last row and column of `blankSimilarity`
+    related = blankSimilarity(similarity, n_topics)[expert_row[:, None], paper_row[None, :]]
+    related = related.astype(np.float64)
+    related[:, ~first] = 0
+    return ranks * (related @ ranks)
+
+
+def jaccardParts(expert_row, paper_row, similarity=None):
+    # One unit per expert position whose topic (first occurrence) the paper also lists
+    first = np.array([code >= 0 and code not in expert_row[:i] for i, code in enumerate(expert_row.tolist())])
+    return (first & np.isin(expert_row, paper_row[paper_row >= 0])).astype(np.float64)
+
+
+def rankCosineParts(expert_row, paper_row, similarity=None):
+    width = len(expert_row)
+    parts = np.zeros(width)
+    for i, code in enumerate(expert_row.tolist()):
+        if code >= 0 and code not in expert_row[:i].tolist():
+            hits = np.flatnonzero(paper_row == code)
+            if len(hits):
+                parts[i] = (width - i) * (width - hits[0])
+    return parts
+
+
+class ScoringFunction:
+    """
+    A scoring kernel plus the per-position breakdown shown in the weight columns of the GUI.
+
+    Attributes:
+    ----------
+    kernel : Callable
+        `kernel(expert_codes, paper_codes, n_topics, pages=None, bids=None, similarity=None)` -> int32 score matrix.
+    parts : Callable
+        `parts(expert_row, paper_row, similarity=None)` -> raw contribution of each of the expert's five topics;
+        `weights` scales them so that they add up to the pair's score.
+    weight_max : int
+        Largest weight shown, used to shade the weight cells.
+    """
+    __slots__ = ('kernel', 'parts', 'weight_max')
+
+    def __init__(self, kernel, parts, weight_max):
+        self.kernel, self.parts, self.weight_max = kernel, parts, weight_max
+
+    def weights(self, expert_row, paper_row, score, similarity=None):
+        parts = self.parts(np.asarray(expert_row), np.asarray(paper_row), similarity)
+        total = parts.sum()
+        if total <= 0:
+            return [0] * len(parts)
+        # Largest remainder rounding, so the integer weights add up to the score exactly
+        shares = parts * score / total
+        weights = np.floor(shares).astype(np.int64)
+        weights[np.argsort(weights - shares, kind='stable')[:int(score) - int(weights.sum())]] += 1
+        return weights.tolist()
+
+
+SCORINGS = {
+    'Positional': ScoringFunction(positionalScore, positionalParts, 25),
+    'Jaccard': ScoringFunction(jaccardScore, jaccardParts, SCALE),
+    'Rank Cosine': ScoringFunction(rankCosineScore, rankCosineParts, SCALE),
+    'Bid-Weighted': ScoringFunction(bidWeightedScore, positionalParts, 38),
+    'Pages-Normalized': ScoringFunction(pagesNormalizedScore, positionalParts, 50),
+    'Topic Similarity': ScoringFunction(topicSimilarityScore, topicSimilarityParts, 40),
+}
+
+
+def scoreTables(experts, papers, n_topics: int, constraints=None, scoring: str = 'Positional', similarity=None):
+    """
+    Scores an `ExpertTable` x `PaperTable` batch with a registered function and masks conflicts.
+    `similarity` is the topic similarity matrix used by 'Topic Similarity' (identity if None).
+
+    Returns:
+    - np.ndarray: int32 score matrix of shape (experts, papers).
+    """
+    bids = constraints.bidFactors(experts.ids, papers.ids) if constraints is not None and scoring == 'Bid-Weighted' else None
+    scores = SCORINGS[scoring].kernel(experts.data['topics'], papers.data['topics'], n_topics,
+                                      pages=papers.data['pages'], bids=bids, similarity=similarity)
+    if constraints is not None:
+        constraints.apply(scores, experts.ids, papers.ids)
+    return scores
@@ -0,0 +1,60 @@
+"""
+Selection of free experts and papers for the next matching batch.
+
+Both functions work on in-memory `records.ExpertTable` / `records.PaperTable`s, so the
+GUI, the strategy comparison workers and scripts all select the same way without
+issuing one query per paper.
+"""
+import numpy as np
+from records import ExpertTable, PaperTable
+
+
+def greedySelect(experts: ExpertTable, papers: PaperTable):
+    """
+    All unassigned papers, and all experts with load below 80, least loaded first.
+
+    Returns:
+    - tuple: (ExpertTable, PaperTable) in batch order.
+    """
+    free_papers = papers[papers.data['expertid'] == -1]
+    candidates = experts[experts.data['load'] < 80]
+    return candidates[np.argsort(candidates.data['load'], kind='stable')], free_papers
+
+
+def nonGreedySelect(experts: ExpertTable, papers: PaperTable, expert_depth: int, paper_depth: int):
+    """
+    For each unassigned paper, the least loaded expert (load below 100) whose expertise at
+    rank `e_depth` equals the paper topic at rank `p_depth`, trying `expert_depth` x
+    `paper_depth` rank pairs in order and skipping experts already taken.
+
+    The least loaded expert for every (expertise rank, topic) pair is found once up front
+    with `np.unique` over the load-sorted experts.
+
+    Returns:
+    - tuple: (ExpertTable, PaperTable); row `i` of both is the proposed pair for paper `i`.
+    """
+    candidates = experts[experts.data['load'] < 100]
+    candidates = candidates[np.argsort(candidates.data['load'], kind='stable')]
+    best = {}
+    for rank in range(expert_depth):
+        codes, first = np.unique(candidates.data['topics'][:, rank], return_index=True)
+        best.update({(rank, code): row for code, row in zip(codes.tolist(), first.tolist()) if code >= 0})
+
+    free = np.flatnonzero(papers.data['expertid'] == -1)
+    paper_topics = papers.data['topics'].tolist()
+    candidate_ids = candidates.data['id'].tolist()
+    expert_rows, paper_rows, taken = [], [], set()
+    for paper_row in free.tolist():
+        found_expert = False
+        for e_depth in range(expert_depth):
+            for p_depth in range(paper_depth):
+                row = best.get((e_depth, paper_topics[paper_row][p_depth]))
+                if row is not None and candidate_ids[row] not in taken:
+                    taken.add(candidate_ids[row])
+                    expert_rows.append(row)
+                    paper_rows.append(paper_row)
+                    found_expert = True
+                    break
+            if found_expert:
+                break
+    return candidates[np.array(expert_rows, dtype=np.int64)], papers[np.array(paper_rows, dtype=np.int64)]
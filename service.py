@@ -0,0 +1,442 @@
+"""
+Local matching service with a warm in-memory cache.
+
+The service opens the database once and keeps the expert and paper records, the
+topic index and the full (experts x papers) score matrix in memory, so several
+chairs (GUI sessions or scripts) can select and match without reloading and
+rescoring everything each time. It speaks plain HTTP/JSON over localhost or a Unix
+socket and needs nothing beyond the standard library and NumPy.
+
+- Reads (`/select`, `/match`) run on the cached snapshot in a worker thread.
+- Writes (`/save`, `/review`) are queued and applied one at a time on a single
+  database thread, then the cached records are refreshed. The score matrix only
+  depends on topics and conflicts, so it stays warm across writes.
+- Changes committed by other connections (e.g. Undo in a GUI session) are noticed through
+  `PRAGMA data_version` before each read, and the records are reloaded then.
+- `/match` results are memoized under a content hash of the cached records and the request
+  (`memo.MatchCache`), so repeating a request on the same state returns at once.
+- `/metrics` reports request counts, latency percentiles, throughput, queue depth and the
+  hit rate of the match cache.
+
+Usage:
+    python service.py --db mydb.db --port 8765
+    python service.py --db mydb.db --unix /tmp/matching.sock
+
+    client = ServiceClient(port=8765)
+    batch = client.match('Greedy', 'Stable', batch_size=10)
+    client.save(batch['expert_ids'], batch['paper_ids'])
+
+The GUI routes its select, match, save and review actions through the service when the
+`MATCHING_SERVICE` environment variable holds its address (`host:port` or a socket path).
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scoring import SCORINGS, scoreTables
+from constraints import ConstraintStore, ensureSchema as ensureConstraintSchema
+from assignments import saveMatches, setReviewed, setReviewedPapers, ensureSchema as ensureAssignmentSchema
+from journal import ChangeJournal, ensureSchema as ensureJournalSchema
+from records import TopicIndex
+from compare import takeSnapshot, runStrategy, SELECTIONS, MATCHERS
+from memo import MatchCache, runKey
+
+DEFAULT_PARAMS = {'batch_size': 10, 'expert_depth': 1, 'paper_depth': 1}
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """
+    A request the service cannot handle; reported to the client with `status`.
+    """
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class Metrics:
+    """
+    Request counters and latencies per endpoint.
+
+    Latencies of the last `window` requests of each endpoint are kept for the percentiles.
+    """
+    def __init__(self, window: int = 1000):
+        self.started = time.time()
+        self.window = window
+        self.counts = {}
+        self.errors = {}
+        self.latencies = {}
+
+    def record(self, endpoint: str, seconds: float, failed: bool = False):
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if failed:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        self.latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def report(self):
+        uptime = time.time() - self.started
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            ms = np.array(latencies) * 1000
+            endpoints[endpoint] = {
+                'count': self.counts[endpoint],
+                'errors': self.errors.get(endpoint, 0),
+                'per_sec': self.counts[endpoint] / uptime,
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+            }
+        total = sum(self.counts.values())
+        return {'uptime': uptime, 'requests': total, 'per_sec': total / uptime if uptime else 0.0, 'endpoints': endpoints}
+
+
+class MatchingService:
+    """
+    Holds the warm cache and serves requests.
+
+    Attributes:
+    ----------
+    snapshot : dict
+        Output of `compare.takeSnapshot` plus the full masked score matrix under `'scores'`.
+    generation : int
+        Incremented after every applied write; returned with every response.
+    cache : MatchCache
+        `/match` results keyed by the snapshot `digest` and the request.
+    """
+    def __init__(self, dbpath: str = 'mydb.db'):
+        # All database access happens on this one thread, which also serializes the writes
+        self.database = ThreadPoolExecutor(max_workers=1, thread_name_prefix='database')
+        self.connection = sqlite3.connect(dbpath, check_same_thread=False)
+        self.snapshot = None
+        self.data_version = None
+        self.generation = 0
+        self.metrics = Metrics()
+        self.cache = MatchCache()
+        self.writes = None
+        self.routes = {
+            ('GET', '/status'): self.status,
+            ('GET', '/metrics'): self.report,
+            ('POST', '/select'): self.select,
+            ('POST', '/match'): self.match,
+            ('POST', '/save'): self.save,
+            ('POST', '/review'): self.review,
+        }
+
+    def open(self):
+        ensureConstraintSchema(self.connection)
+        ensureAssignmentSchema(self.connection)
+        ensureJournalSchema(self.connection)
+        self.journal = ChangeJournal(self.connection)
+        self.constraints = ConstraintStore.load(self.connection)
+        self.topics = TopicIndex(self.connection.execute('SELECT * FROM expertise').fetchall())
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reloads the records and rescores only if the set of experts or papers changed.
+        """
+        start = time.perf_counter()
+        self.data_version = self.dataVersion()
+        snapshot = takeSnapshot(self.connection, self.topics, self.constraints)
+        previous = self.snapshot
+        if (previous is not None and np.array_equal(previous['experts'].ids, snapshot['experts'].ids)
+                and np.array_equal(previous['papers'].ids, snapshot['papers'].ids)):
+            snapshot['scores'] = previous['scores']
+        else:
+            snapshot['scores'] = scoreTables(snapshot['experts'], snapshot['papers'], snapshot['n_topics'], self.constraints)
+        # Content hash of the records: a write that is undone later brings back the same digest
+        snapshot['digest'] = runKey(snapshot['experts'], snapshot['papers'], self.constraints)
+        snapshot['loaded_in'] = time.perf_counter() - start
+        # Readers keep using the previous snapshot until this assignment
+        self.snapshot = snapshot
+
+    def dataVersion(self):
+        return self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def refreshIfChanged(self):
+        """
+        Reloads the records if another connection committed since the last refresh.
+        """
+        if self.dataVersion() != self.data_version:
+            self.refresh()
+
+    async def current(self):
+        """
+        Returns the snapshot for a read, after the writes queued so far and any outside change.
+        """
+        await asyncio.get_running_loop().run_in_executor(self.database, self.refreshIfChanged)
+        return self.snapshot
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, unix_socket: str = None):
+        """
+        Warms the cache and starts listening. Returns the `asyncio.Server`.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.database, self.open)
+        self.writes = asyncio.Queue()
+        self.writer = asyncio.create_task(self.applyWrites())
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle, path=unix_socket)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def applyWrites(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self.writes.get()
+            try:
+                result = await loop.run_in_executor(self.database, func, *args)
+                await loop.run_in_executor(self.database, self.refresh)
+                self.generation += 1
+                future.set_result(result)
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                self.writes.task_done()
+
+    async def write(self, func, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self.writes.put((func, args, future))
+        return await future
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves HTTP/1.1 requests on one connection until the client closes it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self.dispatch(method, path.split('?')[0], body)
+                data = json.dumps(payload).encode()
+                writer.write(f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        start = time.perf_counter()
+        route = self.routes.get((method, path))
+        failed = True
+        try:
+            if route is None:
+                raise ServiceError(f'No route {method} {path}', 404)
+            request = json.loads(body) if body else {}
+            payload = await route(request)
+            payload['generation'] = self.generation
+            status, failed = 200, False
+        except ServiceError as error:
+            status, payload = error.status, {'error': str(error)}
+        except (json.JSONDecodeError, KeyError, TypeError) as error:
+            status, payload = 400, {'error': f'Bad request: {error!r}'}
+        except Exception as error:
+            status, payload = 500, {'error': repr(error)}
+        self.metrics.record(path, time.perf_counter() - start, failed)
+        return status, payload
+
+    def params(self, request: dict):
+        params = {key: int(request.get(key, value)) for key, value in DEFAULT_PARAMS.items()}
+        selection = request.get('selection', 'Greedy')
+        if selection not in SELECTIONS:
+            raise ServiceError(f'Unknown selection {selection!r}, expected one of {list(SELECTIONS)}')
+        params['scoring'] = request.get('scoring', 'Positional')
+        if params['scoring'] not in SCORINGS:
+            raise ServiceError(f'Unknown scoring {params["scoring"]!r}, expected one of {list(SCORINGS)}')
+        return selection, params
+
+    async def status(self, request: dict):
+        snapshot = self.snapshot
+        return {
+            'experts': len(snapshot['experts']),
+            'papers': len(snapshot['papers']),
+            'topics': snapshot['n_topics'],
+            'cache_bytes': snapshot['experts'].nbytes() + snapshot['papers'].nbytes() + snapshot['scores'].nbytes,
+            'loaded_in': snapshot['loaded_in'],
+            'queued_writes': self.writes.qsize(),
+        }
+
+    async def report(self, request: dict):
+        report = self.metrics.report()
+        report['queued_writes'] = self.writes.qsize()
+        report['cache'] = self.cache.stats()
+        return report
+
+    async def select(self, request: dict):
+        """
+        {selection, batch_size, expert_depth, paper_depth} -> the next batch of expert and paper ids.
+        """
+        selection, params = self.params(request)
+        experts, papers = await asyncio.to_thread(SELECTIONS[selection], await self.current(), params)
+        length = min(len(experts), len(papers), params['batch_size'])
+        return {'expert_ids': experts.ids[:length].tolist(), 'paper_ids': papers.ids[:length].tolist()}
+
+    async def match(self, request: dict):
+        """
+        {selection, matcher, scoring, batch_size, expert_depth, paper_depth} -> the `compare.runStrategy` result,
+        with the selected batch as `batch_expert_ids` and `batch_paper_ids` instead of record tables,
+        and `cached` set if it came from the match cache.
+        Only 'Positional' (the default) uses the cached score matrix; other scorings rescore the batch.
+        """
+        selection, params = self.params(request)
+        matcher = request.get('matcher', 'Stable')
+        if matcher not in MATCHERS:
+            raise ServiceError(f'Unknown matcher {matcher!r}, expected one of {list(MATCHERS)}')
+        snapshot = await self.current()
+        key = runKey(snapshot['digest'], selection, matcher, params)
+        result = self.cache.get(key)
+        if result is not None:
+            return dict(result, cached=True)
+        result = await asyncio.to_thread(runStrategy, snapshot, selection, matcher, params)
+        result['batch_expert_ids'] = result.pop('experts').ids.tolist()
+        result['batch_paper_ids'] = result.pop('papers').ids.tolist()
+        self.cache.put(key, result)
+        return dict(result, cached=False)
+
+    async def save(self, request: dict):
+        """
+        {expert_ids, paper_ids, score?} -> {txn}. The score defaults to the cached score of the pairs.
+        """
+        expert_ids = [int(e) for e in request['expert_ids']]
+        paper_ids = [int(p) for p in request['paper_ids']]
+        if len(expert_ids) != len(paper_ids):
+            raise ServiceError('expert_ids and paper_ids differ in length')
+        snapshot = await self.current()
+        rows, cols = snapshot['experts'].rowOf(expert_ids), snapshot['papers'].rowOf(paper_ids)
+        if (rows < 0).any() or (cols < 0).any():
+            raise ServiceError('Unknown expert or paper id')
+        score = int(request.get('score', snapshot['scores'][rows, cols].sum()))
+        txn = await self.write(saveMatches, self.connection, self.journal, expert_ids, paper_ids, score)
+        return {'txn': txn, 'score': score}
+
+    async def review(self, request: dict):
+        """
+        {paper_id | paper_ids, reviewed} -> {changed}: a bool for one paper, the number of changed papers for a list.
+        """
+        reviewed = bool(request.get('reviewed', True))
+        if 'paper_ids' in request:
+            changed = await self.write(setReviewedPapers, self.connection, self.journal,
+                                       [int(p) for p in request['paper_ids']], reviewed)
+        else:
+            changed = await self.write(setReviewed, self.connection, self.journal, int(request['paper_id']), reviewed)
+        return {'changed': changed}
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """
+    Blocking client for `MatchingService`, usable from the GUI thread or scripts.
+
+    Keeps one keep-alive connection; every method returns the decoded JSON response and
+    raises `ServiceError` on an error status.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, unix_socket: str = None, timeout: float = 60):
+        if unix_socket:
+            self.connection = UnixHTTPConnection(unix_socket, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method: str, path: str, payload: dict = None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        result = json.loads(response.read())
+        if response.status != 200:
+            raise ServiceError(result.get('error', response.reason), response.status)
+        return result
+
+    def status(self):
+        return self.request('GET', '/status')
+
+    def metrics(self):
+        return self.request('GET', '/metrics')
+
+    def select(self, selection: str = 'Greedy', **params):
+        return self.request('POST', '/select', {'selection': selection, **params})
+
+    def match(self, selection: str = 'Greedy', matcher: str = 'Stable', **params):
+        return self.request('POST', '/match', {'selection': selection, 'matcher': matcher, **params})
+
+    def save(self, expert_ids, paper_ids, score=None):
+        payload = {'expert_ids': list(expert_ids), 'paper_ids': list(paper_ids)}
+        if score is not None:
+            payload['score'] = score
+        return self.request('POST', '/save', payload)
+
+    def review(self, paper_id: int, reviewed: bool = True):
+        return self.request('POST', '/review', {'paper_id': paper_id, 'reviewed': reviewed})
+
+    def reviewMany(self, paper_ids: list, reviewed: bool = True):
+        return self.request('POST', '/review', {'paper_ids': list(paper_ids), 'reviewed': reviewed})
+
+    def close(self):
+        self.connection.close()
+
+
+def connectService(address: str, timeout: float = 60):
+    """
+    Returns a `ServiceClient` for `address`: `host:port` for TCP, anything else is a Unix socket path.
+    """
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return ServiceClient(host, int(port), timeout=timeout)
+    return ServiceClient(unix_socket=address, timeout=timeout)
+
+
+async def serve(args):
+    service = MatchingService(args.db)
+    server = await service.start(args.host, args.port, args.unix)
+    snapshot = service.snapshot
+    where = args.unix or f'http://{args.host}:{args.port}'
+    print(f'Serving {len(snapshot["experts"])} experts x {len(snapshot["papers"])} papers from {args.db} on {where} '
+          f'(warmed in {snapshot["loaded_in"]:.3f} s)')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='mydb.db')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Listen on this Unix socket path instead of TCP')
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import os
+import shutil
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def dbpath(tmp_path):
+    """
+    A copy of the sample database `mydb.db`, so tests can write to it.
+    """
+    path = tmp_path / 'mydb.db'
+    shutil.copy(os.path.join(ROOT, 'mydb.db'), path)
+    return str(path)
@@ -0,0 +1,106 @@
+import os
+import numpy as np
+import pytest
+from matching import stableMatch
+from checkpoint import MatchCheckpoint, loadCheckpoint, scoresPath
+from eventlog import EventLog, EventLogWriter, keepEvents, MAKE_UP, BREAK_UP
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingCheckpoint(MatchCheckpoint):
+    """
+    Checkpoints after every expert row and fails right after the `crash_after`-th save.
+    """
+    def __init__(self, *args, crash_after: int, **kwargs):
+        super().__init__(*args, interval=0.0, **kwargs)
+        self.crash_after = crash_after
+
+    def save(self, **state):
+        super().save(**state)
+        if self.count == self.crash_after:
+            raise Crash()
+
+
+def randomScores(seed, n_experts=25, n_papers=30):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 40, size=(n_experts, n_papers)).astype(np.int32)
+    scores[rng.random(scores.shape) < 0.4] = 0
+    return scores
+
+
+def loggedRun(scores, log, thread, **kwargs):
+    def onEvent(e, p, score, broken, matched):
+        if broken >= 0:
+            log.append(broken, p, 0, [0] * 5, BREAK_UP, thread)
+        log.append(e, p, score, [0] * 5, MAKE_UP, thread)
+    return stableMatch(scores, on_event=onEvent, **kwargs)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('crash_after', [1, 7, 40])
+def test_resumed_run_equals_uninterrupted_run(tmp_path, seed, crash_after):
+    scores = randomScores(seed)
+    clean_path = str(tmp_path / 'clean.bin')
+    log = EventLogWriter(clean_path)
+    expected = loggedRun(scores, log, 1)
+    log.close()
+
+    path = str(tmp_path / 'match_checkpoint.npz')
+    log_path = str(tmp_path / 'events.bin')
+    log = EventLogWriter(log_path)
+    # Events per thread covered by each checkpoint, as `MainWindow.stableMatch` records them
+    checkpoint = CrashingCheckpoint(path, scores, meta={'batch_expert_ids': np.arange(len(scores))},
+                                    extra=lambda: {'events': log.seq}, crash_after=crash_after)
+    try:
+        loggedRun(scores, log, 1, checkpoint=checkpoint)
+    except Crash:
+        pass
+    else:
+        pytest.skip('the run finished before the checkpoint that fails')
+    # Events written after the last checkpoint are in the log too
+    log.append(0, 0, 1, [0] * 5, MAKE_UP, 1)
+    log.close()
+
+    saved_scores, state, meta = loadCheckpoint(path)
+    assert np.array_equal(saved_scores, scores) and np.array_equal(meta['batch_expert_ids'], np.arange(len(scores)))
+    keepEvents(log_path, {1: int(meta['events'])})
+    assert len(EventLog(log_path)) == int(meta['events'])
+    log = EventLogWriter(log_path, truncate=False)
+    resumed = loggedRun(saved_scores, log, 1, state=state)
+    log.close()
+
+    assert resumed == expected
+    clean, again = EventLog(clean_path), EventLog(log_path)
+    assert np.array_equal(np.array(clean.events), np.array(again.events))
+
+    checkpoint.discard()
+    assert not os.path.exists(path) and not os.path.exists(scoresPath(path))
+
+
+def test_keep_events_per_thread(tmp_path):
+    path = str(tmp_path / 'events.bin')
+    log = EventLogWriter(path)
+    threads = [1, 2, 1, 1, 2, 2, 1, 2]
+    for position, thread in enumerate(threads):
+        log.append(position, position, position, [0] * 5, MAKE_UP, thread)
+    log.close()
+
+    # A prefix: the file is only truncated
+    keepEvents(path, {1: 3, 2: 2})
+    events = EventLog(path).events
+    assert events['expert'].tolist() == [0, 1, 2, 3, 4] and events['seq'].tolist() == [0, 1, 2, 3, 4]
+
+    # Not a prefix: the kept events are rewritten and renumbered
+    keepEvents(path, {2: 2})
+    events = EventLog(path).events
+    assert events['expert'].tolist() == [1, 4] and events['seq'].tolist() == [0, 1]
+
+    keepEvents(path, {})
+    assert len(EventLog(path)) == 0
+    log = EventLogWriter(path, truncate=False)
+    log.append(9, 9, 9, [0] * 5, MAKE_UP, 1)
+    log.close()
+    assert EventLog(path)[0]['seq'] == 0
@@ -0,0 +1,34 @@
+import numpy as np
+from constraints import ConstraintStore
+
+
+def test_mask_matches_pairwise_check():
+    rng = np.random.default_rng(0)
+    expert_ids = rng.permutation(np.arange(100, 160))
+    paper_ids = rng.permutation(np.arange(500, 580))
+    store = ConstraintStore()
+    pairs = set(zip(rng.choice(expert_ids, 40).tolist(), rng.choice(paper_ids, 40).tolist()))
+    store.addConflicts([e for e, _ in pairs], [p for _, p in pairs])
+    # Ids outside the batch must be ignored
+    store.addConflicts([1, 2], [paper_ids[0], 3])
+    expert_affiliation = {int(e): f'lab{rng.integers(10)}' for e in expert_ids[:30]}
+    paper_affiliation = {int(p): f'lab{rng.integers(10)}' for p in paper_ids[:30]}
+    store.addAffiliations('expert', list(expert_affiliation), list(expert_affiliation.values()))
+    store.addAffiliations('paper', list(paper_affiliation), list(paper_affiliation.values()))
+
+    mask = store.compileMask(expert_ids, paper_ids)
+    for row, e in enumerate(expert_ids.tolist()):
+        for col, p in enumerate(paper_ids.tolist()):
+            shared = e in expert_affiliation and expert_affiliation[e] == paper_affiliation.get(p)
+            assert mask[row, col] == ((e, p) in pairs or shared)
+
+    scores = np.ones((len(expert_ids), len(paper_ids)), dtype=np.int32)
+    store.apply(scores, expert_ids, paper_ids)
+    assert np.array_equal(scores == 0, mask)
+
+
+def test_bid_factors():
+    store = ConstraintStore()
+    store.addBids([1, 2], [10, 11], [2, -2])
+    factors = store.bidFactors([1, 2, 3], [10, 11])
+    assert factors.tolist() == [[1.5, 1.0], [1.0, 0.5], [1.0, 1.0]]
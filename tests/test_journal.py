@@ -0,0 +1,61 @@
+import sqlite3
+import pytest
+from assignments import saveAssignments, saveMatches, setReviewedPapers, ensureSchema as ensureAssignmentSchema
+from journal import ChangeJournal, ensureSchema as ensureJournalSchema
+from constraints import ensureSchema as ensureConstraintSchema
+
+
+@pytest.fixture
+def connection(dbpath):
+    connection = sqlite3.connect(dbpath)
+    ensureConstraintSchema(connection)
+    ensureAssignmentSchema(connection)
+    ensureJournalSchema(connection)
+    yield connection
+    connection.close()
+
+
+def state(connection):
+    return (connection.execute('SELECT expertid, load FROM expertname ORDER BY expertid').fetchall(),
+            connection.execute('SELECT paperid, expertid, status FROM papers ORDER BY paperid').fetchall(),
+            connection.execute('SELECT paperid, expertid, slot, score FROM assignments ORDER BY paperid, slot').fetchall())
+
+
+def test_undo_redo_restore_round_trip(connection):
+    journal = ChangeJournal(connection)
+    states = [state(connection)]
+    txns = [saveMatches(connection, journal, [1, 2, 3], [1, 2, 3], score=90)]
+    states.append(state(connection))
+    assert setReviewedPapers(connection, journal, [1, 3], True) == 2
+    txns.append(journal.history()[-1][0])
+    states.append(state(connection))
+    txns.append(saveAssignments(connection, journal, [4, 5, 4], [4, 4, 5], [30, 20, 25], [0, 1, 0]))
+    states.append(state(connection))
+    assert len(set(map(repr, states))) == 4
+    assert [row[0] for row in journal.history()] == txns
+
+    for expected in reversed(states[:-1]):
+        assert journal.undo() is not None
+        assert state(connection) == expected
+    assert journal.undo() is None
+    for expected in states[1:]:
+        assert journal.redo() is not None
+        assert state(connection) == expected
+    assert journal.redo() is None
+
+    assert journal.restore(txns[0]) == 0
+    assert state(connection) == states[1]
+    assert journal.restore(0) == -90
+    assert state(connection) == states[0]
+    assert journal.restore(txns[-1]) == 90
+    assert state(connection) == states[-1]
+
+
+def test_new_change_discards_redo(connection):
+    journal = ChangeJournal(connection)
+    first = saveMatches(connection, journal, [1], [1], score=10)
+    saveMatches(connection, journal, [2], [2], score=20)
+    journal.undo()
+    saveMatches(connection, journal, [3], [3], score=30)
+    assert [row[0] for row in journal.history()][0] == first and len(journal.history()) == 2
+    assert journal.redo() is None
@@ -0,0 +1,88 @@
+import itertools
+import numpy as np
+import pytest
+from matching import kWayAssign, auctionMatch
+from verify import kWayBlockingPairs, verifyKWay
+
+
+def randomInstance(seed, n_experts=30, n_papers=40, topics=6):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 60, size=(n_experts, n_papers)).astype(np.int32)
+    scores[rng.random(scores.shape) < 0.3] = 0
+    pages = rng.integers(1, 15, size=n_papers)
+    capacity = rng.integers(10, 60, size=n_experts)
+    groups = rng.integers(0, topics, size=n_experts)
+    return scores, pages, capacity, groups
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('k', [1, 3])
+def test_kway_assign_is_stable(seed, k):
+    scores, pages, capacity, groups = randomInstance(seed)
+    e_idx, p_idx, score, slot, stats = kWayAssign(scores, k, pages, capacity, groups, max_per_group=2)
+    block_e, _, _ = kWayBlockingPairs(scores, e_idx, p_idx, k, pages, capacity, groups, max_per_group=2)
+    assert len(block_e) == 0 and stats['blocking'] == 0
+    report = verifyKWay(scores, e_idx, p_idx, k, pages, capacity, groups, max_per_group=2)
+    assert report['stable'] and report['overloaded'] == 0 and report['unfilled_compatible'] == 0
+
+    assert len(set(zip(e_idx.tolist(), p_idx.tolist()))) == len(e_idx)
+    assert np.array_equal(score, scores[e_idx, p_idx]) and (score > 0).all()
+    assert (np.bincount(p_idx, minlength=scores.shape[1]) <= k).all()
+    used = np.bincount(e_idx, weights=pages[p_idx], minlength=scores.shape[0])
+    assert (used <= capacity).all()
+    for paper in np.unique(p_idx):
+        held = p_idx == paper
+        assert np.bincount(groups[e_idx[held]]).max() <= 2
+        # Slots are numbered best reviewer first
+        assert slot[held].tolist() == list(range(held.sum()))
+        assert (np.diff(score[held]) <= 0).all()
+
+
+def test_blocking_pair_for_open_slot():
+    scores = np.array([[5, 3], [4, 0]], dtype=np.int32)
+    pages, capacity = np.array([5, 5]), np.array([10, 5])
+    # Paper 1 is left without a reviewer although expert 0 has room for it
+    block_e, block_p, block_score = kWayBlockingPairs(scores, [0, 1], [0, 0], 2, pages, capacity)
+    assert (block_e.tolist(), block_p.tolist(), block_score.tolist()) == ([0], [1], [3])
+    e_idx, p_idx, _, _, _ = kWayAssign(scores, 2, pages, capacity)
+    assert sorted(zip(e_idx.tolist(), p_idx.tolist())) == [(0, 0), (0, 1), (1, 0)]
+
+
+def bruteForceBest(scores):
+    """
+    Maximum total score of a one-to-one matching, trying every permutation of the padded matrix.
+    """
+    size = max(scores.shape)
+    padded = np.zeros((size, size), dtype=np.int64)
+    padded[:scores.shape[0], :scores.shape[1]] = scores
+    return max(int(padded[np.arange(size), list(order)].sum()) for order in itertools.permutations(range(size)))
+
+
+def matchingScore(scores, expert_match):
+    matched = np.flatnonzero(expert_match >= 0)
+    assert len(set(expert_match[matched].tolist())) == len(matched)
+    return int(scores[matched, expert_match[matched]].sum())
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_auction_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    n_experts, n_papers = rng.integers(1, 7, size=2)
+    scores = rng.integers(0, 50, size=(n_experts, n_papers)).astype(np.int32)
+    scores[rng.random(scores.shape) < 0.4] = 0
+    expert_match, stats = auctionMatch(scores)
+    assert matchingScore(scores, expert_match) == bruteForceBest(scores) == stats['primal']
+    assert stats['dual'] >= stats['primal'] and not stats['timed_out']
+    matched = expert_match >= 0
+    assert (scores[matched, expert_match[matched]] > 0).all()
+
+
+def test_auction_tolerance_and_workers():
+    rng = np.random.default_rng(7)
+    scores = rng.integers(0, 100, size=(7, 7)).astype(np.int32)
+    best = bruteForceBest(scores)
+    rough, _ = auctionMatch(scores, tolerance=5.0)
+    assert best - 7 * 5.0 <= matchingScore(scores, rough) <= best
+    # Bids computed by worker processes on the shared matrix give the same optimum
+    shared, _ = auctionMatch(scores, workers=2, chunk=1)
+    assert matchingScore(scores, shared) == best
@@ -0,0 +1,51 @@
+import sqlite3
+import numpy as np
+import pytest
+from matching import stableMatch
+from outofcore import writePreferences, scorePreferences, streamStableMatch
+from records import TopicIndex, loadExperts, loadPapers
+from scoring import scoreTables
+
+
+def randomScores(seed, n_experts, n_papers):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 40, size=(n_experts, n_papers)).astype(np.int32)
+    scores[rng.random(scores.shape) < 0.4] = 0
+    return scores
+
+
+def recordEvents():
+    events = []
+    return events, lambda *event: events.append(event)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('n_experts, n_papers', [(20, 30), (30, 20), (1, 5)])
+@pytest.mark.parametrize('chunk, block', [(1, 1), (7, 4), (64, 64)])
+def test_stream_equals_in_memory(tmp_path, seed, n_experts, n_papers, chunk, block):
+    scores = randomScores(seed, n_experts, n_papers)
+    blocks = (scores[first:first + chunk] for first in range(0, n_experts, chunk))
+    prefs = writePreferences(str(tmp_path), blocks, n_papers)
+    assert prefs.shape == (n_experts, n_papers)
+    expected_events, on_expected = recordEvents()
+    streamed_events, on_streamed = recordEvents()
+    expected = stableMatch(scores, on_expected)
+    assert streamStableMatch(prefs, on_streamed, block=block) == expected
+    assert streamed_events == expected_events
+
+
+def test_all_zero_scores(tmp_path):
+    scores = np.zeros((5, 8), dtype=np.int32)
+    prefs = writePreferences(str(tmp_path), [scores], 8)
+    assert prefs.nbytes() >= 0
+    assert streamStableMatch(prefs) == stableMatch(scores)
+
+
+def test_score_preferences_matches_score_tables(tmp_path, dbpath):
+    connection = sqlite3.connect(dbpath)
+    topics = TopicIndex(connection.execute('SELECT * FROM expertise').fetchall())
+    experts, papers = loadExperts(connection, topics), loadPapers(connection, topics)
+    connection.close()
+    scores = scoreTables(experts, papers, len(topics))
+    prefs = scorePreferences(str(tmp_path / 'prefs'), experts, papers, len(topics), chunk=3)
+    assert streamStableMatch(prefs) == stableMatch(scores)
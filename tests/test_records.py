@@ -0,0 +1,28 @@
+import sqlite3
+from records import TopicIndex, loadExperts, loadPapers
+from selection import greedySelect
+
+
+def test_loads_round_trip_exactly(dbpath):
+    connection = sqlite3.connect(dbpath)
+    loads = [79.99, 80.0, 33.33, 99.99, 100.0, 12.34]
+    connection.executemany('UPDATE expertname SET load = ? WHERE expertid = ?',
+                           [(load, expert_id) for expert_id, load in enumerate(loads, start=1)])
+    topics = TopicIndex(connection.execute('SELECT * FROM expertise').fetchall())
+    experts = loadExperts(connection, topics)
+    assert dict(connection.execute('SELECT expertid, load FROM expertname').fetchall()) == dict(
+        zip(experts.ids.tolist(), experts.data['load'].tolist()))
+    # The greedy selection keeps experts below 80 exactly like `WHERE load < 80`
+    selected, _ = greedySelect(experts, loadPapers(connection, topics))
+    below = {row[0] for row in connection.execute('SELECT expertid FROM expertname WHERE load < 80')}
+    assert set(selected.ids.tolist()) == below
+    connection.close()
+
+
+def test_topic_index_unknown_topics():
+    topics = TopicIndex([(7, 'AI'), (9, 'DB')])
+    code = topics.code('Robotics')
+    assert code == 2 and topics.code('Robotics') == code
+    assert topics.name(code) == 'Robotics' and topics.expid(code) == 'None'
+    assert topics.expid(topics.code('DB')) == 9
+    assert topics.code(None) == -1 and topics.expid(-1) == 'None'
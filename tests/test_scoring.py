@@ -0,0 +1,77 @@
+import random
+import numpy as np
+import pytest
+from scoring import SCORINGS, encodeBatch, scoreMatrix, pairWeights, cooccurrenceSimilarity
+
+
+def matchScore(list1: list, list2: list):
+    """
+    `MainWindow.matchScore` of the original GUI, the reference for the positional score.
+    """
+    score = 0
+    score_list = []
+    max_score = len(list1)
+    for index, item in enumerate(list1):
+        score1 = max_score - index
+        try:
+            score2 = max_score - list2.index(item)
+        except ValueError:
+            score2 = 0
+        score += score1 * score2
+        score_list.append(score1 * score2)
+    return score, score_list
+
+
+def randomSpecs(count, topics, rng):
+    return [[rng.choice(topics) for _ in range(5)] for _ in range(count)]
+
+
+@pytest.mark.parametrize('blanks', [0, 3])
+def test_score_matrix_equals_match_score(blanks):
+    rng = random.Random(blanks)
+    topics = [f'topic{i}' for i in range(10)] + [None] * blanks
+    expert_spec = randomSpecs(40, topics, rng)
+    paper_spec = randomSpecs(50, topics, rng)
+    # Some topics are not in the index and get fresh codes
+    expert_codes, paper_codes, n_topics = encodeBatch(expert_spec, paper_spec, {t: i for i, t in enumerate(topics[:6])})
+    scores = scoreMatrix(expert_codes, paper_codes, n_topics)
+    for e, expert in enumerate(expert_spec):
+        for p, paper in enumerate(paper_spec):
+            score, weights = matchScore(expert, paper)
+            assert scores[e, p] == score
+            assert pairWeights(expert_codes[e], paper_codes[p]) == weights
+
+
+def test_blank_slots_match_each_other():
+    expert, paper = ['a', None, None, None, None], [None, 'a', None, None, None]
+    expert_codes, paper_codes, n_topics = encodeBatch([expert], [paper], {})
+    # 'a' scores 5 x 4; each blank of the expert meets the paper's first blank (weight 5)
+    assert scoreMatrix(expert_codes, paper_codes, n_topics)[0, 0] == matchScore(expert, paper)[0] == 5 * 4 + (4 + 3 + 2 + 1) * 5
+
+
+def test_topic_similarity_with_identity_is_positional():
+    rng = random.Random(1)
+    topics = [f'topic{i}' for i in range(8)] + [None]
+    expert_codes, paper_codes, n_topics = encodeBatch(randomSpecs(30, topics, rng), randomSpecs(30, topics, rng), {})
+    positional = SCORINGS['Positional'].kernel(expert_codes, paper_codes, n_topics)
+    similar = SCORINGS['Topic Similarity'].kernel(expert_codes, paper_codes, n_topics)
+    assert np.array_equal(positional, similar)
+    related = SCORINGS['Topic Similarity'].kernel(expert_codes, paper_codes, n_topics,
+                                                  similarity=cooccurrenceSimilarity([expert_codes, paper_codes], n_topics))
+    assert (related >= positional).all()
+
+
+@pytest.mark.parametrize('name', list(SCORINGS))
+def test_weights_add_up_to_the_score(name):
+    rng = random.Random(2)
+    topics = [f'topic{i}' for i in range(8)] + [None]
+    expert_codes, paper_codes, n_topics = encodeBatch(randomSpecs(15, topics, rng), randomSpecs(15, topics, rng), {})
+    similarity = cooccurrenceSimilarity([expert_codes, paper_codes], n_topics)
+    scoring = SCORINGS[name]
+    scores = scoring.kernel(expert_codes, paper_codes, n_topics, pages=np.arange(1, 16), similarity=similarity)
+    assert scores.dtype == np.int32 and (scores >= 0).all()
+    for e in range(15):
+        for p in range(15):
+            weights = scoring.weights(expert_codes[e], paper_codes[p], scores[e, p], similarity)
+            if sum(weights):
+                assert sum(weights) == scores[e, p]
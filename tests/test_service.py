@@ -0,0 +1,98 @@
+import asyncio
+import sqlite3
+import threading
+import pytest
+from service import MatchingService, ServiceClient, ServiceError, connectService
+
+
+@pytest.fixture
+def client(dbpath, tmp_path):
+    """
+    Runs a `MatchingService` on `dbpath` and a temporary Unix socket in a background event loop.
+    """
+    socket_path = str(tmp_path / 'matching.sock')
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    service = MatchingService(dbpath)
+
+    async def run():
+        service.stopping = asyncio.Event()
+        server = await service.start(unix_socket=socket_path)
+        started.set()
+        async with server:
+            await service.stopping.wait()
+        service.writer.cancel()
+
+    thread = threading.Thread(target=lambda: loop.run_until_complete(run()), daemon=True)
+    thread.start()
+    assert started.wait(30)
+    client = ServiceClient(unix_socket=socket_path)
+    yield client
+    client.close()
+    loop.call_soon_threadsafe(service.stopping.set)
+    thread.join(10)
+    service.database.shutdown()
+    service.connection.close()
+    loop.close()
+
+
+def test_select_match_save_review(client, dbpath):
+    status = client.status()
+    assert (status['experts'], status['papers']) == (10, 20)
+
+    selected = client.select('Greedy', batch_size=5)
+    assert len(selected['expert_ids']) == len(selected['paper_ids']) == 5
+
+    first = client.match('Greedy', 'Stable', batch_size=5)
+    assert not first['cached'] and first['assigned'] > 0
+    assert first['batch_expert_ids'] == selected['expert_ids']
+    assert first['batch_paper_ids'] == selected['paper_ids']
+    again = client.match('Greedy', 'Stable', batch_size=5)
+    assert again['cached'] and again['paper_ids'] == first['paper_ids']
+
+    saved = client.save(first['expert_ids'], first['paper_ids'])
+    assert saved['txn'] is not None and saved['score'] == first['total_score']
+    assert saved['generation'] == 1
+    connection = sqlite3.connect(dbpath)
+    assigned = dict(connection.execute('SELECT paperid, expertid FROM papers WHERE expertid != -1').fetchall())
+    assert assigned == dict(zip(first['paper_ids'], first['expert_ids']))
+
+    # The saved papers are no longer free, so the next match is computed for new ones
+    after = client.match('Greedy', 'Stable', batch_size=5)
+    assert not after['cached'] and not set(after['batch_paper_ids']) & set(first['paper_ids'])
+
+    assert client.review(first['paper_ids'][0])['changed']
+    assert client.reviewMany(first['paper_ids'], True)['changed'] == len(first['paper_ids']) - 1
+    statuses = connection.execute(f'SELECT status FROM papers WHERE paperid IN ({",".join("?" * len(first["paper_ids"]))})',
+                                  first['paper_ids']).fetchall()
+    assert all(status for status, in statuses)
+    connection.close()
+
+    metrics = client.metrics()
+    assert metrics['endpoints']['/match']['count'] == 3
+    assert metrics['cache']['hits'] == 1
+
+
+def test_outside_changes_are_picked_up(client, dbpath):
+    first = client.select('Greedy', batch_size=5)
+    connection = sqlite3.connect(dbpath)
+    with connection:
+        connection.execute('UPDATE papers SET expertid = ? WHERE paperid = ?', (first['expert_ids'][0], first['paper_ids'][0]))
+    connection.close()
+    assert first['paper_ids'][0] not in client.select('Greedy', batch_size=5)['paper_ids']
+
+
+def test_errors(client):
+    with pytest.raises(ServiceError) as error:
+        client.match('Greedy', 'Nonexistent')
+    assert error.value.status == 400
+    with pytest.raises(ServiceError):
+        client.save([1, 2], [1])
+    with pytest.raises(ServiceError) as error:
+        client.request('GET', '/nowhere')
+    assert error.value.status == 404
+
+
+def test_connect_service():
+    assert connectService('127.0.0.1:8765').connection.port == 8765
+    assert connectService('/tmp/matching.sock').connection.path == '/tmp/matching.sock'
@@ -0,0 +1,52 @@
+import os
+import shutil
+import sqlite3
+import pytest
+from tracks import runTracks, combineResults
+
+
+@pytest.fixture
+def track_paths(dbpath, tmp_path):
+    """
+    Two tracks with the same experts and the same file name in different folders.
+    """
+    paths = []
+    for folder in ('a', 'b'):
+        os.makedirs(tmp_path / folder)
+        paths.append(str(tmp_path / folder / 'mydb.db'))
+        shutil.copy(dbpath, paths[-1])
+    return paths
+
+
+def test_tracks_share_capacity(track_paths, tmp_path):
+    ledger_path = str(tmp_path / 'ledger.db')
+    progress = []
+    results = runTracks(track_paths, save=True, ledger_path=ledger_path, max_workers=1,
+                        on_progress=lambda path, stage, fraction: progress.append((path, stage)))
+    assert [result['path'] for result in results] == track_paths
+    assert {(path, 'saved') for path in track_paths} <= set(progress)
+
+    ledger = sqlite3.connect(ledger_path)
+    assert ledger.execute('SELECT COUNT(*) FROM ledger WHERE used > capacity + 1e-9').fetchone()[0] == 0
+    ledger.close()
+    pages_by_name = {}
+    for path, result in zip(track_paths, results):
+        connection = sqlite3.connect(path)
+        saved = dict(connection.execute('SELECT paperid, expertid FROM papers WHERE expertid != -1').fetchall())
+        assert saved == dict(zip(result['paper_ids'], result['expert_ids']))
+        for name, pages in connection.execute('SELECT e.name, p.pages FROM papers p JOIN expertname e '
+                                              'ON e.expertid = p.expertid'):
+            pages_by_name[name] = pages_by_name.get(name, 0) + pages
+        connection.close()
+        assert result['assigned'] == len(set(result['expert_ids'])) == len(saved)
+    connection = sqlite3.connect(track_paths[0])
+    capacity = dict(connection.execute('SELECT name, maxload FROM expertname').fetchall())
+    connection.close()
+    assert all(pages <= capacity[name] for name, pages in pages_by_name.items())
+
+    # The second track lost experts to the first one; its papers were re-matched or left free
+    second = results[1]
+    assert second['reassigned'] + second['capacity_conflicts'] > 0
+    totals = combineResults(results)
+    assert totals['assigned'] == sum(result['assigned'] for result in results)
+    assert totals['reassigned'] == second['reassigned'] + results[0]['reassigned']
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from matching import stableMatch, blockingPairs
+from verify import verifyMatching
+
+
+def randomMatching(rng, n_experts, n_papers):
+    expert_match = np.full(n_experts, -1, dtype=np.int64)
+    count = rng.integers(0, min(n_experts, n_papers) + 1)
+    expert_match[rng.choice(n_experts, count, replace=False)] = rng.choice(n_papers, count, replace=False)
+    return expert_match
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_verify_matches_pairwise_check(seed):
+    rng = np.random.default_rng(seed)
+    n_experts, n_papers = rng.integers(1, 15, size=2)
+    scores = rng.integers(0, 30, size=(n_experts, n_papers)).astype(np.int32)
+    scores[rng.random(scores.shape) < 0.3] = 0
+    expert_match = randomMatching(rng, n_experts, n_papers)
+    paper_holder = {p: e for e, p in enumerate(expert_match.tolist()) if p >= 0}
+
+    blocking, compatible = set(), 0
+    for e in range(n_experts):
+        for p in range(n_papers):
+            own = scores[e, expert_match[e]] if expert_match[e] >= 0 else 0
+            other = scores[paper_holder[p], p] if p in paper_holder else 0
+            if scores[e, p] > own and scores[e, p] > other:
+                blocking.add((e, p))
+                compatible += expert_match[e] < 0 and p not in paper_holder
+
+    report = verifyMatching(scores, expert_match, chunk=4, sample=n_experts)
+    assert report['blocking'] == len(blocking) and report['stable'] == (not blocking)
+    assert report['unmatched_compatible'] == compatible
+    assert report['blocking_experts'] == len({e for e, _ in blocking})
+    for e, p, score in report['blocking_sample']:
+        assert (e, p) in blocking and score == max(scores[e, q] for f, q in blocking if f == e)
+    assert report['assigned'] == (expert_match >= 0).sum()
+    assert report['score']['total'] == sum(scores[e, p] for e, p in enumerate(expert_match.tolist()) if p >= 0)
+    assert blockingPairs(scores, expert_match) == len(blocking)
+
+
+def test_verify_flags_invalid_pairs_and_load_variance():
+    scores = np.array([[5, 0], [4, 3], [0, 2]], dtype=np.int32)
+    report = verifyMatching(scores, [0, 0, 0], pages=[10, 20], load=[0, 50, 10], maxload=[100, 100, 50])
+    assert report['invalid'] == {'duplicate_papers': 1, 'incompatible_pairs': 1}
+    loads = np.array([10.0, 60.0, 30.0])
+    assert report['load_variance'] == pytest.approx(np.var(loads))
+
+
+def test_stable_match_without_early_stop_is_stable():
+    # Square matrices where every expert has a compatible paper: the sweeps run until nothing changes
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        scores = rng.integers(1, 40, size=(8, 12)).astype(np.int32)
+        expert_match, _ = stableMatch(scores)
+        assert verifyMatching(scores, expert_match)['stable']
@@ -0,0 +1,291 @@
+"""
+Multi-track matching: one database per track, matched concurrently in worker processes.
+
+Every track database has the same schema as `mydb.db` and is selected and matched on its
+own, in its own process. Experts can sit on several tracks (recognized by their name), so
+their page capacity is shared through a global ledger: a small SQLite database that every
+track worker reserves pages in before it keeps a pair. A reservation is a single
+conditional UPDATE, so concurrent tracks can never overbook an expert.
+
+The ledger is rebuilt from the track databases at the start of each run:
+
+- capacity: the largest `maxload` of the expert over all tracks,
+- used: the pages already assigned to the expert in all tracks (`load * maxload / 100`).
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from constraints import ConstraintStore, ensureSchema as ensureConstraintSchema
+from assignments import saveMatches, ensureSchema as ensureAssignmentSchema
+from journal import ChangeJournal, ensureSchema as ensureJournalSchema
+from records import TopicIndex
+from scoring import scoreTables
+from matching import stableMatch
+from compare import takeSnapshot, runStrategy
+
+
+def trackName(path: str):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def buildLedger(ledger_path: str, track_paths: list):
+    """
+    Creates the capacity ledger of all experts of all tracks.
+
+    Returns:
+    - int: The number of distinct experts in the ledger.
+    """
+    capacity, used = {}, {}
+    for path in track_paths:
+        connection = sqlite3.connect(path)
+        for name, load, maxload in connection.execute('SELECT name, load, maxload FROM expertname'):
+            capacity[name] = max(capacity.get(name, 0.0), maxload)
+            used[name] = used.get(name, 0.0) + load * maxload / 100
+        connection.close()
+    connection = sqlite3.connect(ledger_path)
+    with connection:
+        connection.execute('DROP TABLE IF EXISTS ledger')
+        connection.execute('''
+            CREATE TABLE ledger (
+                name TEXT PRIMARY KEY,
+                capacity REAL NOT NULL,
+                used REAL NOT NULL
+            )''')
+        connection.executemany('INSERT INTO ledger (name, capacity, used) VALUES (?, ?, ?)',
+                               [(name, capacity[name], used[name]) for name in capacity])
+    connection.close()
+    return len(capacity)
+
+
+def reservePages(connection: sqlite3.Connection, names: list, pages: list):
+    """
+    Reserves `pages[i]` pages of expert `names[i]` in the ledger, in the given order.
+
+    Returns:
+    - list: True for every reservation that fit into the expert's remaining global capacity.
+    """
+    granted = []
+    # BEGIN IMMEDIATE takes the write lock up front, so tracks reserve one after another
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        for name, count in zip(names, pages):
+            cursor = connection.execute('UPDATE ledger SET used = used + ? WHERE name = ? AND used + ? <= capacity',
+                                        (count, name, count))
+            granted.append(cursor.rowcount == 1)
+        connection.execute('COMMIT')
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    return granted
+
+
+def rematchRefused(snapshot: dict, params: dict, experts, papers, refused: set):
+    """
+    Stable-matches `papers` to `experts` (sub-batches of a track batch) with the pairs in `refused`
+    (expert id, paper id) masked out.
+
+    Returns:
+    - tuple: (expert_ids, paper_ids, scores) arrays of the new pairs.
+    """
+    scores = scoreTables(experts, papers, snapshot['n_topics'], snapshot['constraints'],
+                         params.get('scoring', 'Positional'), snapshot.get('similarity'))
+    refused_experts, refused_papers = (np.array(ids, dtype=np.int64) for ids in zip(*refused))
+    rows, cols = experts.rowOf(refused_experts), papers.rowOf(refused_papers)
+    hit = (rows >= 0) & (cols >= 0)
+    scores[rows[hit], cols[hit]] = 0
+    expert_match, _ = stableMatch(scores)
+    expert_match = np.asarray(expert_match, dtype=np.int64)
+    matched = np.flatnonzero(expert_match >= 0)
+    return experts.ids[matched], papers.ids[expert_match[matched]], scores[matched, expert_match[matched]]
+
+
+def runTrack(track_path: str, ledger_path: str, selection: str, matcher: str, params: dict, save: bool = False,
+             progress=None):
+    """
+    Selects, matches and (optionally) saves one track; runs in a worker process.
+
+    Selection uses the larger of each expert's track load and global load from the ledger. Pairs
+    are then kept in descending score order as long as the ledger grants the pages. Papers whose
+    expert the ledger refuses go back into a stable match with the batch experts that hold no
+    pair yet, with every refused pair masked, until the ledger grants all new pairs or none
+    are left; those still unassigned are counted as `capacity_conflicts` and stay free for a later run.
+
+    Parameters:
+    - track_path (str): Track database.
+    - ledger_path (str): Ledger database built by `buildLedger`.
+    - selection, matcher (str): Keys of `compare.SELECTIONS` / `compare.MATCHERS`.
+    - params (dict): Parameters for `compare.runStrategy`.
+    - save (bool, optional): Write the kept pairs to the track database with `assignments.saveMatches`.
+    - progress (Queue, optional): Receives (track, stage, fraction) tuples.
+
+    Returns:
+    - dict: The `runStrategy` metrics of the kept pairs plus `track`, `path`, `experts`,
+      `papers`, `reassigned` (papers re-matched after a refusal), `capacity_conflicts`, `saved`
+      and `wall_time`. `verification` and `violations` describe the match before the ledger.
+    """
+    start = time.perf_counter()
+    name = trackName(track_path)
+
+    def report(stage, fraction):
+        if progress is not None:
+            progress.put((track_path, stage, fraction))
+
+    connection = sqlite3.connect(track_path, timeout=30)
+    ensureConstraintSchema(connection)
+    ensureAssignmentSchema(connection)
+    ensureJournalSchema(connection)
+    topics = TopicIndex(connection.execute('SELECT * FROM expertise').fetchall())
+    snapshot = takeSnapshot(connection, topics, ConstraintStore.load(connection))
+    ledger = sqlite3.connect(ledger_path, timeout=30, isolation_level=None)
+    # Selection sees each expert's global load, so experts that are full elsewhere are not picked
+    usage = dict(ledger.execute('SELECT name, used * 100.0 / capacity FROM ledger WHERE capacity > 0'))
+    experts = snapshot['experts']
+    global_load = np.array([usage.get(name, 0.0) for name in experts.names], dtype=np.float64)
+    experts.data['load'] = np.maximum(experts.data['load'], global_load)
+    report('loaded', 0.25)
+
+    result = runStrategy(snapshot, selection, matcher, params)
+    report('matched', 0.5)
+
+    papers = snapshot['papers']
+    batch_experts, batch_papers = result['experts'], result['papers']
+    expert_ids = np.asarray(result['expert_ids'], dtype=np.int64)
+    paper_ids = np.asarray(result['paper_ids'], dtype=np.int64)
+    scores = np.asarray(result['scores'], dtype=np.int64)
+    kept, refused = [(expert_ids[:0], paper_ids[:0], scores[:0])], set()
+    while len(expert_ids):
+        order = np.argsort(-scores, kind='stable')
+        expert_ids, paper_ids, scores = expert_ids[order], paper_ids[order], scores[order]
+        names = [experts.names[row] for row in experts.rowOf(expert_ids).tolist()]
+        pages = papers.data['pages'][papers.rowOf(paper_ids)].tolist()
+        granted = np.array(reservePages(ledger, names, pages), dtype=bool)
+        kept.append((expert_ids[granted], paper_ids[granted], scores[granted]))
+        if granted.all():
+            break
+        refused.update(zip(expert_ids[~granted].tolist(), paper_ids[~granted].tolist()))
+        held = np.concatenate([ids for ids, _, _ in kept])
+        free_experts = batch_experts[np.flatnonzero(~np.isin(batch_experts.ids, held))]
+        free_papers = batch_papers[batch_papers.rowOf(paper_ids[~granted])]
+        expert_ids, paper_ids, scores = rematchRefused(snapshot, params, free_experts, free_papers, refused)
+    ledger.close()
+    report('reserved', 0.75)
+
+    expert_ids, paper_ids, scores = (np.concatenate(column).astype(np.int64) for column in zip(*kept))
+    refused_papers = {paper_id for _, paper_id in refused}
+    reassigned = len(refused_papers.intersection(paper_ids.tolist()))
+    saved = False
+    if save and len(expert_ids):
+        saveMatches(connection, ChangeJournal(connection), expert_ids.tolist(), paper_ids.tolist(), int(scores.sum()))
+        saved = True
+    connection.close()
+    report('saved' if saved else 'done', 1.0)
+
+    del result['experts'], result['papers']
+    result.update({
+        'track': name,
+        'path': track_path,
+        'experts': len(experts),
+        'papers': len(papers),
+        'expert_ids': expert_ids.tolist(),
+        'paper_ids': paper_ids.tolist(),
+        'scores': scores.tolist(),
+        'total_score': int(scores.sum()),
+        'assigned': len(expert_ids),
+        'reassigned': reassigned,
+        'capacity_conflicts': len(refused_papers) - reassigned,
+        'saved': saved,
+        'wall_time': time.perf_counter() - start,
+    })
+    return result
+
+
+def runTracks(track_paths: list, selection: str = 'Greedy', matcher: str = 'Stable', params: dict = None,
+              save: bool = False, on_progress=None, on_result=None, max_workers=None, ledger_path: str = None):
+    """
+    Runs every track in its own worker process against one global capacity ledger.
+
+    Parameters:
+    - track_paths (list): Track database paths.
+    - selection, matcher (str): Strategy used for every track.
+    - params (dict, optional): Parameters for `compare.runStrategy` (batch size, depths).
+    - save (bool, optional): Write each track's kept pairs to its database.
+    - on_progress (Callable, optional): Called as `on_progress(track_path, stage, fraction)` from a
+      background thread as the tracks advance.
+    - on_result (Callable, optional): Called with each track result as soon as it finishes (from a
+      background thread); a failed track is reported as `{'track': ..., 'error': ...}`.
+      If omitted, the call blocks and returns all results.
+    - max_workers (int, optional): Number of worker processes, defaults to one per track up to the CPU count.
+    - ledger_path (str, optional): Where to build the ledger; a temporary file by default.
+
+    Returns:
+    - list: Track results in `track_paths` order if `on_result` is None, otherwise the list of futures.
+    """
+    params = params or {'batch_size': 10, 'expert_depth': 1, 'paper_depth': 1}
+    ledger_path = ledger_path or os.path.join(tempfile.mkdtemp(prefix='tracks'), 'ledger.db')
+    buildLedger(ledger_path, track_paths)
+    context = multiprocessing.get_context('spawn')
+    manager = context.Manager()
+    progress = manager.Queue()
+    workers = max_workers or min(len(track_paths), os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    futures = [executor.submit(runTrack, path, ledger_path, selection, matcher, params, save, progress)
+               for path in track_paths]
+
+    def relay():
+        # Forwards worker progress until every track is done
+        while True:
+            item = progress.get()
+            if item is None:
+                break
+            if on_progress:
+                on_progress(*item)
+
+    def finish():
+        for future in futures:
+            future.exception()
+        progress.put(None)
+        relay_thread.join()
+        manager.shutdown()
+
+    relay_thread = threading.Thread(target=relay, daemon=True)
+    relay_thread.start()
+    if on_result is None:
+        results = [future.result() for future in futures]
+        executor.shutdown()
+        finish()
+        return results
+
+    def report(path, future):
+        if future.exception() is not None:
+            on_result({'track': trackName(path), 'path': path, 'error': str(future.exception())})
+        else:
+            on_result(future.result())
+
+    for path, future in zip(track_paths, futures):
+        future.add_done_callback(lambda done, path=path: report(path, done))
+    executor.shutdown(wait=False)
+    threading.Thread(target=finish, daemon=True).start()
+    return futures
+
+
+def combineResults(results: list):
+    """
+    Totals over all successful track results for the combined view.
+    """
+    done = [result for result in results if 'error' not in result]
+    return {
+        'tracks': len(done),
+        'failed': len(results) - len(done),
+        'total_score': sum(result['total_score'] for result in done),
+        'assigned': sum(result['assigned'] for result in done),
+        'reassigned': sum(result['reassigned'] for result in done),
+        'capacity_conflicts': sum(result['capacity_conflicts'] for result in done),
+        'wall_time': max((result['wall_time'] for result in done), default=0.0),
+    }
@@ -0,0 +1,282 @@
+"""
+Stability and quality check of a one-to-one matching against its score matrix, and of
+k-reviewers-per-paper assignments (`verifyKWay`).
+
+`verifyMatching` works for any engine (single thread, the two-half "Dual Thread" split,
+local search, auction): it only needs the scores of the whole batch and the paper picked
+for each expert. Blocking pairs are found with vectorized comparisons over blocks of
+`chunk` expert rows, so a 10k x 10k batch never needs more than a few (chunk x papers)
+temporaries and the check can run after every match.
+
+This module must stay free of Qt so that worker processes can import it cheaply.
+"""
+import time
+import numpy as np
+
+
+def verifyMatching(scores: np.ndarray, expert_match, pages=None, load=None, maxload=None, sample: int = 10,
+                   chunk: int = 1024):
+    """
+    Verifies a matching and summarizes its quality.
+
+    A pair (e, p) is blocking if its score beats both the current score of expert `e` and of
+    paper `p` (a free side counts as 0), so a matching is stable if no blocking pair exists.
+    Pairs of a free expert and a free paper with a positive score are blocking pairs too and
+    are counted separately as unmatched-but-compatible.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - expert_match (array-like): Paper index of each expert, -1 if free.
+    - pages, load, maxload (array-like, optional): Page count of each paper and current load (percent)
+      and maximum load of each expert; if given, the load variance after saving is reported.
+    - sample (int, optional): Number of blocking pairs to return: the best one of each expert, best scores first.
+    - chunk (int, optional): Expert rows compared at a time.
+
+    Returns:
+    - dict:
+        - `stable` (bool), `blocking` (int) and `blocking_experts` (int, experts in at least one blocking pair),
+        - `blocking_sample`: up to `sample` (expert, paper, score) index tuples, at most one per expert,
+        - `unmatched_compatible` (int) pairs and `free_experts_with_options` (int),
+        - `invalid`: papers given to several experts (`duplicate_papers`) and matched pairs with a score of 0
+          or less (`incompatible_pairs`),
+        - `assigned`, `free_experts`, `free_papers`,
+        - `score`: `total`, `mean`, `std`, `min`, `p25`, `median`, `p75`, `max` of the matched pairs,
+        - `load_variance` (float or None) and `seconds`.
+    """
+    start = time.perf_counter()
+    n_experts, n_papers = scores.shape
+    expert_match = np.asarray(expert_match, dtype=np.int64)
+    matched = np.flatnonzero(expert_match >= 0)
+    pair_scores = scores[matched, expert_match[matched]]
+    expert_current = np.zeros(n_experts, dtype=scores.dtype)
+    paper_current = np.zeros(n_papers, dtype=scores.dtype)
+    expert_current[matched] = pair_scores
+    # A paper given to several experts keeps its best score, which only hides blocking pairs
+    np.maximum.at(paper_current, expert_match[matched], pair_scores)
+    expert_free = expert_match < 0
+    paper_free = np.bincount(expert_match[matched], minlength=n_papers) == 0
+
+    blocking = compatible = 0
+    blocking_rows = np.zeros(n_experts, dtype=bool)
+    options = np.zeros(n_experts, dtype=bool)
+    found = []
+    for first in range(0, n_experts, chunk):
+        block = scores[first:first + chunk]
+        mask = (block > expert_current[first:first + chunk, None]) & (block > paper_current[None, :])
+        per_row = mask.sum(axis=1)
+        blocking += int(per_row.sum())
+        blocking_rows[first:first + chunk] = per_row > 0
+        free_rows = np.flatnonzero(expert_free[first:first + chunk])
+        if len(free_rows):
+            free_mask = mask[free_rows][:, paper_free]
+            compatible += int(free_mask.sum())
+            options[first + free_rows] = free_mask.any(axis=1)
+        if sample and per_row.any():
+            # Best blocking pair of each expert; blocking scores are always positive
+            rows = np.flatnonzero(per_row)
+            best = np.where(mask[rows], block[rows], 0)
+            cols = best.argmax(axis=1)
+            values = best[np.arange(len(rows)), cols]
+            if len(values) > sample:
+                keep = np.argpartition(-values, sample)[:sample]
+                rows, cols, values = rows[keep], cols[keep], values[keep]
+            found.extend(zip((rows + first).tolist(), cols.tolist(), values.tolist()))
+    found.sort(key=lambda pair: -pair[2])
+
+    load_variance = None
+    if pages is not None and load is not None and maxload is not None:
+        # Loads after saving, with the rule of `onSaveClicked`
+        loads = np.asarray(load, dtype=np.float64).copy()
+        added = np.asarray(pages, dtype=np.float64)[expert_match[matched]] / np.asarray(maxload, dtype=np.float64)[matched] * 100
+        loads[matched] = np.minimum(100, np.round(loads[matched] + added, 2))
+        load_variance = float(np.var(loads)) if len(loads) else 0.0
+
+    if len(pair_scores):
+        p25, median, p75 = np.percentile(pair_scores, [25, 50, 75]).tolist()
+        score = {'total': int(pair_scores.sum()), 'mean': float(pair_scores.mean()), 'std': float(pair_scores.std()),
+                 'min': int(pair_scores.min()), 'p25': p25, 'median': median, 'p75': p75, 'max': int(pair_scores.max())}
+    else:
+        score = {'total': 0, 'mean': 0.0, 'std': 0.0, 'min': 0, 'p25': 0.0, 'median': 0.0, 'p75': 0.0, 'max': 0}
+
+    return {
+        'stable': blocking == 0,
+        'blocking': blocking,
+        'blocking_experts': int(blocking_rows.sum()),
+        'blocking_sample': found[:sample],
+        'unmatched_compatible': compatible,
+        'free_experts_with_options': int(options.sum()),
+        'invalid': {
+            'duplicate_papers': int((np.bincount(expert_match[matched], minlength=n_papers) > 1).sum()),
+            'incompatible_pairs': int((pair_scores <= 0).sum()),
+        },
+        'assigned': len(matched),
+        'free_experts': int(expert_free.sum()),
+        'free_papers': int(paper_free.sum()),
+        'score': score,
+        'load_variance': load_variance,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def kWayWants(scores: np.ndarray, expert_index, paper_index, k: int, groups=None, max_per_group: int = 1,
+              columns=None):
+    """
+    Marks the experts each paper of a k-reviewers-per-paper assignment would take: it has an open
+    slot or the expert beats its worst reviewer, and taking the expert keeps the per-group limit
+    (if the expert's group is full, the expert must beat the worst reviewer of that group instead).
+    Assigned pairs and pairs with a score of 0 or less are never marked.
+
+    Returns:
+    - np.ndarray: Boolean (experts, papers) matrix, or (experts, len(columns)) for the papers `columns`.
+    """
+    n_experts, n_papers = scores.shape
+    held_e = np.asarray(expert_index, dtype=np.int64)
+    held_p = np.asarray(paper_index, dtype=np.int64)
+    held_s = scores[held_e, held_p]
+    columns = np.arange(n_papers) if columns is None else np.asarray(columns, dtype=np.int64)
+    column_scores = scores[:, columns]
+    # Sentinels in the dtype of the scores, so the comparisons over the whole matrix do not upcast it
+    top = np.iinfo(scores.dtype).max if np.issubdtype(scores.dtype, np.integer) else np.inf
+    count = np.bincount(held_p, minlength=n_papers)[columns]
+    worst = np.full(n_papers, top, dtype=scores.dtype)
+    np.minimum.at(worst, held_p, held_s)
+    wants = column_scores > np.where(count < k, 0, worst[columns]).astype(scores.dtype)[None, :]
+    if groups is not None:
+        groups = np.asarray(groups, dtype=np.int64)
+        n_groups = int(groups.max()) + 1 if len(groups) else 1
+        group_count = np.zeros((n_papers, n_groups), dtype=np.int64)
+        np.add.at(group_count, (held_p, groups[held_e]), 1)
+        group_worst = np.full((n_papers, n_groups), top, dtype=scores.dtype)
+        np.minimum.at(group_worst, (held_p, groups[held_e]), held_s)
+        full = (group_count[columns] >= max_per_group)[:, groups].T
+        wants = np.where(full, column_scores > group_worst[columns][:, groups].T, wants)
+    wants &= column_scores > 0
+    position = np.full(n_papers, -1, dtype=np.int64)
+    position[columns] = np.arange(len(columns))
+    assigned = position[held_p] >= 0
+    wants[held_e[assigned], position[held_p[assigned]]] = False
+    return wants
+
+
+def kWayAccepts(scores: np.ndarray, expert_index, paper_index, pages, capacity, rows=None):
+    """
+    Marks the papers each expert of a k-reviewers-per-paper assignment would accept: the pages of its
+    assigned papers with a score of at least that of the paper, plus the pages of the paper, fit in
+    its capacity.
+
+    Returns:
+    - np.ndarray: Boolean (experts, papers) matrix, or (len(rows), papers) for the experts `rows`.
+    """
+    n_experts, n_papers = scores.shape
+    held_e = np.asarray(expert_index, dtype=np.int64)
+    held_p = np.asarray(paper_index, dtype=np.int64)
+    pages = np.asarray(pages, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    rows = np.arange(n_experts) if rows is None else np.asarray(rows, dtype=np.int64)
+    position = np.full(n_experts, -1, dtype=np.int64)
+    position[rows] = np.arange(len(rows))
+    mine = position[held_e] >= 0
+    held_e, held_p = position[held_e[mine]], held_p[mine]
+    row_scores = scores[rows]
+    held_s = row_scores[held_e, held_p]
+
+    # One pass per rank of the assigned papers (best first): where a paper's score is at most that of
+    # the assigned paper of this rank, the pages up to and including that rank plus its own must fit
+    order = np.lexsort((-held_s, held_e))
+    held_e, held_p, held_s = held_e[order], held_p[order], held_s[order]
+    rank = np.arange(len(held_e)) - np.searchsorted(held_e, held_e, side='left')
+    held_count = np.bincount(held_e, minlength=len(rows))
+    depth = int(held_count.max()) if len(held_e) else 0
+    level_scores = np.zeros((len(rows), depth), dtype=scores.dtype)
+    level_pages = np.zeros((len(rows), depth))
+    level_scores[held_e, rank] = held_s
+    level_pages[held_e, rank] = pages[held_p]
+    level_pages = np.cumsum(level_pages, axis=1)
+    accepts = pages[None, :] <= capacity[rows, None]
+    for level in range(depth):
+        busy = np.flatnonzero(held_count > level)
+        counted = level_scores[busy, level, None] >= row_scores[busy]
+        fits = level_pages[busy, level, None] + pages[None, :] <= capacity[rows[busy], None]
+        accepts[busy] &= fits | ~counted
+    return accepts
+
+
+def kWayBlockingMask(scores: np.ndarray, expert_index, paper_index, k: int, pages, capacity,
+                     groups=None, max_per_group: int = 1):
+    """
+    Marks the blocking pairs of a k-reviewers-per-paper assignment under page capacities: pairs that
+    are not assigned, where the paper wants the expert (`kWayWants`) and the expert would accept the
+    paper (`kWayAccepts`). An open slot of a paper with a compatible expert that has room for it is a
+    blocking pair too.
+
+    Parameters:
+    - scores (np.ndarray): Score matrix of shape (experts, papers); 0 marks incompatible pairs.
+    - expert_index, paper_index (array-like): The assigned pairs.
+    - k (int): Number of reviewers wanted per paper.
+    - pages (array-like): Page count of each paper.
+    - capacity (array-like): Page capacity of each expert (before the assignment).
+    - groups (array-like, optional): Diversity group of each expert.
+    - max_per_group (int, optional): Maximum reviewers of one paper drawn from the same group.
+
+    Returns:
+    - np.ndarray: Boolean (experts, papers) matrix, True for blocking pairs.
+    """
+    return (kWayWants(scores, expert_index, paper_index, k, groups, max_per_group)
+            & kWayAccepts(scores, expert_index, paper_index, pages, capacity))
+
+
+def kWayBlockingPairs(scores: np.ndarray, expert_index, paper_index, k: int, pages, capacity,
+                      groups=None, max_per_group: int = 1):
+    """
+    The blocking pairs of `kWayBlockingMask`.
+
+    Returns:
+    - tuple: (expert_index, paper_index, score) arrays of all blocking pairs.
+    """
+    block_e, block_p = np.nonzero(kWayBlockingMask(scores, expert_index, paper_index, k, pages, capacity, groups,
+                                                   max_per_group))
+    return block_e, block_p, scores[block_e, block_p]
+
+
+def verifyKWay(scores: np.ndarray, expert_index, paper_index, k: int, pages, capacity, groups=None,
+               max_per_group: int = 1):
+    """
+    Stability check of a `matching.kWayAssign` result (see `kWayBlockingPairs`).
+
+    Returns:
+    - dict: `stable` (bool), `blocking` (int) pairs, `unfilled_compatible` (int) open slots of papers with a
+      compatible expert that still has room for them, and `overloaded` (int) experts over their capacity.
+    """
+    n_experts, n_papers = scores.shape
+    expert_index = np.asarray(expert_index, dtype=np.int64)
+    paper_index = np.asarray(paper_index, dtype=np.int64)
+    pages = np.asarray(pages, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    block_e, block_p, _ = kWayBlockingPairs(scores, expert_index, paper_index, k, pages, capacity, groups, max_per_group)
+    used = np.bincount(expert_index, weights=pages[paper_index], minlength=n_experts)
+    open_slot = np.bincount(paper_index, minlength=n_papers)[block_p] < k
+    spare = capacity[block_e] - used[block_e] >= pages[block_p]
+    return {
+        'stable': len(block_e) == 0,
+        'blocking': len(block_e),
+        'unfilled_compatible': int((open_slot & spare).sum()),
+        'overloaded': int((used > capacity + 1e-9).sum()),
+    }
+
+
+def describeVerification(report: dict):
+    """
+    One-line summary of a `verifyMatching` report for the status bar and logs.
+    """
+    invalid = report['invalid']
+    problems = [f'{count} {name.replace("_", " ")}' for name, count in invalid.items() if count]
+    stability = 'stable' if report['stable'] else (f'NOT stable: {report["blocking"]} blocking pair(s) '
+                                                   f'involving {report["blocking_experts"]} expert(s)')
+    score = report['score']
+    text = (f'Verified: {stability}; {report["assigned"]} assigned, {report["unmatched_compatible"]} free compatible pair(s); '
+            f'scores min {score["min"]} / median {score["median"]:g} / max {score["max"]}')
+    if report['load_variance'] is not None:
+        text += f', load variance {report["load_variance"]:.1f}'
+    if problems:
+        text += f'; INVALID: {", ".join(problems)}'
+    return text + f' ({report["seconds"] * 1000:.0f} ms)'